@@ -15,7 +15,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from wallpaper_changer.api import UnsplashAPI
 from wallpaper_changer.utils import WallpaperManager
-from wallpaper_changer.config import DOWNLOAD_DIR, GENRES
+from wallpaper_changer.config import ensure_download_dir
+from wallpaper_changer.settings import get_settings
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -56,7 +57,7 @@ def download_and_set_wallpaper(query: str = "Tesla"):
         # Generate filename
         photo_id = photo.get('id', 'unsplash')
         filename = f"{photo_id}_example.jpg"
-        file_path = os.path.join(DOWNLOAD_DIR, filename)
+        file_path = os.path.join(ensure_download_dir(), filename)
         
         logger.info(f"Downloading to: {file_path}")
         
@@ -88,7 +89,7 @@ def download_and_set_wallpaper(query: str = "Tesla"):
 def list_available_genres():
     """List all available wallpaper genres."""
     logger.info("Available wallpaper genres:")
-    for i, genre in enumerate(GENRES, 1):
+    for i, genre in enumerate(get_settings().genres, 1):
         print(f"{i:2d}. {genre}")
 
 
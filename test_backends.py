@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Wallpaper backend and headless rotation tests.
+
+Everything is applied through FakeBackend, which records the batches it
+would apply instead of touching the desktop.
+"""
+
+import os
+import sys
+import time
+import subprocess
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from wallpaper_changer import headless
+from wallpaper_changer.utils import WallpaperManager, FakeBackend, get_backend, set_backend
+from wallpaper_changer.utils import backends
+from wallpaper_changer.utils.backends import GnomeBackend
+from wallpaper_changer.utils.library import WallpaperLibrary, set_library
+from wallpaper_changer.utils.local_pool import LocalPool
+
+
+@pytest.fixture
+def fake():
+    """Apply through a FakeBackend for the duration of a test."""
+    backend = FakeBackend()
+    set_backend(backend)
+    yield backend
+    set_backend(None)
+
+
+@pytest.fixture
+def library(tmp_path):
+    """A fresh library shared through get_library()."""
+    library = WallpaperLibrary(str(tmp_path / "library.sqlite3"))
+    set_library(library)
+    yield library
+    set_library(None)
+    library.close()
+
+
+def _image(directory, name: str) -> str:
+    """Create a stand-in image file; backends only need it to exist."""
+    path = os.path.join(str(directory), name)
+    with open(path, "wb") as file:
+        file.write(b"\xff\xd8\xff\xd9")
+    return path
+
+
+def test_set_wallpaper_applies_one_batch(fake, tmp_path):
+    """Desktop and lockscreen wallpapers reach the backend together."""
+    desktop, lockscreen = _image(tmp_path, "desktop.jpg"), _image(tmp_path, "lock.jpg")
+
+    assert WallpaperManager.set_desktop_wallpaper(desktop)
+    assert WallpaperManager.apply(desktop=desktop, lockscreen=lockscreen)
+    assert fake.commands == [
+        {"desktop": desktop, "lockscreen": None, "dark": None, "spanned": False},
+        {"desktop": desktop, "lockscreen": lockscreen, "dark": None, "spanned": False},
+    ]
+
+
+def test_missing_image_is_not_applied(fake, tmp_path):
+    """A path that doesn't exist fails before the backend is called."""
+    assert not WallpaperManager.set_desktop_wallpaper(str(tmp_path / "missing.jpg"))
+    assert fake.commands == []
+
+
+def test_backend_failure_is_reported(tmp_path):
+    """A failing backend makes the apply fail."""
+    set_backend(FakeBackend(succeed=False))
+    try:
+        assert not WallpaperManager.set_lockscreen_wallpaper(_image(tmp_path, "lock.jpg"))
+    finally:
+        set_backend(None)
+
+
+def test_backend_forced_by_environment(monkeypatch):
+    """PIXELDRIVE_BACKEND selects a backend that is never detected on its own."""
+    monkeypatch.setenv(backends.BACKEND_ENV_VAR, "fake")
+    set_backend(None)
+    try:
+        assert isinstance(get_backend(), FakeBackend)
+    finally:
+        set_backend(None)
+
+
+@pytest.mark.parametrize("desktop, session, available", [
+    ("ubuntu:GNOME", "", True),
+    ("", "gnome-xorg", True),
+    ("KDE", "plasma", False),
+    ("X-Cinnamon", "cinnamon", False),
+])
+def test_gnome_detected_from_session(monkeypatch, desktop, session, available):
+    """The GNOME backend needs a GNOME session, not just the gsettings tools."""
+    monkeypatch.setattr(backends.sys, "platform", "linux")
+    monkeypatch.setattr(backends.shutil, "which", lambda name: f"/usr/bin/{name}")
+    monkeypatch.setattr(GnomeBackend, "_has_schema", classmethod(lambda cls: pytest.fail("probed")))
+    monkeypatch.setenv("XDG_CURRENT_DESKTOP", desktop)
+    monkeypatch.setenv("DESKTOP_SESSION", session)
+    assert GnomeBackend.is_available() is available
+
+
+@pytest.mark.parametrize("tools, returncode, stdout, available", [
+    (("gsettings", "dconf"), 0, "picture-uri\npicture-options\n", True),
+    (("gsettings",), 1, "", False),
+    (("dconf",), 0, "'file:///home/user/wallpaper.jpg'\n", True),
+    (("dconf",), 0, "\n", False),
+])
+def test_gnome_probed_outside_a_session(monkeypatch, tools, returncode, stdout, available):
+    """Without session variables (systemd units, cron, ssh) the settings schema is probed."""
+    monkeypatch.setattr(backends.sys, "platform", "linux")
+    monkeypatch.setattr(backends.shutil, "which", lambda name: f"/usr/bin/{name}" if name in tools else None)
+    monkeypatch.delenv("XDG_CURRENT_DESKTOP", raising=False)
+    monkeypatch.delenv("DESKTOP_SESSION", raising=False)
+    commands = []
+
+    def run(cmd, **kwargs):
+        commands.append(cmd)
+        return subprocess.CompletedProcess(cmd, returncode, stdout, "")
+
+    monkeypatch.setattr(backends.subprocess, "run", run)
+    assert GnomeBackend.is_available() is available
+    assert commands[0][0] == tools[0]
+
+
+def test_gnome_writes_keys_in_one_dconf_load(monkeypatch, tmp_path):
+    """All keys, including the span option, go into a single dconf keyfile."""
+    monkeypatch.setattr(backends.shutil, "which", lambda name: f"/usr/bin/{name}")
+    backend = GnomeBackend()
+    commands = []
+    monkeypatch.setattr(backend, "_run", lambda cmd, input_text=None: commands.append((cmd, input_text)) or True)
+    desktop, lockscreen = _image(tmp_path, "desktop.jpg"), _image(tmp_path, "lock.jpg")
+
+    assert backend.apply(desktop=desktop, lockscreen=lockscreen, spanned=True)
+    assert len(commands) == 1
+    cmd, keyfile = commands[0]
+    assert cmd[:2] == ["dconf", "load"]
+    assert f"picture-uri='file://{desktop}'" in keyfile
+    assert f"picture-uri-dark='file://{desktop}'" in keyfile
+    assert f"picture-uri='file://{lockscreen}'" in keyfile
+    assert keyfile.count("picture-options='spanned'") == 2
+
+
+def test_rotate_wallpaper_applies_download(fake, library, tmp_path, monkeypatch):
+    """A downloaded photo is applied and counted in the library."""
+    path = _image(tmp_path, "new.jpg")
+    library.record_download({"id": "new"}, path, "cars")
+    monkeypatch.setattr(headless, "download_random_photo", lambda query, should_abort=None: path)
+
+    assert headless.rotate_wallpaper("cars") == path
+    assert fake.commands[-1]["desktop"] == path
+    assert library.get(path).apply_count == 1
+
+
+def test_rotate_wallpaper_falls_back_to_local_pool(fake, library, tmp_path, monkeypatch):
+    """When the network path fails, a downloaded wallpaper is applied instead."""
+    saved = _image(tmp_path, "saved.jpg")
+    library.record_download({"id": "saved"}, saved, "cars")
+    monkeypatch.setattr(headless, "download_random_photo", lambda query, should_abort=None: None)
+    monkeypatch.setattr(headless, "LocalPool", lambda: LocalPool(library, str(tmp_path / "pool.json")))
+
+    assert headless.rotate_wallpaper("cars", lockscreen=True) == saved
+    assert fake.commands == [{"desktop": saved, "lockscreen": saved, "dark": None, "spanned": False}]
+
+
+def test_rotate_wallpaper_cancels_late_download(fake, library, tmp_path, monkeypatch):
+    """A download past the budget is cancelled, and its thread ended, before returning."""
+    saved = _image(tmp_path, "saved.jpg")
+    library.record_download({"id": "saved"}, saved, "cars")
+    state = {}
+
+    def slow_download(query, should_abort=None):
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if should_abort():
+                state["cancelled"] = True
+                return None
+            time.sleep(0.01)
+        return None
+
+    monkeypatch.setattr(headless, "download_random_photo", slow_download)
+    monkeypatch.setattr(headless, "LocalPool", lambda: LocalPool(library, str(tmp_path / "pool.json")))
+
+    assert headless.rotate_wallpaper("cars", budget_ms=50, late_wait_s=0.1) == saved
+    assert state.get("cancelled")
+
+
+def test_download_random_photo_skips_duplicates(library, tmp_path, monkeypatch):
+    """The headless download skips photos like a library wallpaper and indexes the new one."""
+    pytest.importorskip("PyQt5")
+    pytest.importorskip("numpy")
+    from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, Qt
+    from PyQt5.QtGui import QColor, QImage
+    from wallpaper_changer.utils.phash import dhash
+    from wallpaper_changer.utils.image_stats import get_stats_store
+
+    def encoded(horizontal: bool) -> bytes:
+        image = QImage(90, 60, QImage.Format_RGB32)
+        for x in range(90):
+            for y in range(60):
+                level = x * 2 if horizontal else y * 4
+                image.setPixelColor(x, y, QColor(level, level, level))
+        data = QByteArray()
+        buffer = QBuffer(data)
+        buffer.open(QIODevice.WriteOnly)
+        image.save(buffer, "PNG")
+        return bytes(data)
+
+    thumbnails = {"thumb-old": encoded(True), "thumb-new": encoded(False)}
+    photos = [
+        {"id": "old", "urls": {"thumb": "thumb-old", "full": "full-old"}},
+        {"id": "new", "urls": {"thumb": "thumb-new", "full": "full-new"}},
+    ]
+
+    class FakeAPI:
+        def search_photos(self, query):
+            return photos
+
+        def get_photo_thumbnail(self, url):
+            return thumbnails[url]
+
+        def download_photo(self, url, path, should_abort=None):
+            with open(path, "wb") as file:
+                file.write(thumbnails[url.replace("full", "thumb")])
+            return True
+
+    # The first photo is already in the library
+    saved = _image(tmp_path, "saved.jpg")
+    library.record_download({"id": "saved"}, saved, "cars")
+    old_thumbnail = QImage.fromData(thumbnails["thumb-old"])
+    library.set_phash(saved, dhash(old_thumbnail))
+
+    monkeypatch.setattr(headless, "UnsplashAPI", FakeAPI)
+    monkeypatch.setattr(headless, "wallpaper_candidates", lambda photos, sizes: list(photos))
+    monkeypatch.setattr(headless, "photo_file_path", lambda photo: str(tmp_path / f"{photo['id']}.png"))
+    monkeypatch.setattr(headless, "get_photo_index", lambda: type("Index", (), {"add": lambda *args: None})())
+
+    path = headless.download_random_photo("cars")
+    assert path == str(tmp_path / "new.png")
+    new_thumbnail = QImage.fromData(thumbnails["thumb-new"])
+    assert library.phashes()[path] == dhash(new_thumbnail)
+    assert library.get(path).query == "cars"
+    assert path in get_stats_store()
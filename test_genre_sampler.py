@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Genre sampler tests: the Fenwick tree of weights and the feedback-driven draws.
+"""
+
+import os
+import sys
+import random
+from collections import Counter
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from wallpaper_changer.utils.genre_sampler import FenwickTree, GenreSampler
+from wallpaper_changer.utils.library import WallpaperLibrary
+
+
+@pytest.fixture
+def library(tmp_path):
+    library = WallpaperLibrary(str(tmp_path / "library.sqlite3"))
+    yield library
+    library.close()
+
+
+def test_fenwick_prefix_sums_follow_updates():
+    """total() and find() agree with a plain prefix sum after point updates."""
+    rng = random.Random(7)
+    weights = [rng.uniform(0.1, 10) for _ in range(37)]
+    tree = FenwickTree(weights)
+    for _ in range(50):
+        position = rng.randrange(len(weights))
+        weights[position] = rng.uniform(0.1, 10)
+        tree.set(position, weights[position])
+
+    assert tree.total() == pytest.approx(sum(weights))
+    cumulative = 0.0
+    for position, weight in enumerate(weights):
+        assert tree[position] == weight
+        assert tree.find(cumulative + weight / 2) == position
+        cumulative += weight
+
+
+def test_fenwick_skips_zero_weights():
+    """Positions without weight are never found."""
+    tree = FenwickTree([0.0, 2.0, 0.0, 0.0, 3.0])
+    found = {tree.find(value / 10) for value in range(50)}
+    assert found == {1, 4}
+
+
+def test_draws_follow_feedback(library):
+    """A favourite genre is drawn more often than one that was skipped."""
+    sampler = GenreSampler(["liked", "neutral", "skipped"], library)
+    for _ in range(2):
+        sampler.record("liked", "favourite")
+        sampler.record("skipped", "skip")
+    sampler.record("custom query", "apply")  # Not a sampled genre; ignored
+
+    random.seed(3)
+    counts = Counter(sampler._draw(now=0.0) for _ in range(3000))
+    assert counts["liked"] > counts["neutral"] > counts["skipped"]
+
+
+def test_recent_picks_are_suppressed(library):
+    """A genre picked a moment ago rarely comes up again right away."""
+    sampler = GenreSampler(["a", "b"], library)
+    picked = sampler.pick(now=1000.0)
+
+    random.seed(5)
+    repeats = sum(sampler._draw(now=1001.0) == picked for _ in range(500))
+    assert repeats < 50
+
+
+def test_feedback_is_shared_through_the_library(library):
+    """A new sampler starts from the scores stored by an earlier one."""
+    GenreSampler(["a", "b"], library).record("a", "favourite")
+    reloaded = GenreSampler(["a", "b"], library)
+    assert reloaded._tree[0] > reloaded._tree[1]
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Image statistics tests: the computed columns, the store and selection by look.
+"""
+
+import os
+import sys
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from wallpaper_changer.utils.image_stats import (
+    GRID_SIZE, HISTOGRAM_BINS, ImageStatsStore, analyze_library, compute_stats
+)
+from wallpaper_changer.utils.library import WallpaperLibrary
+from wallpaper_changer.utils.selection import SelectionCriteria
+
+RED = (200, 30, 30)
+BLUE = (20, 40, 220)
+
+
+def _grid(color, second=None):
+    """Grid of one colour, or with its right half in a second colour."""
+    grid = np.zeros((GRID_SIZE, GRID_SIZE, 3), dtype=np.uint8)
+    grid[:, :] = color
+    if second is not None:
+        grid[:, GRID_SIZE // 2:] = second
+    return grid
+
+
+@pytest.fixture
+def library(tmp_path):
+    library = WallpaperLibrary(str(tmp_path / "library.sqlite3"))
+    yield library
+    library.close()
+
+
+def _store(library, grids):
+    """Store with one library wallpaper per grid, named after its key."""
+    paths = [f"/wallpapers/{name}.jpg" for name in grids]
+    for path in paths:
+        library.record_download({"id": path}, path, "test")
+    store = ImageStatsStore(library)
+    store.add(paths, compute_stats(np.stack(list(grids.values()))))
+    return store
+
+
+def test_compute_stats():
+    stats = compute_stats(np.stack([_grid((0, 0, 0)), _grid((255, 255, 255), second=(0, 0, 0)), _grid(RED)]))
+    red_luma = (0.2126 * RED[0] + 0.7152 * RED[1] + 0.0722 * RED[2]) / 255
+    assert stats["brightness"].tolist() == pytest.approx([0.0, 0.5, red_luma], abs=1e-3)
+    assert stats["contrast"].tolist() == pytest.approx([0.0, 0.5, 0.0], abs=1e-3)
+    assert stats["histogram"].shape == (3, HISTOGRAM_BINS)
+    assert stats["histogram"][1, 0] == stats["histogram"][1, -1] == 0.5
+    assert tuple(stats["colors"][2, 0]) == RED
+    assert stats["color_weights"][2, 0] == 1.0
+
+
+def test_select_by_brightness_and_accent(library):
+    store = _store(library, {
+        "night": _grid((10, 10, 20)),
+        "red": _grid(RED),
+        "blue": _grid(BLUE),
+        "mixed": _grid((240, 240, 240), second=BLUE),
+    })
+    assert store.select(SelectionCriteria()) == [f"/wallpapers/{name}.jpg" for name in ("night", "red", "blue", "mixed")]
+    assert store.select(SelectionCriteria(max_brightness=0.2)) == ["/wallpapers/night.jpg", "/wallpapers/blue.jpg"]
+    assert store.select(SelectionCriteria(accent_color=BLUE)) == ["/wallpapers/blue.jpg", "/wallpapers/mixed.jpg"]
+    assert store.select(SelectionCriteria(max_brightness=0.2, accent_color=BLUE)) == ["/wallpapers/blue.jpg"]
+    assert store.select(SelectionCriteria(accent_color=(0, 255, 0))) == []
+
+
+def test_store_replaces_and_follows_the_library(library):
+    """Statistics round-trip through the library and go with its wallpapers."""
+    store = _store(library, {"a": _grid(RED), "b": _grid(BLUE)})
+    store.add(["/wallpapers/a.jpg", "/wallpapers/unknown.jpg"], compute_stats(np.stack([_grid(BLUE), _grid(RED)])))
+
+    assert len(store) == 2
+    assert tuple(store.get("/wallpapers/a.jpg")["colors"][0]) == BLUE
+    assert store.get("/wallpapers/unknown.jpg") is None
+    library.remove("/wallpapers/b.jpg")
+    assert "/wallpapers/b.jpg" not in store
+    assert library.unanalyzed_paths() == []
+
+
+def test_processes_share_statistics(tmp_path):
+    """Two processes adding statistics (the GUI and the daemon) don't lose each other's rows."""
+    path = str(tmp_path / "library.sqlite3")
+    gui, daemon = WallpaperLibrary(path), WallpaperLibrary(path)
+    try:
+        gui_store = _store(gui, {"gui": _grid(RED)})
+        assert len(gui_store) == 1
+        _store(daemon, {"daemon": _grid(BLUE)})
+        gui_store.add(["/wallpapers/gui.jpg"], compute_stats(np.stack([_grid((5, 5, 5))])))
+
+        for store in (gui_store, ImageStatsStore(daemon)):
+            assert store.select(SelectionCriteria(accent_color=BLUE)) == ["/wallpapers/daemon.jpg"]
+            assert store.select(SelectionCriteria(max_brightness=0.1)) == ["/wallpapers/gui.jpg"]
+    finally:
+        gui.close()
+        daemon.close()
+
+
+def test_analyze_library(tmp_path):
+    """Library wallpapers are decoded and stored once; unreadable files are skipped."""
+    pytest.importorskip("PyQt5")
+    from PyQt5.QtGui import QColor, QImage
+
+    library = WallpaperLibrary(str(tmp_path / "library.sqlite3"))
+    store = ImageStatsStore(library)
+    try:
+        for name, color in (("dark", (5, 5, 5)), ("red", RED)):
+            image = QImage(200, 100, QImage.Format_RGB32)
+            image.fill(QColor(*color))
+            path = str(tmp_path / f"{name}.png")
+            assert image.save(path)
+            library.record_download({"id": name}, path, "test")
+        broken = tmp_path / "broken.jpg"
+        broken.write_bytes(b"not an image")
+        library.record_download({"id": "broken"}, str(broken), "test")
+
+        assert analyze_library(store=store, batch_size=2) == 2
+        assert store.select(SelectionCriteria(max_brightness=0.1)) == [str(tmp_path / "dark.png")]
+        assert store.select(SelectionCriteria(accent_color=RED)) == [str(tmp_path / "red.png")]
+        assert analyze_library(library, store) == 0  # Only the unreadable file is left, and still fails
+    finally:
+        library.close()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Import-time budget tests.
+
+Keeps cold start of both the headless CLI and the GUI fast as features are
+added. Run with pytest or directly for a per-module breakdown.
+"""
+
+import os
+import sys
+import subprocess
+import tempfile
+import importlib.util
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from wallpaper_changer.importtime import IMPORT_BUDGETS_MS, measure_imports, cumulative_ms, print_report
+
+
+def _imports_qt(module: str) -> bool:
+    """Check in a fresh interpreter whether importing a module loads PyQt5."""
+    code = f"import sys, {module}; print(any(m.startswith('PyQt5') for m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return result.stdout.strip() == "True"
+
+
+def test_headless_import_budget():
+    """The headless path stays within its import-time budget."""
+    module = "wallpaper_changer.headless"
+    total = cumulative_ms(measure_imports(module), module)
+    assert total is not None, f"{module} was not measured"
+    assert total <= IMPORT_BUDGETS_MS[module], f"{module} took {total:.1f} ms to import"
+
+
+def test_headless_does_not_import_qt():
+    """Neither the headless path nor the package __init__s pull in PyQt5."""
+    for module in ("wallpaper_changer.headless", "wallpaper_changer.gui", "wallpaper_changer.workers"):
+        assert not _imports_qt(module), f"importing {module} loaded PyQt5"
+
+
+def test_gui_import_budget():
+    """The GUI main window stays within its import-time budget."""
+    if importlib.util.find_spec("PyQt5") is None:
+        return
+    module = "wallpaper_changer.gui.main_window"
+    total = cumulative_ms(measure_imports(module), module)
+    assert total is not None, f"{module} was not measured"
+    assert total <= IMPORT_BUDGETS_MS[module], f"{module} took {total:.1f} ms to import"
+
+
+def test_config_import_has_no_side_effects():
+    """Importing the configuration doesn't create directories."""
+    with tempfile.TemporaryDirectory() as home:
+        env = dict(os.environ, HOME=home, USERPROFILE=home)
+        subprocess.run([sys.executable, "-c", "import wallpaper_changer.config"], env=env, check=True)
+        assert os.listdir(home) == []
+
+
+if __name__ == "__main__":
+    print("⏱️  Import Time Report")
+    print("=" * 50)
+
+    failures = 0
+    for module in IMPORT_BUDGETS_MS:
+        failures += print_report(module, top=10)
+        print()
+
+    sys.exit(1 if failures else 0)
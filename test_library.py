@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Wallpaper library tests: recording, ordering, syncing with the directory and
+sharing the database between connections.
+"""
+
+import os
+import sys
+import sqlite3
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from wallpaper_changer.utils.library import WallpaperLibrary
+
+PHOTO = {"id": "abc", "width": 3840, "height": 2160, "color": "#102030", "user": {"name": "Ada"}}
+
+
+@pytest.fixture
+def library(tmp_path):
+    library = WallpaperLibrary(str(tmp_path / "library.sqlite3"))
+    yield library
+    library.close()
+
+
+def _file(directory, name: str, size: int = 4) -> str:
+    path = os.path.join(str(directory), name)
+    with open(path, "wb") as file:
+        file.write(b"x" * size)
+    return path
+
+
+def test_record_download_and_apply(library, tmp_path):
+    path = _file(tmp_path, "abc_1.jpg", size=10)
+    library.record_download(PHOTO, path, "cars")
+
+    entry = library.get(path)
+    assert (entry.photo_id, entry.query, entry.author, entry.width, entry.height) == ("abc", "cars", "Ada", 3840, 2160)
+    assert (entry.file_size, entry.color, entry.apply_count, entry.last_applied) == (10, "#102030", 0, None)
+    assert library.has_photo("abc") and not library.has_photo("other")
+
+    library.record_applied(path, applied_at=100.0)
+    library.record_applied(path, applied_at=200.0)
+    library.record_applied(str(tmp_path / "picked by hand.jpg"))
+    entry = library.get(path)
+    assert (entry.apply_count, entry.last_applied) == (2, 200.0)
+    assert library.count() == 1
+
+
+def test_orderings(library, monkeypatch):
+    """Pages are newest first; rotation candidates least recently applied first."""
+    clock = iter(range(1, 100))
+    monkeypatch.setattr("wallpaper_changer.utils.library.time.time", lambda: float(next(clock)))
+    for name, query in (("a", "Cars"), ("b", "space"), ("c", "cars"), ("d", "cars")):
+        library.record_download({"id": name}, f"/wallpapers/{name}.jpg", query)
+    library.record_applied("/wallpapers/a.jpg", applied_at=50.0)
+    library.record_applied("/wallpapers/c.jpg", applied_at=40.0)
+
+    def names(entries):
+        return [os.path.basename(entry.path)[0] for entry in entries]
+
+    assert names(library.recent()) == ["d", "c", "b", "a"]
+    assert names(library.recent(2, offset=1)) == ["c", "b"]
+    assert names(library.by_query("CARS")) == ["d", "c", "a"]
+    assert names(library.least_recently_applied()) == ["b", "d", "c", "a"]
+    assert library.applied_times()["/wallpapers/a.jpg"] == 50.0
+
+    library.record_download({"id": "b"}, "/wallpapers/b2.jpg", "space")
+    assert [entry.path for entry in library.find_photo("b")] == ["/wallpapers/b2.jpg", "/wallpapers/b.jpg"]
+
+
+def test_sync_directory(library, tmp_path):
+    """Files on disk are added and entries of deleted files dropped, within the directory only."""
+    downloads = tmp_path / "downloads"
+    downloads.mkdir()
+    kept = _file(downloads, "kept_1.jpg")
+    gone = _file(downloads, "gone_2.jpg")
+    library.record_download({"id": "kept"}, kept)
+    library.record_download({"id": "gone"}, gone)
+    library.record_download({"id": "elsewhere"}, str(tmp_path / "elsewhere.jpg"))
+    os.remove(gone)
+    old = _file(downloads, "photo-id_1700000000.png", size=7)
+    _file(downloads, "notes.txt")
+
+    assert library.sync_directory(str(downloads)) == {"added": 1, "removed": 1}
+    assert library.get(gone) is None
+    assert library.get(str(tmp_path / "elsewhere.jpg")) is not None
+    entry = library.get(old)
+    assert (entry.photo_id, entry.file_size) == ("photo-id", 7)
+    assert library.sync_directory(str(downloads)) == {"added": 0, "removed": 0}
+    assert library.sync_directory(str(tmp_path / "missing")) == {"added": 0, "removed": 0}
+
+
+def test_phashes_round_trip(library):
+    """Hashes with the top bit set survive SQLite's signed integers."""
+    library.record_download({"id": "a"}, "/wallpapers/a.jpg")
+    library.record_download({"id": "b"}, "/wallpapers/b.jpg")
+    library.set_phash("/wallpapers/a.jpg", 2 ** 64 - 1)
+    assert library.phashes() == {"/wallpapers/a.jpg": 2 ** 64 - 1}
+    assert library.unhashed_paths() == ["/wallpapers/b.jpg"]
+
+
+def test_genre_scores_decay(library):
+    assert library.adjust_genre_score("cars", 4.0, half_life_s=10, now=1000.0) == 4.0
+    assert library.adjust_genre_score("cars", 1.0, half_life_s=10, now=1010.0) == pytest.approx(3.0)
+    library.mark_genre_picked("cars", now=1012.0)
+    stat = library.genre_stats()["cars"]
+    assert (stat.score, stat.updated_at, stat.last_picked) == (pytest.approx(3.0), 1010.0, 1012.0)
+
+
+def test_database_is_shared(tmp_path):
+    """The database uses WAL, so another connection sees writes at once, and reopening keeps them."""
+    path = str(tmp_path / "library.sqlite3")
+    first, second = WallpaperLibrary(path), WallpaperLibrary(path)
+    try:
+        (mode,) = sqlite3.connect(path).execute("PRAGMA journal_mode").fetchone()
+        assert mode == "wal"
+        version = second.data_version()
+        first.record_download({"id": "a"}, "/wallpapers/a.jpg")
+        assert second.get("/wallpapers/a.jpg") is not None
+        assert second.data_version() != version
+    finally:
+        first.close()
+        second.close()
+
+    reopened = WallpaperLibrary(path)
+    try:
+        assert reopened.count() == 1
+    finally:
+        reopened.close()
+
+
+def test_memory_database():
+    library = WallpaperLibrary(":memory:")
+    library.record_download({"id": "a"}, "/wallpapers/a.jpg")
+    assert library.count() == 1
+    library.close()
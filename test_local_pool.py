@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Offline rotation tests: the weighted shuffle, no-repeat picks and atomic downloads.
+"""
+
+import os
+import sys
+import random
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+import requests
+
+from wallpaper_changer.api.unsplash import UnsplashAPI
+from wallpaper_changer.config import LOCAL_POOL_MAX_AGE_HOURS
+from wallpaper_changer.utils.library import WallpaperLibrary
+from wallpaper_changer.utils.local_pool import LocalPool
+
+NOW = 1_800_000_000.0
+
+
+@pytest.fixture
+def library(tmp_path):
+    library = WallpaperLibrary(str(tmp_path / "library.sqlite3"))
+    yield library
+    library.close()
+
+
+def _download(library, directory, name: str) -> str:
+    """Record a downloaded wallpaper whose file exists."""
+    path = os.path.join(str(directory), name)
+    with open(path, "wb") as file:
+        file.write(b"\xff\xd8\xff\xd9")
+    library.record_download({"id": name}, path, "cars")
+    return path
+
+
+def test_shuffle_orders_every_path():
+    candidates = {f"{i}.jpg": None for i in range(20)}
+    assert sorted(LocalPool.shuffle(candidates, now=NOW)) == sorted(candidates)
+    assert LocalPool.shuffle({}, now=NOW) == []
+
+
+def test_shuffle_avoids_first():
+    """The path to avoid is moved to the end if it comes up first."""
+    random.seed(1)
+    for _ in range(50):
+        order = LocalPool.shuffle({"a.jpg": None, "b.jpg": None}, avoid_first="a.jpg", now=NOW)
+        assert order[0] == "b.jpg"
+    assert LocalPool.shuffle({"a.jpg": None}, avoid_first="a.jpg", now=NOW) == ["a.jpg"]
+
+
+def test_shuffle_prefers_long_unseen():
+    """Wallpapers applied long ago (or never) usually come before recent ones."""
+    candidates = {
+        "recent.jpg": NOW - 60,
+        "old.jpg": NOW - LOCAL_POOL_MAX_AGE_HOURS * 3600,
+        "never.jpg": None,
+    }
+    random.seed(2)
+    last = [LocalPool.shuffle(candidates, now=NOW)[-1] for _ in range(500)]
+    assert last.count("recent.jpg") > 400
+
+
+def test_next_wallpaper_has_no_repeats(library, tmp_path):
+    """Every wallpaper is picked once before any repeats, missing files skipped."""
+    paths = [_download(library, tmp_path, f"{i}.jpg") for i in range(6)]
+    os.remove(paths[-1])
+    pool = LocalPool(library, str(tmp_path / "pool.json"))
+
+    first_round = [pool.next_wallpaper() for _ in range(5)]
+    assert sorted(first_round) == sorted(paths[:-1])
+
+    # The order is persisted, and a new round doesn't start with the last pick
+    second_pick = LocalPool(library, str(tmp_path / "pool.json")).next_wallpaper()
+    assert second_pick in paths[:-1] and second_pick != first_round[-1]
+
+
+def test_next_wallpaper_without_downloads(library, tmp_path, monkeypatch):
+    monkeypatch.setattr(library, "sync_directory", lambda: 0)
+    assert LocalPool(library, str(tmp_path / "pool.json")).next_wallpaper() is None
+
+
+class _Response:
+    """Streamed response that fails or aborts partway through."""
+
+    headers = {"content-length": "4096"}
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        yield b"x" * chunk_size
+        if self.fail:
+            raise requests.ConnectionError("connection reset")
+        yield b"x" * chunk_size
+
+
+def test_download_is_atomic(tmp_path, monkeypatch):
+    """A failed or aborted download leaves neither the image nor a partial file."""
+    path = str(tmp_path / "photo.jpg")
+    api = UnsplashAPI()
+
+    monkeypatch.setattr(requests, "get", lambda *args, **kwargs: _Response(fail=True))
+    assert not api.download_photo("https://example.com/photo", path)
+    chunks = iter([False, True])
+    monkeypatch.setattr(requests, "get", lambda *args, **kwargs: _Response())
+    assert not api.download_photo("https://example.com/photo", path, should_abort=lambda: next(chunks))
+    assert os.listdir(str(tmp_path)) == []
+
+    assert api.download_photo("https://example.com/photo", path)
+    assert os.listdir(str(tmp_path)) == ["photo.jpg"]
+    assert os.path.getsize(path) == 2048
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Memory budget tests: least-recently-shown eviction across image caches.
+"""
+
+import os
+import sys
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from wallpaper_changer.utils.image_cache import ImageCache
+from wallpaper_changer.utils.memory_budget import MemoryBudget, image_nbytes, payload_nbytes
+
+
+def _tracker(budget, evicted):
+    """Track images of a given size, noting which ones get evicted."""
+    def track(key: str, nbytes: int, subsystem: str = "previews"):
+        budget.track(subsystem, key, nbytes, lambda: evicted.append(key))
+    return track
+
+
+def test_least_recently_shown_is_evicted():
+    budget, evicted = MemoryBudget(cap_bytes=300), []
+    track = _tracker(budget, evicted)
+    track("a", 100)
+    track("b", 100)
+    track("c", 100)
+    budget.touch("previews", "a")
+    track("d", 100)
+
+    assert evicted == ["b"]
+    assert budget.image_bytes == 300
+    assert budget.evictions == 1
+
+
+def test_retracking_replaces_the_size():
+    budget, evicted = MemoryBudget(cap_bytes=300), []
+    track = _tracker(budget, evicted)
+    track("a", 100)
+    track("a", 250)
+    assert budget.image_bytes == 250
+    assert evicted == []
+
+
+def test_oversized_image_is_kept_alone():
+    """An image larger than the cap evicts the others but stays itself."""
+    budget, evicted = MemoryBudget(cap_bytes=300), []
+    track = _tracker(budget, evicted)
+    track("a", 100)
+    track("b", 100)
+    track("huge", 1000)
+    assert evicted == ["a", "b"]
+    assert budget.usage() == {"previews": 1000}
+
+
+def test_released_images_free_room():
+    budget, evicted = MemoryBudget(cap_bytes=300), []
+    track = _tracker(budget, evicted)
+    track("a", 200)
+    budget.release("previews", "a")
+    budget.release("previews", "unknown")
+    track("b", 200)
+    assert evicted == []
+    assert budget.image_bytes == 200
+
+
+def test_no_cap_never_evicts():
+    budget, evicted = MemoryBudget(cap_bytes=0), []
+    track = _tracker(budget, evicted)
+    for key in "abcdef":
+        track(key, 10 ** 9)
+    assert evicted == []
+
+
+def test_caches_share_the_budget():
+    """Adding to one cache can evict the least recently used image of another."""
+    budget = MemoryBudget(cap_bytes=300)
+    previews = ImageCache(max_entries=10, budget=budget, name="previews")
+    thumbnails = ImageCache(max_entries=2, budget=budget, name="thumbnails")
+
+    previews.put("p1", b"x" * 100)
+    thumbnails.put("t1", b"x" * 50)
+    thumbnails.put("t2", b"x" * 50)
+    thumbnails.put("t3", b"x" * 50)  # Over max_entries: t1 dropped by the cache
+    assert budget.usage() == {"previews": 100, "thumbnails": 100}
+
+    thumbnails.get("t2")
+    previews.put("p2", b"x" * 250)
+    assert "p1" not in previews and "t3" not in thumbnails
+    assert "t2" in thumbnails and "p2" in previews
+    assert budget.image_bytes == 300
+
+    previews.clear()
+    assert budget.usage() == {"thumbnails": 50}
+
+
+def test_sources_are_reported_with_images():
+    budget = MemoryBudget(cap_bytes=300)
+    budget.track("previews", "a", 100, lambda: None)
+    budget.add_source("previews", lambda: 20)
+    budget.add_source("photos", lambda: 1 // 0)  # Failing sources are left out
+    assert budget.usage() == {"previews": 120}
+    budget.remove_source("previews")
+    assert budget.usage() == {"previews": 100}
+    assert budget.summary_lines()[-1].endswith("0 evicted")
+
+
+def test_sizes():
+    assert image_nbytes(b"abc") == 3
+    assert image_nbytes(None) == 0
+    shared = {"urls": {"small": "https://example.com/small"}}
+    alone = payload_nbytes(shared)
+    assert payload_nbytes([shared, shared]) < 2 * alone
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Metrics registry tests: counter, gauge and histogram semantics and the
+JSON and Prometheus exports.
+"""
+
+import os
+import sys
+import json
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from wallpaper_changer.utils.metrics import LATENCY_BUCKETS, MetricsRegistry, read_exports, summary_lines
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry(enabled=True, role="test")
+
+
+def _series(registry, name, **labels):
+    return next(entry for entry in registry.snapshot() if entry["name"] == name and entry["labels"] == labels)
+
+
+def test_counters_and_gauges(registry):
+    """Counters add up per label set; gauges are set or adjusted."""
+    registry.count("requests_total", outcome="ok")
+    registry.count("requests_total", 2, outcome="ok")
+    registry.count("requests_total", outcome="error")
+    registry.set_gauge("workers", 5)
+    registry.add_gauge("workers", -2)
+
+    assert _series(registry, "requests_total", outcome="ok")["value"] == 3
+    assert _series(registry, "requests_total", outcome="error")["value"] == 1
+    assert _series(registry, "workers")["value"] == 3
+    assert _series(registry, "requests_total", outcome="ok")["kind"] == "counter"
+
+
+def test_histogram_buckets_and_quantiles(registry):
+    for _ in range(50):
+        registry.observe("fetch_seconds", 0.001)
+    for _ in range(50):
+        registry.observe("fetch_seconds", 0.24)
+    registry.observe("slow_seconds", 60.0)
+
+    entry = _series(registry, "fetch_seconds")
+    assert (entry["count"], entry["max"], entry["last"]) == (100, 0.24, 0.24)
+    assert entry["sum"] == pytest.approx(12.05)
+    assert entry["buckets"]["0.005"] == 50 and entry["buckets"]["0.25"] == 50
+    assert sum(entry["buckets"].values()) == 100
+    # Interpolated within the bucket holding the rank
+    assert entry["p50"] == pytest.approx(0.005)
+    assert entry["p95"] == pytest.approx(0.1 + 0.15 * 45 / 50)
+
+    slow = _series(registry, "slow_seconds")
+    assert slow["buckets"]["+Inf"] == 1
+    # The +Inf bucket interpolates up to the largest value seen
+    assert slow["p95"] == pytest.approx(LATENCY_BUCKETS[-1] + (60.0 - LATENCY_BUCKETS[-1]) * 0.95)
+
+
+def test_bucket_bounds_are_inclusive(registry):
+    registry.observe("edge_seconds", LATENCY_BUCKETS[0])
+    assert _series(registry, "edge_seconds")["buckets"][str(LATENCY_BUCKETS[0])] == 1
+
+
+def test_timed_records_exceptions(registry):
+    with pytest.raises(ValueError):
+        with registry.timed("step_seconds", step="decode"):
+            raise ValueError("bad image")
+    assert _series(registry, "step_seconds", step="decode")["count"] == 1
+
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry(enabled=False)
+    registry.count("requests_total")
+    registry.set_gauge("workers", 1)
+    registry.observe("fetch_seconds", 1.0)
+    with registry.timed("step_seconds"):
+        pass
+    assert registry.snapshot() == []
+    assert registry.export() is None
+
+
+def test_prometheus_format(registry):
+    registry.count("requests_total", outcome='said "no"\\\nagain')
+    registry.observe("fetch_seconds", 0.02)
+
+    lines = registry.to_prometheus().splitlines()
+    assert lines[0] == "# TYPE pixeldrive_fetch_seconds histogram"
+    assert 'pixeldrive_fetch_seconds_bucket{role="test",le="0.01"} 0' in lines
+    assert 'pixeldrive_fetch_seconds_bucket{role="test",le="0.025"} 1' in lines
+    assert 'pixeldrive_fetch_seconds_bucket{role="test",le="+Inf"} 1' in lines
+    assert 'pixeldrive_fetch_seconds_sum{role="test"} 0.02' in lines
+    assert 'pixeldrive_fetch_seconds_count{role="test"} 1' in lines
+    assert "# TYPE pixeldrive_requests_total counter" in lines
+    # Backslashes, quotes and newlines in label values are escaped
+    assert lines[-1] == 'pixeldrive_requests_total{role="test",outcome="said \\"no\\"\\\\\\nagain"} 1'
+
+
+def test_export_and_read_back(registry, tmp_path):
+    registry.count("requests_total")
+    path = registry.export(str(tmp_path))
+    assert path == str(tmp_path / "test.json")
+    assert (tmp_path / "test.prom").read_text(encoding="utf-8") == registry.to_prometheus()
+
+    [document] = read_exports(str(tmp_path))
+    assert (document["role"], document["pid"]) == ("test", os.getpid())
+    assert document["metrics"] == json.loads(json.dumps(registry.snapshot()))
+    assert summary_lines(document["metrics"])[0].split() == ["requests_total", "1"]
+    assert read_exports(str(tmp_path / "missing")) == []
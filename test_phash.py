@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Perceptual hash tests: dHash, the BK-tree and duplicate grouping.
+"""
+
+import os
+import sys
+import random
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from PyQt5.QtGui import QColor, QImage
+
+from wallpaper_changer.utils.phash import (
+    BKTree, DuplicateIndex, dhash, find_duplicate_groups, hamming_distance
+)
+
+
+def _gradient(width: int, height: int, reverse: bool = False) -> QImage:
+    """Horizontal grey gradient, darkening to the right if reversed."""
+    image = QImage(width, height, QImage.Format_RGB32)
+    for x in range(width):
+        level = 255 * x // (width - 1)
+        if reverse:
+            level = 255 - level
+        for y in range(height):
+            image.setPixelColor(x, y, QColor(level, level, level))
+    return image
+
+
+def _flip(value: int, bits) -> int:
+    """Flip the given bits of a hash."""
+    for bit in bits:
+        value ^= 1 << bit
+    return value
+
+
+def test_dhash_ignores_scale():
+    """A resized copy hashes the same; the mirrored image hashes the opposite."""
+    large, small = dhash(_gradient(180, 120)), dhash(_gradient(45, 30))
+    assert large == small == 2 ** 64 - 1
+    assert dhash(_gradient(180, 120, reverse=True)) == 0
+    assert dhash(QImage()) is None
+
+
+def test_bktree_search_matches_linear_scan():
+    rng = random.Random(11)
+    hashes = {f"image{i}.jpg": rng.getrandbits(64) for i in range(300)}
+    query = next(iter(hashes.values()))
+    hashes["near.jpg"] = _flip(query, [1, 20, 40])
+    tree = BKTree()
+    for path, value in hashes.items():
+        tree.add(value, path)
+
+    expected = sorted(
+        (hamming_distance(query, value), path) for path, value in hashes.items()
+        if hamming_distance(query, value) <= 12
+    )
+    assert tree.search(query, 12) == expected
+    assert (3, "near.jpg") in expected
+    assert len(tree) == len(hashes)
+
+
+def test_bktree_keeps_identical_hashes():
+    tree = BKTree()
+    tree.add(42, "a.jpg")
+    tree.add(42, "b.jpg")
+    assert tree.search(42, 0) == [(0, "a.jpg"), (0, "b.jpg")]
+    assert BKTree().search(42, 64) == []
+
+
+def test_duplicate_index_finds_within_distance():
+    index = DuplicateIndex({"a.jpg": 0}, max_distance=4)
+    index.add(_flip(0, range(10)), "far.jpg")
+    assert index.find(_flip(0, [3, 7])) == [(2, "a.jpg")]
+    assert index.find(_flip(0, range(20, 28))) == []
+    assert len(index) == 2
+
+
+def test_find_duplicate_groups_joins_chains():
+    """Near-duplicates of near-duplicates end up in one group; loners in none."""
+    base = 0x0F0F0F0F0F0F0F0F
+    hashes = {
+        "a.jpg": base,
+        "b.jpg": _flip(base, [0, 1, 2]),
+        "c.jpg": _flip(base, [0, 1, 2, 3, 4, 5]),
+        "d.jpg": ~base & (2 ** 64 - 1),
+        "e.jpg": _flip(~base & (2 ** 64 - 1), [63]),
+        "alone.jpg": 0,
+    }
+    groups = find_duplicate_groups(hashes, max_distance=3)
+    assert [sorted(group) for group in groups] == [["a.jpg", "b.jpg", "c.jpg"], ["d.jpg", "e.jpg"]]
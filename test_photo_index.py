@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Local photo search tests: BM25 ranking, prefix matching and persistence.
+"""
+
+import os
+import sys
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from wallpaper_changer.utils.photo_index import PhotoIndex, tokenize
+
+
+def _photo(photo_id: str, description: str = "", tags=(), author: str = ""):
+    """Build a minimal Unsplash photo record."""
+    return {
+        "id": photo_id,
+        "description": description,
+        "tags": [{"title": tag} for tag in tags],
+        "user": {"name": author},
+    }
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = PhotoIndex(str(tmp_path / "photos.sqlite3"))
+    index.add([
+        _photo("ferrari", "A red ferrari on a mountain road", tags=["car", "red"]),
+        _photo("fern", "Fern leaves in the forest", tags=["plant"]),
+        _photo("beach", "Sunset over the beach, with a red sky", tags=["sunset"]),
+        _photo("portrait", "Portrait of a driver", author="Ferris Bueller"),
+    ], query="cars")
+    yield index
+    index.close()
+
+
+def _ids(photos):
+    return [photo["id"] for photo in photos]
+
+
+def test_tokenize_drops_stopwords():
+    assert tokenize("The Ferrari on a road") == ["ferrari", "road"]
+
+
+def test_search_ranks_by_relevance(index):
+    """A tag match outranks a passing mention, and unmatched photos are left out."""
+    assert _ids(index.search("red", prefix=False)) == ["ferrari", "beach"]
+    assert _ids(index.search("red sunset", prefix=False))[0] == "beach"
+    assert index.search("volcano", prefix=False) == []
+    assert index.search("the of", prefix=False) == []
+
+
+def test_search_matches_last_word_as_prefix(index):
+    """Search-as-you-type: the last word matches longer terms, earlier words don't."""
+    assert set(_ids(index.search("fer"))) == {"ferrari", "fern", "portrait"}
+    assert index.search("fer", prefix=False) == []
+    # Scores add up over the words, so matching both ranks first
+    assert _ids(index.search("red fer"))[0] == "ferrari"
+    assert "fern" not in _ids(index.search("fer red"))
+
+
+def test_search_finds_queries_and_respects_limit(index):
+    """Photos are also found by the query that fetched them."""
+    assert len(index.search("cars", prefix=False)) == 4
+    assert len(index.search("cars", limit=2, prefix=False)) == 2
+
+
+def test_update_replaces_indexed_text(index):
+    """Adding a photo again reindexes it and keeps both of its queries."""
+    index.search("red")  # Loads the in-memory index
+    index.add([_photo("fern", "Fern leaves by a waterfall")], query="nature")
+
+    assert _ids(index.search("waterfall", prefix=False)) == ["fern"]
+    assert index.search("forest", prefix=False) == []
+    assert "fern" in _ids(index.search("cars", prefix=False))
+    assert _ids(index.search("nature", prefix=False)) == ["fern"]
+    assert len(index) == 4
+
+
+def test_index_persists_and_prunes(tmp_path):
+    """Records survive a reopen, and the oldest are dropped past the cap."""
+    path = str(tmp_path / "photos.sqlite3")
+    index = PhotoIndex(path, max_photos=2)
+    index.add([_photo("old", "old lighthouse")])
+    index.add([_photo("mid", "mid lighthouse")])
+    index.add([_photo("new", "new lighthouse")])
+    index.close()
+
+    reopened = PhotoIndex(path, max_photos=2)
+    try:
+        assert len(reopened) == 2
+        assert set(_ids(reopened.search("lighthouse"))) == {"mid", "new"}
+        assert "old" not in reopened._vocabulary
+    finally:
+        reopened.close()
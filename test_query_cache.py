@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Query cache tests: exact, extended and shortened lookups, expiry and eviction.
+"""
+
+import os
+import sys
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from wallpaper_changer.utils import query_cache
+from wallpaper_changer.utils.query_cache import QueryCache, photo_matches
+
+FERRARI = {"id": "ferrari", "description": "Red Ferrari on a race track"}
+FERN = {"id": "fern", "description": "Fern in the rain"}
+FIAT = {"id": "fiat", "description": "Old Fiat parked in Rome"}
+
+
+class Clock:
+    """Stand-in for time.monotonic() that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(query_cache.time, "monotonic", clock)
+    return clock
+
+
+def _ids(photos):
+    return None if photos is None else [photo["id"] for photo in photos]
+
+
+def test_photo_matches_prefix_of_last_term():
+    assert photo_matches(FERRARI, ["red", "fer"])
+    assert not photo_matches(FERRARI, ["red", "blue"])
+    assert photo_matches(FIAT, ["cars"], found_with="cars")
+
+
+def test_exact_lookup_ignores_case_and_stopwords(clock):
+    cache = QueryCache()
+    cache.put("Red cars", [FERRARI, FIAT])
+    assert _ids(cache.lookup("the red  CARS")) == ["ferrari", "fiat"]
+
+
+def test_extended_query_is_narrowed(clock):
+    """Typing further filters the results of the shorter query."""
+    cache = QueryCache()
+    cache.put("f", [FERRARI, FERN, FIAT])
+    assert _ids(cache.lookup("fer")) == ["ferrari", "fern"]
+    assert _ids(cache.lookup("ferrari")) == ["ferrari"]
+    assert cache.lookup("fx") is None
+
+
+def test_shortened_query_uses_longest_related(clock):
+    """Deleting characters answers from the longest cached query that still matches."""
+    cache = QueryCache()
+    cache.put("fer", [FERRARI, FERN])
+    cache.put("ferra", [FERRARI])
+    assert _ids(cache.lookup("ferr")) == ["ferrari"]
+    assert cache.lookup("cars") is None
+
+
+def test_expired_results_are_not_served(clock):
+    cache = QueryCache(ttl_seconds=60)
+    cache.put("fer", [FERRARI, FERN])
+    clock.now += 61
+    assert cache.get("fer") is None
+    assert cache.lookup("ferr") is None
+
+
+def test_least_recently_used_is_evicted(clock):
+    cache = QueryCache(max_entries=2)
+    cache.put("ferrari", [FERRARI])
+    cache.put("fern", [FERN])
+    cache.get("ferrari")
+    cache.put("fiat", [FIAT])
+    assert len(cache) == 2
+    assert cache.get("fern") is None
+    assert _ids(cache.get("ferrari")) == ["ferrari"]
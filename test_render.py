@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Render cache tests: cache keys, pruning of stale renders and rendering to
+the screen layout.
+"""
+
+import os
+import sys
+import time
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from wallpaper_changer.utils.render import APPLIED_RECORD, WallpaperRenderer
+
+SCREENS = [(0, 0, 1920, 1080)]
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(b"source image")
+    return str(path)
+
+
+def _make_renders(cache_dir, count):
+    """Create rendered files, oldest first."""
+    os.makedirs(cache_dir, exist_ok=True)
+    now = time.time()
+    paths = []
+    for index in range(count):
+        path = os.path.join(cache_dir, f"render{index}.jpg")
+        with open(path, "wb") as f:
+            f.write(b"rendered")
+        os.utime(path, (now - 100 + index, now - 100 + index))
+        paths.append(path)
+    return paths
+
+
+def test_cache_path_is_keyed_on_source_size_and_mode(tmp_path, source):
+    """Any change of source, screen layout or render settings gives a new file."""
+    cache_dir = str(tmp_path / "rendered")
+    renderer = WallpaperRenderer("fill", cache_dir=cache_dir)
+    path = renderer.cache_path(source, SCREENS)
+    assert os.path.dirname(path) == cache_dir
+    assert path.endswith(".jpg")
+
+    # Stable for the same inputs, whatever the screen order
+    assert renderer.cache_path(source, SCREENS) == path
+    two_screens = [(0, 0, 1920, 1080), (1920, 0, 2560, 1440)]
+    assert renderer.cache_path(source, two_screens) == renderer.cache_path(source, two_screens[::-1])
+
+    assert renderer.cache_path(source, [(0, 0, 2560, 1440)]) != path
+    assert renderer.cache_path(source, two_screens) != path
+    assert WallpaperRenderer("fit", cache_dir=cache_dir).cache_path(source, SCREENS) != path
+    assert WallpaperRenderer("fill", cache_dir=cache_dir, quality=50).cache_path(source, SCREENS) != path
+
+    other = tmp_path / "other.jpg"
+    other.write_bytes(b"source image")
+    assert renderer.cache_path(str(other), SCREENS) != path
+
+    # Rewriting the source changes its size and modification time
+    with open(source, "wb") as f:
+        f.write(b"edited source image")
+    assert renderer.cache_path(source, SCREENS) != path
+
+
+def test_unknown_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        WallpaperRenderer("stretch", cache_dir=str(tmp_path))
+
+
+def test_prune_removes_oldest_renders(tmp_path):
+    """Only the most recently used renders up to max_files are kept."""
+    cache_dir = str(tmp_path / "rendered")
+    paths = _make_renders(cache_dir, 5)
+    WallpaperRenderer("fill", cache_dir=cache_dir, max_files=2)._prune()
+    assert [os.path.exists(path) for path in paths] == [False, False, False, True, True]
+
+
+def test_prune_keeps_applied_files(tmp_path):
+    """Renders on screen survive pruning however old they are."""
+    cache_dir = str(tmp_path / "rendered")
+    paths = _make_renders(cache_dir, 5)
+    renderer = WallpaperRenderer("fill", cache_dir=cache_dir, max_files=1)
+    outside = str(tmp_path / "photo.jpg")
+    renderer.mark_applied({"desktop": paths[0], "lockscreen": outside})
+    assert os.path.exists(os.path.join(cache_dir, APPLIED_RECORD))
+
+    renderer._prune()
+    assert [os.path.exists(path) for path in paths] == [True, False, False, False, True]
+    assert os.path.exists(os.path.join(cache_dir, APPLIED_RECORD))
+
+    # Once replaced on screen the old render is pruned like any other
+    renderer.mark_applied({"desktop": paths[4]})
+    newer = os.path.join(cache_dir, "newer.jpg")
+    with open(newer, "wb") as f:
+        f.write(b"rendered")
+    renderer._prune()
+    assert [os.path.exists(path) for path in paths] == [False, False, False, False, True]
+    assert os.path.exists(newer)
+
+
+def test_render_writes_and_reuses_cached_file(tmp_path):
+    """Rendering produces the screen-sized file once and reuses it."""
+    pytest.importorskip("PyQt5")
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtGui import QImage
+
+    source = str(tmp_path / "photo.png")
+    image = QImage(400, 300, QImage.Format_RGB32)
+    image.fill(Qt.red)
+    assert image.save(source)
+
+    cache_dir = str(tmp_path / "rendered")
+    renderer = WallpaperRenderer("fill", cache_dir=cache_dir, max_files=1)
+    screens = [(0, 0, 160, 90)]
+    output = renderer.render(source, screens)
+    if output == source:
+        pytest.skip("JPEG image writer not available")
+    assert output == renderer.cache_path(source, screens)
+    assert QImage(output).size().width() == 160
+    assert QImage(output).size().height() == 90
+    assert renderer.render(source, screens) == output
+
+    # No screens, nothing to render to
+    assert renderer.render(source, []) == source
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Daemon schedule tests: cron field parsing and next-run times.
+"""
+
+import os
+import sys
+from datetime import datetime
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from wallpaper_changer.utils.schedule import CronSchedule, IntervalSchedule, next_run
+
+# A Monday
+MONDAY = datetime(2026, 10, 19, 9, 0)
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("*/15 * * * *", datetime(2026, 10, 19, 9, 15)),
+    ("0 8 * * *", datetime(2026, 10, 20, 8, 0)),
+    ("0 8 * * 1", datetime(2026, 10, 26, 8, 0)),
+    ("30 9 * * 1-5", datetime(2026, 10, 19, 9, 30)),
+    ("0 0 1 * *", datetime(2026, 11, 1, 0, 0)),
+    ("0 12 * * 7", datetime(2026, 10, 25, 12, 0)),
+    ("0 0 29 2 *", datetime(2028, 2, 29, 0, 0)),
+])
+def test_cron_next_after(expression, expected):
+    """The next run is the first matching minute after the moment."""
+    assert CronSchedule(expression).next_after(MONDAY) == expected
+
+
+def test_cron_next_after_is_strictly_later():
+    """A moment that matches itself is not returned again."""
+    schedule = CronSchedule("0 9 * * *")
+    assert schedule.next_after(MONDAY) == datetime(2026, 10, 20, 9, 0)
+
+
+def test_cron_restricted_day_fields_match_either():
+    """With both day fields restricted, either one matching is enough."""
+    # The 13th or any Friday: Friday the 23rd comes first
+    assert CronSchedule("0 8 13 * 5").next_after(MONDAY) == datetime(2026, 10, 23, 8, 0)
+
+
+def test_cron_full_range_step_is_unrestricted():
+    """"*/1" covers the whole field, so it behaves like "*"."""
+    assert CronSchedule("0 8 */1 * 1").next_after(MONDAY) == CronSchedule("0 8 * * 1").next_after(MONDAY)
+    assert CronSchedule("0 8 13 * */1").next_after(MONDAY) == datetime(2026, 11, 13, 8, 0)
+
+
+@pytest.mark.parametrize("expression", [
+    "0 8 * *",
+    "60 * * * *",
+    "* 24 * * *",
+    "0 8 0 * *",
+    "0 8 * 13 *",
+    "0 8 * * 8",
+    "*/0 * * * *",
+    "5-1 * * * *",
+    "a * * * *",
+])
+def test_cron_rejects_malformed_expressions(expression):
+    """Malformed fields raise ValueError when the schedule is created."""
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+
+def test_cron_that_never_matches():
+    """An impossible date raises ValueError instead of searching forever."""
+    with pytest.raises(ValueError):
+        CronSchedule("0 0 31 2 *").next_after(MONDAY)
+
+
+def test_interval_schedule():
+    """Interval schedules count from the moment and reject non-positive intervals."""
+    assert IntervalSchedule(90).next_after(MONDAY) == datetime(2026, 10, 19, 10, 30)
+    with pytest.raises(ValueError):
+        IntervalSchedule(0)
+
+
+def test_next_run_takes_the_earliest():
+    """next_run() combines schedules, and has nothing to return without any."""
+    schedules = [IntervalSchedule(120), CronSchedule("30 9 * * *")]
+    assert next_run(schedules, MONDAY) == datetime(2026, 10, 19, 9, 30)
+    assert next_run([], MONDAY) is None
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Screen fit tests: scoring of search results against the screens and ranking.
+"""
+
+import os
+import sys
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from wallpaper_changer.config import FIT_FALLBACK_SCREEN
+from wallpaper_changer.utils import screen_fit
+from wallpaper_changer.utils.screen_fit import (
+    UNKNOWN_FIT, fit_scores, filter_photos, rank_photos, target_sizes, wallpaper_candidates
+)
+
+SCREEN = [(1920, 1080)]
+
+
+def _photo(photo_id: str, width: int = 0, height: int = 0, likes: int = 0):
+    return {"id": photo_id, "width": width, "height": height, "likes": likes}
+
+
+def _ids(photos):
+    return [photo["id"] for photo in photos]
+
+
+UHD = _photo("uhd", 3840, 2160)
+CLASSIC = _photo("classic", 3000, 2000)
+SMALL = _photo("small", 960, 540)
+PORTRAIT = _photo("portrait", 2160, 3840)
+UNKNOWN = {"id": "unknown"}
+
+
+def test_fit_scores():
+    """Crop and upscale both lower the score; missing dimensions score neutral."""
+    scores = fit_scores([UHD, CLASSIC, SMALL, PORTRAIT, UNKNOWN], SCREEN)
+    assert scores.tolist() == pytest.approx([1.0, 1.5 / (16 / 9), 0.5, (9 / 16) / (16 / 9), UNKNOWN_FIT])
+
+
+def test_fit_scores_weight_screens_by_area():
+    """A photo fitting only the larger of two screens scores closer to 1."""
+    square = _photo("square", 4000, 4000)
+    [score] = fit_scores([square], [(1000, 1000), (2000, 1000)])
+    assert score == pytest.approx((1 * 1 + 0.5 * 2) / 3)
+    assert fit_scores([], SCREEN).shape == (0,)
+
+
+def test_rank_photos_drops_poor_fits_and_sorts():
+    ranked = rank_photos([PORTRAIT, SMALL, UNKNOWN, CLASSIC, UHD], SCREEN, min_score=0.4)
+    assert _ids(ranked) == ["uhd", "classic", "small", "unknown"]
+    assert rank_photos([], SCREEN) == []
+
+
+def test_likes_only_break_ties():
+    """Likes reorder photos of the same fit but never rescue a poor one."""
+    liked = _photo("liked", 3840, 2160, likes=500)
+    liked_portrait = _photo("liked portrait", 2160, 3840, likes=5000)
+    ranked = rank_photos([UHD, liked_portrait, liked], SCREEN, min_score=0.4)
+    assert _ids(ranked) == ["liked", "uhd"]
+
+
+def test_filter_photos_keeps_order():
+    photos = [SMALL, PORTRAIT, UHD, UNKNOWN]
+    assert _ids(filter_photos(photos, SCREEN, min_score=0.4)) == ["small", "uhd", "unknown"]
+    assert filter_photos(photos, SCREEN, min_score=0) == photos
+
+
+def test_wallpaper_candidates_fall_back_to_best_poor_fit():
+    """With nothing fitting, the poor fits are tried best first."""
+    panorama = _photo("panorama", 9000, 1000)
+    assert _ids(wallpaper_candidates([panorama, PORTRAIT], SCREEN)) == ["portrait", "panorama"]
+
+
+def test_wallpaper_candidates_only_fitting():
+    candidates = wallpaper_candidates([PORTRAIT, UHD, CLASSIC], SCREEN)
+    assert sorted(_ids(candidates)) == ["classic", "uhd"]
+
+
+def test_target_sizes(monkeypatch):
+    """Screens count separately, or as one area when wallpapers span them."""
+    screens = [(0, 0, 1920, 1080), (1920, 0, 1280, 1024)]
+    monkeypatch.setattr(screen_fit, "RENDER_MODE", "fill")
+    assert target_sizes(screens) == [(1920, 1080), (1280, 1024)]
+    monkeypatch.setattr(screen_fit, "RENDER_MODE", "span")
+    assert target_sizes(screens) == [(3200, 1080)]
+    assert target_sizes([]) == [tuple(FIT_FALLBACK_SCREEN)]
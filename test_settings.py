@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Settings tests: parsing, validation and reloading of the settings file.
+"""
+
+import os
+import sys
+import json
+import threading
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from wallpaper_changer import settings as settings_module
+from wallpaper_changer.config import LIBRARY_DB_NAME, data_path
+from wallpaper_changer.settings import Settings, SettingsStore, parse_settings
+from wallpaper_changer.utils.library import get_library, set_library
+
+
+def _write(path, data):
+    with open(str(path), "w", encoding="utf-8") as file:
+        json.dump(data, file)
+
+
+def test_parse_keeps_defaults_for_missing_and_empty():
+    defaults = Settings.defaults()
+    settings = parse_settings({"genres": [" cars ", "space"], "api_key": "", "unknown": 1})
+    assert settings.genres == ("cars", "space")
+    assert settings.api_key == defaults.api_key
+    assert settings.download_dir == defaults.download_dir
+
+
+@pytest.mark.parametrize("data", [
+    [],
+    {"auto_close_delay_ms": -1},
+    {"auto_close_delay_ms": True},
+    {"auto_close_after_wallpaper": "yes"},
+    {"genres": ["cars", " "]},
+    {"api_key": 42},
+])
+def test_parse_rejects_invalid_values(data):
+    with pytest.raises(ValueError):
+        parse_settings(data)
+
+
+def test_missing_file_uses_defaults(tmp_path):
+    store = SettingsStore(str(tmp_path / "settings.json"))
+    assert store.current == Settings.defaults()
+
+
+def test_reload_reports_changes_to_subscribers(tmp_path):
+    path = tmp_path / "settings.json"
+    _write(path, {"genres": ["cars"]})
+    store = SettingsStore(str(path))
+    calls = []
+    store.subscribe(lambda settings, changed: calls.append((settings.genres, changed)))
+
+    _write(path, {"genres": ["cars", "space"], "auto_close_delay_ms": 1234567})
+    assert store.reload() == {"genres", "auto_close_delay_ms"}
+    assert calls == [(("cars", "space"), {"genres", "auto_close_delay_ms"})]
+    assert store.reload() == set()  # Unchanged file isn't re-read
+
+
+def test_invalid_file_keeps_current_settings(tmp_path):
+    path = tmp_path / "settings.json"
+    _write(path, {"genres": ["cars"]})
+    store = SettingsStore(str(path))
+
+    path.write_text('{"genres": ["space"', encoding="utf-8")
+    assert store.reload() == set()
+    _write(path, {"genres": ["space"], "auto_close_delay_ms": "soon"})
+    assert store.reload() == set()
+    assert store.current.genres == ("cars",)
+
+
+def test_save_merges_and_applies(tmp_path):
+    path = tmp_path / "config" / "settings.json"
+    store = SettingsStore(str(path))
+    assert store.save({"genres": ["cars"]}) == {"genres"}
+    assert store.save({"api_key": "key"}) == {"api_key"}
+    assert json.loads(path.read_text(encoding="utf-8")) == {"genres": ["cars"], "api_key": "key"}
+
+    with pytest.raises(ValueError):
+        store.save({"genres": "cars"})
+    assert store.current.genres == ("cars",)
+
+
+def test_watcher_picks_up_edits(tmp_path):
+    path = tmp_path / "settings.json"
+    store = SettingsStore(str(path), poll_interval=0.01)
+    changed = threading.Event()
+    callback = lambda settings, names: changed.set()
+    store.subscribe(callback)
+    store.start_watching()
+    try:
+        _write(path, {"genres": ["nature"]})
+        assert changed.wait(5)
+        assert store.current.genres == ("nature",)
+    finally:
+        store.stop_watching()
+        store.unsubscribe(callback)
+
+
+def test_data_follows_download_dir(tmp_path, monkeypatch):
+    """The library and caches move with a download directory changed while running."""
+    path = tmp_path / "settings.json"
+    _write(path, {"download_dir": str(tmp_path / "old")})
+    monkeypatch.setattr(settings_module, "_store", SettingsStore(str(path)))
+    set_library(None)
+    try:
+        old_library = get_library()
+        assert old_library.db_path == str(tmp_path / "old" / LIBRARY_DB_NAME)
+
+        _write(path, {"download_dir": str(tmp_path / "new")})
+        settings_module.get_settings_store().reload()
+        assert data_path(LIBRARY_DB_NAME) == str(tmp_path / "new" / LIBRARY_DB_NAME)
+        assert get_library().db_path == data_path(LIBRARY_DB_NAME)
+        assert get_library() is not old_library
+    finally:
+        set_library(None)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+History thumbnail disk cache tests: reuse of stored thumbnails and pruning
+of the least recently used ones.
+"""
+
+import os
+import sys
+import time
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage
+
+from wallpaper_changer.utils.thumbnail_cache import ThumbnailDiskCache
+
+SIZE = (48, 32)
+
+
+def _source(directory, name: str) -> str:
+    path = os.path.join(str(directory), name)
+    image = QImage(480, 320, QImage.Format_RGB32)
+    image.fill(Qt.blue)
+    assert image.save(path, "PNG")
+    return path
+
+
+def _age(path: str, seconds: float):
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def _cached_files(cache):
+    return sorted(name for name in os.listdir(cache.cache_dir) if name.endswith(".jpg"))
+
+
+def test_thumbnail_is_stored_and_reused(tmp_path):
+    """The first load decodes the source; later loads read the stored thumbnail."""
+    cache = ThumbnailDiskCache(str(tmp_path / "thumbnails"))
+    source = _source(tmp_path, "wallpaper.png")
+    image = cache.load(source, SIZE)
+    if image.isNull() or not os.path.exists(cache.cache_path(source, SIZE)):
+        pytest.skip("JPEG image writer not available")
+    assert image.width() <= SIZE[0] and image.height() <= SIZE[1]
+
+    cached_path = cache.cache_path(source, SIZE)
+    _age(cached_path, 100)
+    assert not cache.load(source, SIZE).isNull()
+    assert os.path.getmtime(cached_path) > time.time() - 50  # Marked as recently used
+
+    assert cache.load(str(tmp_path / "missing.png"), SIZE).isNull()
+
+
+def test_prune_keeps_most_recently_used(tmp_path):
+    """Pruning removes the oldest thumbnails beyond max_files."""
+    cache = ThumbnailDiskCache(str(tmp_path / "thumbnails"), max_files=2)
+    os.makedirs(cache.cache_dir)
+    for index, name in enumerate(("a.jpg", "b.jpg", "c.jpg", "d.jpg")):
+        path = os.path.join(cache.cache_dir, name)
+        with open(path, "wb") as file:
+            file.write(b"thumbnail")
+        _age(path, 100 - index)
+    with open(os.path.join(cache.cache_dir, "other.tmp"), "wb") as file:
+        file.write(b"partial")
+
+    assert cache.prune() == 2
+    assert _cached_files(cache) == ["c.jpg", "d.jpg"]
+    assert os.path.exists(os.path.join(cache.cache_dir, "other.tmp"))
+    assert cache.prune() == 0
+
+
+def test_writes_prune_the_cache(tmp_path):
+    """Storing thumbnails keeps the directory within its limit."""
+    cache = ThumbnailDiskCache(str(tmp_path / "thumbnails"), max_files=1)
+    first = _source(tmp_path, "first.png")
+    cache.load(first, SIZE)
+    if not os.path.exists(cache.cache_path(first, SIZE)):
+        pytest.skip("JPEG image writer not available")
+    _age(cache.cache_path(first, SIZE), 10)
+
+    # Thumbnails left behind from an earlier run, older than the new one
+    for name in ("old1.jpg", "old2.jpg"):
+        path = os.path.join(cache.cache_dir, name)
+        with open(path, "wb") as file:
+            file.write(b"thumbnail")
+        _age(path, 100)
+
+    cache._writes = 0  # As in a fresh process
+    second = _source(tmp_path, "second.png")
+    cache.load(second, SIZE)
+    assert _cached_files(cache) == [os.path.basename(cache.cache_path(second, SIZE))]
+
+
+def test_missing_cache_directory_prunes_nothing(tmp_path):
+    assert ThumbnailDiskCache(str(tmp_path / "missing")).prune() == 0
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Tracer tests: span nesting on one thread and across threads, the Chrome
+trace events written for them, and the disabled tracer.
+"""
+
+import os
+import sys
+import json
+import threading
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from wallpaper_changer.utils.tracing import NULL_SPAN, Tracer
+
+
+@pytest.fixture
+def tracer():
+    return Tracer(enabled=True, max_events=100)
+
+
+def _spans(tracer):
+    return {event["name"]: event for event in tracer.to_json()["traceEvents"] if event["ph"] == "X"}
+
+
+def _run_worker(tracer, parent):
+    """Start a child span on another thread the way the workers do."""
+    def run():
+        with tracer.span("worker", parent=parent) as span:
+            with tracer.span("request"):
+                pass
+            span.set("bytes", 42)
+
+    thread = threading.Thread(target=run, name="Worker-1")
+    thread.start()
+    thread.join()
+
+
+def test_nested_spans_on_one_thread(tracer):
+    """Spans started inside another become its children and nest by time."""
+    with tracer.span("outer", query="nature") as outer:
+        assert tracer.current() is outer
+        with tracer.span("inner"):
+            pass
+    assert tracer.current() is None
+
+    spans = _spans(tracer)
+    outer_event, inner_event = spans["outer"], spans["inner"]
+    assert inner_event["args"]["parent_id"] == outer_event["args"]["span_id"]
+    assert "parent_id" not in outer_event["args"]
+    assert outer_event["args"]["query"] == "nature"
+    assert outer_event["ts"] <= inner_event["ts"]
+    assert inner_event["ts"] + inner_event["dur"] <= outer_event["ts"] + outer_event["dur"] + 0.1
+    # Same thread: nesting by time, no flow arrows
+    assert not [event for event in tracer.to_json()["traceEvents"] if event["ph"] in ("s", "f")]
+
+
+def test_spans_across_threads(tracer):
+    """A span handed to a thread parents its spans and is linked by a flow."""
+    with tracer.span("auto_change") as parent:
+        _run_worker(tracer, parent)
+
+    spans = _spans(tracer)
+    parent_event, worker_event, request_event = spans["auto_change"], spans["worker"], spans["request"]
+    assert worker_event["args"]["parent_id"] == parent_event["args"]["span_id"]
+    assert request_event["args"]["parent_id"] == worker_event["args"]["span_id"]
+    assert worker_event["args"]["bytes"] == 42
+    assert worker_event["tid"] != parent_event["tid"]
+    assert request_event["tid"] == worker_event["tid"]
+
+    # One flow pair, from the parent's thread to the worker's, sharing an id
+    events = tracer.to_json()["traceEvents"]
+    start = [event for event in events if event["ph"] == "s"]
+    finish = [event for event in events if event["ph"] == "f"]
+    assert len(start) == len(finish) == 1
+    assert start[0]["id"] == finish[0]["id"] == worker_event["args"]["span_id"]
+    assert start[0]["tid"] == parent_event["tid"]
+    assert finish[0]["tid"] == worker_event["tid"]
+    assert finish[0]["bp"] == "e"
+
+    names = {event["tid"]: event["args"]["name"] for event in events if event["ph"] == "M"}
+    assert names[worker_event["tid"]] == "Worker-1"
+
+
+def test_use_makes_a_kept_span_current(tracer):
+    """use() parents spans under a span kept across callbacks without ending it."""
+    kept = tracer.span("change")
+    with tracer.use(kept):
+        with tracer.span("apply"):
+            pass
+    assert tracer.current() is None
+    assert "change" not in _spans(tracer)
+    kept.end(outcome="ok")
+    kept.end(outcome="again")  # Later calls are ignored
+
+    spans = _spans(tracer)
+    assert spans["apply"]["args"]["parent_id"] == spans["change"]["args"]["span_id"]
+    assert spans["change"]["args"]["outcome"] == "ok"
+    assert len([event for event in tracer.to_json()["traceEvents"] if event["ph"] == "X"]) == 2
+
+
+def test_exception_is_recorded(tracer):
+    """A span left by an exception still records, with the error type."""
+    with pytest.raises(ValueError):
+        with tracer.span("failing"):
+            raise ValueError("boom")
+    assert _spans(tracer)["failing"]["args"]["error"] == "ValueError"
+    assert tracer.current() is None
+
+
+def test_to_json_is_valid_trace_event_format(tracer, tmp_path):
+    """The written document is JSON with the fields trace viewers require."""
+    with tracer.span("auto_change") as parent:
+        _run_worker(tracer, parent)
+
+    path = tracer.write(str(tmp_path / "trace.json"))
+    assert path == str(tmp_path / "trace.json")
+    with open(path, encoding="utf-8") as file:
+        document = json.load(file)
+    assert document["displayTimeUnit"] == "ms"
+    events = document["traceEvents"]
+    assert events
+    for event in events:
+        assert event["ph"] in ("X", "s", "f", "M")
+        assert event["pid"] == os.getpid()
+        assert isinstance(event["tid"], int)
+        if event["ph"] == "X":
+            assert event["ts"] >= 0 and event["dur"] >= 0
+        if event["ph"] in ("s", "f"):
+            assert event["ts"] >= 0 and isinstance(event["id"], int)
+    assert not os.path.exists(f"{path}.tmp")
+
+
+def test_oldest_events_are_dropped(tmp_path):
+    """Past max_events only the most recent events are kept."""
+    tracer = Tracer(enabled=True, max_events=3)
+    for index in range(5):
+        with tracer.span(f"step-{index}"):
+            pass
+    assert sorted(_spans(tracer)) == ["step-2", "step-3", "step-4"]
+
+
+def test_disabled_tracer_records_nothing(tmp_path):
+    """Disabled, spans are the shared no-op and nothing is written."""
+    tracer = Tracer(enabled=False)
+    with tracer.span("outer", query="nature") as span:
+        assert span is NULL_SPAN
+        assert not span
+        span.set("bytes", 1)
+        assert tracer.current() is None
+        with tracer.use(span):
+            _run_worker(tracer, tracer.current())
+    assert tracer.to_json()["traceEvents"] == []
+    assert tracer.write(str(tmp_path / "trace.json")) is None
+    assert not os.path.exists(tmp_path / "trace.json")
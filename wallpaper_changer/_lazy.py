@@ -0,0 +1,39 @@
+"""
+Lazy attribute exports for the package ``__init__`` modules.
+
+Each subpackage lists the names it exports and the module defining them;
+a name is imported on first access (PEP 562), so importing a package stays
+cheap and doesn't load PyQt5, NumPy or requests.
+"""
+
+import sys
+import importlib
+from typing import Callable, Dict, List, Tuple
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable, Callable, List[str]]:
+    """
+    Build the module-level ``__getattr__``, ``__dir__`` and ``__all__`` of a package.
+
+    Args:
+        package: ``__name__`` of the package
+        exports: Exported name -> relative module defining it, e.g.
+            ``{"UnsplashAPI": ".unsplash"}``
+
+    Returns:
+        (__getattr__, __dir__, __all__) to assign in the package
+    """
+    names = list(exports)
+
+    def __getattr__(name):
+        if name in exports:
+            value = getattr(importlib.import_module(exports[name], package), name)
+            # Cached on the package, so later lookups don't come back here
+            setattr(sys.modules[package], name, value)
+            return value
+        raise AttributeError(f"module {package!r} has no attribute {name!r}")
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[package])) | set(names))
+
+    return __getattr__, __dir__, names
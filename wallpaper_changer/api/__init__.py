@@ -1,7 +1,13 @@
 """
 API module for Unsplash integration.
+
+Attributes are imported lazily on first access.
 """
 
-from .unsplash import UnsplashAPI
+from wallpaper_changer._lazy import lazy_exports
+
+_EXPORTS = {
+    'UnsplashAPI': '.unsplash',
+}
 
-__all__ = ['UnsplashAPI']
+__getattr__, __dir__, __all__ = lazy_exports(__name__, _EXPORTS)
@@ -1,16 +1,22 @@
 """
 Unsplash API client for fetching photos.
+
+``requests`` is imported inside the methods that use it; it is by far the
+most expensive import of the package and isn't needed until the first call.
 """
 
+import os
+import time
 import logging
-import requests
-from typing import List, Dict, Any, Optional
-from requests.exceptions import RequestException, Timeout, ConnectionError
+from typing import List, Dict, Any, Optional, Callable
 
 from wallpaper_changer.config import (
-    UNSPLASH_API_BASE_URL, HEADERS, DEFAULT_PER_PAGE,
+    UNSPLASH_API_BASE_URL, DEFAULT_PER_PAGE,
     DEFAULT_ORIENTATION, REQUEST_TIMEOUT
 )
+from wallpaper_changer.settings import get_settings
+from wallpaper_changer.utils.metrics import get_metrics
+from wallpaper_changer.utils.tracing import get_tracer
 
 logger = logging.getLogger(__name__)
 
@@ -26,8 +32,34 @@ class UnsplashAPI:
     def __init__(self):
         """Initialize the Unsplash API client."""
         self.base_url = UNSPLASH_API_BASE_URL
-        self.headers = HEADERS
         self.timeout = REQUEST_TIMEOUT
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """Request headers, with the API key from the current settings."""
+        return get_settings().headers
+
+    @staticmethod
+    def _record(endpoint: str, started: float, outcome: str, size: int = 0, span=None):
+        """
+        Record a request's latency, outcome and size in the metrics and trace.
+
+        Args:
+            endpoint: Kind of request, e.g. "search" or "download"
+            started: ``time.perf_counter()`` value when the request began
+            outcome: "ok", "error" or "aborted"
+            size: Bytes received
+            span: Trace span of the request, ended here
+        """
+        if span is not None:
+            span.end(outcome=outcome, bytes=size)
+        metrics = get_metrics()
+        if not metrics.enabled:
+            return
+        metrics.observe("api_request_seconds", time.perf_counter() - started, endpoint=endpoint)
+        metrics.count("api_requests_total", endpoint=endpoint, outcome=outcome)
+        if size:
+            metrics.count("api_received_bytes_total", size, endpoint=endpoint)
     
     def search_photos(
         self, 
@@ -47,8 +79,13 @@ class UnsplashAPI:
             List of photo dictionaries from Unsplash API
             
         Raises:
-            requests.RequestException: If the API request fails
+            UnsplashAPIError: If the API request fails
         """
+        import requests
+        from requests.exceptions import RequestException, Timeout, ConnectionError
+
+        started, outcome, size = time.perf_counter(), "error", 0
+        span = get_tracer().span("search_photos", query=query)
         try:
             url = f"{self.base_url}/search/photos"
             params = {
@@ -66,10 +103,12 @@ class UnsplashAPI:
             )
             response.raise_for_status()
             
+            size = len(response.content)
             data = response.json()
             photos = data.get("results", [])
             
             logger.info(f"Found {len(photos)} photos for query: '{query}'")
+            outcome = "ok"
             return photos
             
         except Timeout as e:
@@ -93,6 +132,8 @@ class UnsplashAPI:
             error_msg = f"Request failed while searching for '{query}': {str(e)}"
             logger.error(error_msg)
             raise UnsplashAPIError(error_msg) from e
+        finally:
+            self._record("search", started, outcome, size, span)
     
     def get_photo_info(self, photo_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -107,6 +148,10 @@ class UnsplashAPI:
         Raises:
             requests.RequestException: If the API request fails
         """
+        import requests
+
+        started, outcome, size = time.perf_counter(), "error", 0
+        span = get_tracer().span("get_photo_info", photo_id=photo_id)
         try:
             url = f"{self.base_url}/photos/{photo_id}"
             
@@ -114,24 +159,41 @@ class UnsplashAPI:
             response = requests.get(url, headers=self.headers, timeout=self.timeout)
             response.raise_for_status()
             
-            return response.json()
+            size = len(response.content)
+            info = response.json()
+            outcome = "ok"
+            return info
             
         except requests.RequestException as e:
             logger.error(f"Failed to get photo info for ID '{photo_id}': {str(e)}")
             raise
+        finally:
+            self._record("photo", started, outcome, size, span)
     
-    def download_photo(self, photo_url: str, file_path: str, progress_callback=None) -> bool:
+    def download_photo(self, photo_url: str, file_path: str, progress_callback=None,
+                       should_abort: Optional[Callable[[], bool]] = None) -> bool:
         """
         Download a photo from Unsplash.
         
+        The photo is written to a temporary file next to ``file_path`` and
+        only moved into place once complete, so an interrupted download never
+        leaves a truncated image behind.
+        
         Args:
             photo_url: URL of the photo to download
             file_path: Local path where to save the photo
             progress_callback: Optional callback function for progress updates
+            should_abort: Optional callable checked between chunks; returning
+                True abandons the download
             
         Returns:
             True if download successful, False otherwise
         """
+        import requests
+
+        started, outcome, downloaded = time.perf_counter(), "error", 0
+        span = get_tracer().span("download_photo", url=photo_url)
+        temp_path = file_path + ".part"
         try:
             logger.info(f"Downloading photo from: {photo_url}")
             response = requests.get(photo_url, stream=True, timeout=self.timeout)
@@ -140,8 +202,12 @@ class UnsplashAPI:
             total_size = int(response.headers.get("content-length", 0))
             downloaded = 0
             
-            with open(file_path, "wb") as file:
+            with open(temp_path, "wb") as file:
                 for chunk in response.iter_content(chunk_size=1024):
+                    if should_abort and should_abort():
+                        logger.info(f"Aborted download of '{photo_url}'")
+                        outcome = "aborted"
+                        return False
                     if chunk:
                         downloaded += len(chunk)
                         file.write(chunk)
@@ -150,7 +216,9 @@ class UnsplashAPI:
                             progress = int((downloaded / total_size) * 100)
                             progress_callback(progress)
             
+            os.replace(temp_path, file_path)
             logger.info(f"Successfully downloaded photo to: {file_path}")
+            outcome = "ok"
             return True
             
         except requests.RequestException as e:
@@ -159,6 +227,13 @@ class UnsplashAPI:
         except IOError as e:
             logger.error(f"Failed to save photo to '{file_path}': {str(e)}")
             return False
+        finally:
+            if outcome != "ok" and os.path.exists(temp_path):
+                try:
+                    os.remove(temp_path)
+                except OSError as e:
+                    logger.warning(f"Failed to remove partial download '{temp_path}': {str(e)}")
+            self._record("download", started, outcome, downloaded, span)
     
     def get_photo_thumbnail(self, thumbnail_url: str) -> Optional[bytes]:
         """
@@ -170,11 +245,62 @@ class UnsplashAPI:
         Returns:
             Thumbnail image data as bytes or None if failed
         """
+        import requests
+
+        started, outcome, size = time.perf_counter(), "error", 0
+        span = get_tracer().span("get_photo_thumbnail", url=thumbnail_url)
         try:
             response = requests.get(thumbnail_url, timeout=5)
             response.raise_for_status()
+            size = len(response.content)
+            outcome = "ok"
             return response.content
             
         except requests.RequestException as e:
             logger.error(f"Failed to get thumbnail from '{thumbnail_url}': {str(e)}")
             return None
+        finally:
+            self._record("thumbnail", started, outcome, size, span)
+    
+    def fetch_image(
+        self,
+        image_url: str,
+        timeout: int = 5,
+        should_abort: Optional[Callable[[], bool]] = None
+    ) -> Optional[bytes]:
+        """
+        Fetch image data, giving up early if the caller no longer needs it.
+        
+        Args:
+            image_url: URL of the image to fetch
+            timeout: Request timeout in seconds
+            should_abort: Optional callable checked between chunks; returning
+                True abandons the transfer
+            
+        Returns:
+            Image data as bytes, or None if the fetch failed or was aborted
+        """
+        import requests
+
+        started, outcome, size = time.perf_counter(), "error", 0
+        span = get_tracer().span("fetch_image", url=image_url)
+        try:
+            with requests.get(image_url, stream=True, timeout=timeout) as response:
+                response.raise_for_status()
+                chunks = []
+                for chunk in response.iter_content(chunk_size=16 * 1024):
+                    if should_abort and should_abort():
+                        logger.debug(f"Aborted fetch of '{image_url}'")
+                        outcome = "aborted"
+                        return None
+                    if chunk:
+                        chunks.append(chunk)
+                        size += len(chunk)
+                outcome = "ok"
+                return b"".join(chunks)
+            
+        except requests.RequestException as e:
+            logger.error(f"Failed to fetch image from '{image_url}': {str(e)}")
+            return None
+        finally:
+            self._record("image", started, outcome, size, span)
@@ -11,18 +11,70 @@ from pathlib import Path
 # Unsplash API Configuration
 API_KEY: str = os.environ.get("UNSPLASH_API_KEY", "APIKEY")
 UNSPLASH_API_BASE_URL: str = "https://api.unsplash.com"
+UNSPLASH_API_VERSION: str = "v1"
 
-# API Headers
-HEADERS = {
-    "Authorization": f"Client-ID {API_KEY}",
-    "Accept-Version": "v1"
-}
+# User settings file, reloaded while the app runs (see settings.py). It can
+# override API_KEY, DOWNLOAD_DIR, GENRES and the AUTO_CLOSE_* values, whose
+# values here are the defaults.
+SETTINGS_PATH: str = os.environ.get("PIXELDRIVE_SETTINGS") or os.path.join(
+    os.environ.get("APPDATA") or os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config"),
+    "pixeldrive", "settings.json"
+)
+SETTINGS_POLL_S: float = 2.0  # Seconds between checks of the settings file for changes
 
 # File and Directory Configuration
 DOWNLOAD_DIR: str = os.path.expanduser("~/OneDrive/Pictures/Unsplash_Wallpapers")
 
-# Ensure download directory exists
-os.makedirs(DOWNLOAD_DIR, exist_ok=True)
+# The library, caches and exports below are kept in the download directory
+# next to the wallpapers. Their names are joined to the directory of the
+# current settings by data_path() where they are used, so they follow a
+# changed download directory.
+
+# Index of downloaded wallpapers (see utils/library.py)
+LIBRARY_DB_NAME: str = ".library.sqlite3"
+
+# Photo records from past searches, searchable offline (see utils/photo_index.py)
+PHOTO_INDEX_NAME: str = ".photos.sqlite3"
+PHOTO_INDEX_MAX_PHOTOS: int = 20000  # Least recently fetched records are dropped past this
+
+# Search-as-you-type
+SEARCH_DEBOUNCE_MS: int = 400  # Typing pause before a search request is sent
+SEARCH_MIN_CHARS: int = 3  # Shorter queries only search on Enter or the Fetch button
+SEARCH_CACHE_SIZE: int = 64  # Recent queries whose results are kept
+SEARCH_CACHE_TTL_S: int = 600  # Age after which cached results are fetched again
+
+# Offline rotation from already-downloaded wallpapers
+OFFLINE_FALLBACK_BUDGET_MS: int = 4000  # Search + download time allowed before using a local wallpaper; 0 waits
+LATE_DOWNLOAD_WAIT_S: float = 30.0  # Time `pixeldrive apply` lets a late download finish before cancelling it
+LOCAL_POOL_STATE_NAME: str = ".local-pool.json"
+LOCAL_POOL_MAX_AGE_HOURS: float = 24 * 30  # Wallpapers unused for this long are the most likely picks
+
+# Near-duplicate detection (perceptual hashes, see utils/phash.py)
+DUPLICATE_MAX_DISTANCE: int = 4  # Differing bits out of 64 still counted as the same picture
+DUPLICATE_MAX_CANDIDATES: int = 5  # Photos checked before an automatic download gives up avoiding duplicates
+
+# Wallpaper selection rules (see utils/selection.py); wallpapers that match are
+# preferred, others are used when nothing matches
+DARK_HOURS = None  # (start hour, end hour) to prefer dark wallpapers, e.g. (20, 7)
+DARK_MAX_BRIGHTNESS: float = 0.35  # Mean luminance (0-1) counted as dark
+ACCENT_COLOR: str = ""  # Prefer wallpapers with this dominant colour, e.g. "#c0392b"
+ACCENT_MAX_DISTANCE: float = 80.0  # RGB distance still counted as the accent colour
+
+# Pre-rendering of wallpapers to the connected screens' exact geometry.
+# One of "fill", "fit" or "span"; leave empty to hand images to the desktop as-is.
+# With several monitors the rendered file covers the whole layout, so the desktop
+# should be set to span the wallpaper across screens.
+RENDER_MODE: str = ""
+RENDER_QUALITY: int = 92  # JPEG quality of rendered wallpapers
+RENDER_CACHE_NAME: str = ".rendered"
+RENDER_CACHE_MAX_FILES: int = 20  # Oldest rendered files beyond this are removed
+
+# Screen-fit filtering of search results before downloading (see utils/screen_fit.py).
+# A photo's fit is the share of it kept when cropped to fill a screen, times a
+# penalty for upscaling, averaged over the screens by area.
+FIT_MIN_SCORE: float = 0.4  # Results below this are skipped; 0 keeps everything
+FIT_LIKES_WEIGHT: float = 0.1  # Ranking bonus for the most-liked result of a batch; 0 ignores likes
+FIT_FALLBACK_SCREEN: tuple = (1920, 1080)  # Screen assumed when none can be detected (headless)
 
 # Available wallpaper genres/categories
 GENRES: List[str] = [
@@ -52,6 +104,21 @@ GENRES: List[str] = [
 ]
 
 
+# Genre choice for automatic changes (see utils/genre_sampler.py). Each genre's
+# weight is 1 + its feedback score, where events add these values and the score
+# halves every GENRE_SCORE_HALF_LIFE_DAYS.
+GENRE_EVENT_VALUES: dict = {
+    "apply": 1.0,  # A downloaded wallpaper was applied by hand
+    "reapply": 2.0,  # A wallpaper was applied again from the history
+    "favourite": 4.0,  # Marked as favourite in the history
+    "skip": -1.0,  # An automatic wallpaper was replaced by hand within GENRE_SKIP_WINDOW_S
+}
+GENRE_SCORE_HALF_LIFE_DAYS: float = 30.0
+GENRE_MIN_WEIGHT: float = 0.1  # Disliked genres still come up now and then
+GENRE_MAX_WEIGHT: float = 10.0
+GENRE_RECENCY_HOURS: float = 24.0  # A picked genre's chance recovers linearly over this time
+GENRE_SKIP_WINDOW_S: int = 600
+
 # API Request Configuration
 DEFAULT_PER_PAGE: int = 20
 DEFAULT_ORIENTATION: str = "landscape"
@@ -77,6 +144,80 @@ BUTTON_MIN_HEIGHT: int = 35
 LIST_MIN_HEIGHT: int = 200
 HISTORY_MAX_HEIGHT: int = 150
 
+# Preview cache and prefetch configuration
+PREVIEW_CACHE_SIZE: int = 32  # Number of decoded previews kept in memory
+PREFETCH_NEIGHBOURS: int = 1  # Rows prefetched on each side of the selection
+PREFETCH_MAX_CONCURRENT: int = 2  # Maximum simultaneous prefetch downloads
+THUMBNAIL_CACHE_SIZE: int = 64  # Number of decoded list thumbnails kept in memory
+THUMBNAIL_MAX_CONCURRENT: int = 4  # Maximum simultaneous thumbnail downloads
+IMAGE_MEMORY_BUDGET_MB: int = 64  # Decoded images kept by all caches together; 0 for no cap
+
+# Download history configuration
+HISTORY_PAGE_SIZE: int = 50  # History rows loaded from the library at a time
+HISTORY_THUMBNAIL_SIZE = (48, 32)  # Bounds of history thumbnails
+HISTORY_THUMBNAIL_CACHE_SIZE: int = 128  # Number of decoded history thumbnails kept in memory
+HISTORY_THUMBNAIL_NAME: str = ".thumbnails"  # Directory of tiny JPEGs on disk
+HISTORY_THUMBNAIL_MAX_FILES: int = 2000  # Least recently used thumbnails beyond this are removed from disk
+
+# Rotation daemon configuration (``pixeldrive daemon``)
+DAEMON_INTERVAL_MINUTES: float = 60  # Minutes between rotations; 0 disables the interval
+DAEMON_SCHEDULE: List[str] = []  # Cron expressions, e.g. "0 8 * * 1-5" for 8:00 on weekdays
+DAEMON_ON_UNLOCK: bool = False  # Also rotate when the session is unlocked
+DAEMON_STATUS_NAME: str = ".daemon-status.json"
+
+# Pipeline metrics (see utils/metrics.py): stage latencies, counts and sizes,
+# exported per process as JSON and Prometheus text and shown in the window
+METRICS_ENABLED: bool = os.environ.get("PIXELDRIVE_METRICS", "") not in ("", "0")
+METRICS_NAME: str = ".metrics"
+METRICS_EXPORT_INTERVAL_S: int = 30  # Seconds between exports while the window is open
+METRICS_PANEL_REFRESH_MS: int = 1000
+
+# Span tracing of single wallpaper changes (see utils/tracing.py), written as
+# Chrome trace-event JSON for chrome://tracing or ui.perfetto.dev
+TRACE_ENABLED: bool = os.environ.get("PIXELDRIVE_TRACE", "") not in ("", "0")
+TRACE_NAME: str = ".traces"
+TRACE_MAX_EVENTS: int = 100000  # Oldest events are dropped past this
+
+# Event-loop watchdog (see gui/watchdog.py): a stall of the window's thread
+# longer than WATCHDOG_STALL_MS is logged with the thread's stack
+WATCHDOG_HEARTBEAT_MS: int = 100
+WATCHDOG_STALL_MS: int = int(os.environ.get("PIXELDRIVE_STALL_MS", "500"))  # 0 disables the watchdog
+
 # Logging Configuration
 LOG_LEVEL: str = "INFO"
 LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+def ensure_download_dir() -> str:
+    """
+    Create the download directory if needed.
+
+    Called when a download is about to be stored rather than at import time,
+    so importing the configuration stays free of filesystem work.
+
+    Returns:
+        The download directory from the current settings
+    """
+    from wallpaper_changer.settings import get_settings
+
+    directory = get_settings().download_dir
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def data_path(name: str) -> str:
+    """
+    Get the path of a file or directory kept in the download directory.
+
+    Built from the current settings on every call, so the library, caches
+    and exports follow a download directory changed while the app runs.
+
+    Args:
+        name: One of the ``*_NAME`` values above, e.g. LIBRARY_DB_NAME
+
+    Returns:
+        Path inside the download directory of the current settings
+    """
+    from wallpaper_changer.settings import get_settings
+
+    return os.path.join(get_settings().download_dir, name)
@@ -0,0 +1,356 @@
+"""
+Long-running wallpaper rotation daemon.
+
+``pixeldrive daemon`` stays resident and rotates the wallpaper on a schedule:
+a fixed interval, cron expressions and, on GNOME, whenever the session is
+unlocked. Each rotation runs the headless fetch/download/apply path on a
+single background thread, so the scheduler keeps time while the network is
+slow. Nothing from a run is kept afterwards; only its timings are recorded,
+so memory stays flat however long the daemon runs.
+
+The daemon writes its next-run and last-run timings to a small JSON status
+file, which ``pixeldrive daemon --status`` prints. ``pixeldrive daemon
+--trigger`` (or ``SIGUSR1``) asks a running daemon to rotate now, which can
+be wired to unlock hooks on other desktops. A manual trigger shortly after
+a rotation counts as skipping that wallpaper's genre.
+"""
+
+import os
+import gc
+import sys
+import json
+import signal
+import logging
+import threading
+import subprocess
+from datetime import datetime
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from wallpaper_changer.config import DAEMON_STATUS_NAME, GENRE_SKIP_WINDOW_S, data_path
+from wallpaper_changer.headless import rotate_wallpaper
+from wallpaper_changer.settings import get_settings_store
+from wallpaper_changer.utils.genre_sampler import get_genre_sampler
+from wallpaper_changer.utils.metrics import get_metrics
+from wallpaper_changer.utils.tracing import get_tracer
+from wallpaper_changer.utils.schedule import Schedule, next_run
+
+logger = logging.getLogger(__name__)
+
+# Longest single sleep; waking up regularly corrects for suspend and clock changes
+_MAX_SLEEP_S = 60.0
+
+# dbus-monitor filter for GNOME's lock screen
+_UNLOCK_MATCH = "type='signal',interface='org.gnome.ScreenSaver',member='ActiveChanged'"
+
+
+class RunRecord(NamedTuple):
+    """Outcome of one rotation."""
+
+    started: datetime
+    duration_ms: float
+    reason: str
+    path: Optional[str]
+
+
+def _resident_kb() -> Optional[int]:
+    """Get the current resident set size of this process in KiB, if known."""
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KiB elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class UnlockWatcher(threading.Thread):
+    """Calls back when the GNOME session is unlocked."""
+
+    def __init__(self, on_unlock: Callable[[], None]):
+        """
+        Initialize the watcher.
+
+        Args:
+            on_unlock: Called from the watcher thread on every unlock
+        """
+        super().__init__(name="unlock-watcher", daemon=True)
+        self._on_unlock = on_unlock
+        self._process: Optional[subprocess.Popen] = None
+
+    def run(self):
+        """Follow the lock screen's ActiveChanged signal through dbus-monitor."""
+        try:
+            self._process = subprocess.Popen(
+                ["dbus-monitor", "--session", _UNLOCK_MATCH],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+            )
+        except OSError as e:
+            logger.warning(f"Unlock hook unavailable, dbus-monitor failed to start: {str(e)}")
+            return
+
+        # The signal's argument follows on the line after its header
+        in_signal = False
+        for line in self._process.stdout:
+            if "member=ActiveChanged" in line:
+                in_signal = True
+            elif in_signal and line.strip().startswith("boolean"):
+                in_signal = False
+                if line.strip() == "boolean false":
+                    logger.info("Session unlocked")
+                    self._on_unlock()
+
+    def stop(self):
+        """Stop following the lock screen."""
+        if self._process and self._process.poll() is None:
+            self._process.terminate()
+
+
+class RotationDaemon:
+    """
+    Rotates the wallpaper on a schedule with a small, steady footprint.
+
+    The scheduler runs in the thread that calls run_forever(); rotations run
+    on one background worker. A trigger that arrives while a rotation is in
+    progress is dropped rather than queued.
+    """
+
+    def __init__(self, schedules: List[Schedule], query: Optional[str] = None,
+                 lockscreen: bool = False, on_unlock: bool = False,
+                 status_path: Optional[str] = None,
+                 rotate: Callable[..., Optional[str]] = rotate_wallpaper):
+        """
+        Initialize the daemon.
+
+        Args:
+            schedules: Schedules deciding when to rotate
+            query: Search query; a random genre is used for each run when omitted
+            lockscreen: Also set the lockscreen wallpaper
+            on_unlock: Rotate when the session is unlocked
+            status_path: JSON file the timings are written to; empty to
+                disable, the one in the current download directory by default
+            rotate: Function performing one rotation, ``rotate(query, lockscreen)``
+        """
+        self.schedules = schedules
+        self.query = query
+        self.lockscreen = lockscreen
+        self.status_path = status_path
+        self._rotate = rotate
+
+        self.next_run: Optional[datetime] = None
+        self.last_run: Optional[RunRecord] = None
+        self.runs = 0
+        self.failures = 0
+
+        self._lock = threading.Lock()
+        self._status_lock = threading.Lock()  # The scheduler and rotation threads both write the status
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._trigger_reason: Optional[str] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rotation")
+        self._current: Optional[Future] = None
+        self._unlock_watcher = UnlockWatcher(lambda: self.trigger("unlock")) if on_unlock else None
+
+    def trigger(self, reason: str = "manual"):
+        """
+        Ask for a rotation as soon as possible. Safe to call from any thread
+        and from signal handlers.
+
+        Args:
+            reason: Recorded with the run
+        """
+        self._trigger_reason = reason
+        self._wake.set()
+
+    def stop(self):
+        """Stop the scheduler; a rotation in progress is allowed to finish."""
+        self._stopping.set()
+        self._wake.set()
+
+    def run_forever(self):
+        """Run the scheduler until stop() is called."""
+        if self._unlock_watcher:
+            self._unlock_watcher.start()
+        # Rotations pick up edits to the settings file
+        settings = get_settings_store()
+        settings.start_watching()
+
+        self.next_run = next_run(self.schedules, datetime.now())
+        logger.info(f"Rotation daemon started, next run at {self._format(self.next_run)}")
+        self._write_status()
+
+        try:
+            while not self._stopping.is_set():
+                now = datetime.now()
+                reason, self._trigger_reason = self._trigger_reason, None
+                if reason is None and self.next_run is not None and now >= self.next_run:
+                    reason = "schedule"
+
+                if reason is not None:
+                    self._start_rotation(reason)
+                    self.next_run = next_run(self.schedules, now)
+                    self._write_status()
+                    continue
+
+                timeout = _MAX_SLEEP_S
+                if self.next_run is not None:
+                    timeout = min(timeout, (self.next_run - now).total_seconds())
+                self._wake.wait(max(timeout, 0.0))
+                self._wake.clear()
+        finally:
+            if self._unlock_watcher:
+                self._unlock_watcher.stop()
+            settings.stop_watching()
+            self._executor.shutdown(wait=True)
+            logger.info("Rotation daemon stopped")
+
+    def _start_rotation(self, reason: str):
+        """Hand a rotation to the background worker unless one is running."""
+        with self._lock:
+            if self._current is not None and not self._current.done():
+                logger.info(f"Skipping {reason} rotation, the previous one is still running")
+                return
+            self._current = self._executor.submit(self._rotate_once, reason)
+
+    def _rotate_once(self, reason: str):
+        """Perform one rotation and record its timings."""
+        started = datetime.now()
+        logger.info(f"Rotating wallpaper ({reason})")
+
+        previous = self.last_run
+        if (reason in ("manual", "signal") and previous is not None and previous.path
+                and (started - previous.started).total_seconds() <= GENRE_SKIP_WINDOW_S):
+            get_genre_sampler().record_for_path(previous.path, "skip")
+
+        path = None
+        try:
+            path = self._rotate(query=self.query, lockscreen=self.lockscreen)
+        except Exception as e:
+            logger.error(f"Rotation failed: {str(e)}")
+
+        duration_ms = (datetime.now() - started).total_seconds() * 1000
+        metrics = get_metrics()
+        metrics.observe("rotation_seconds", duration_ms / 1000, reason=reason)
+        metrics.count("rotations_total", reason=reason, outcome="ok" if path else "error")
+        metrics.export()
+        get_tracer().write(role="daemon")
+        with self._lock:
+            self.last_run = RunRecord(started, duration_ms, reason, path)
+            self.runs += 1
+            if not path:
+                self.failures += 1
+
+        # Drop whatever the run left behind before going back to sleep
+        gc.collect()
+        logger.info(
+            f"Rotation {'succeeded' if path else 'failed'} in {duration_ms:.0f} ms, "
+            f"next run at {self._format(self.next_run)}"
+        )
+        self._write_status()
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Get the daemon's timings.
+
+        Returns:
+            Dictionary with next/last run times, run counts and resident memory
+        """
+        with self._lock:
+            last = self.last_run
+            return {
+                "pid": os.getpid(),
+                "next_run": self.next_run.isoformat(timespec="seconds") if self.next_run else None,
+                "last_run": {
+                    "started": last.started.isoformat(timespec="seconds"),
+                    "duration_ms": round(last.duration_ms, 1),
+                    "reason": last.reason,
+                    "path": last.path,
+                } if last else None,
+                "runs": self.runs,
+                "failures": self.failures,
+                "resident_kb": _resident_kb(),
+            }
+
+    def _write_status(self):
+        """Write the status file atomically."""
+        status_path = status_file(self.status_path)
+        if not status_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(status_path) or ".", exist_ok=True)
+            temp_path = f"{status_path}.tmp"
+            with self._status_lock:
+                with open(temp_path, "w", encoding="utf-8") as file:
+                    json.dump(self.status(), file, indent=2)
+                os.replace(temp_path, status_path)
+        except OSError as e:
+            logger.warning(f"Failed to write daemon status: {str(e)}")
+
+    @staticmethod
+    def _format(moment: Optional[datetime]) -> str:
+        """Format a run time for log messages."""
+        return moment.strftime("%Y-%m-%d %H:%M:%S") if moment else "never"
+
+
+def status_file(status_path: Optional[str] = None) -> str:
+    """Resolve a status file path; None is the one in the current download directory."""
+    return data_path(DAEMON_STATUS_NAME) if status_path is None else status_path
+
+
+def read_status(status_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Read the status written by a daemon.
+
+    Args:
+        status_path: Status file path; the one in the current download
+            directory by default
+
+    Returns:
+        Status dictionary, or None if no daemon has written one
+    """
+    try:
+        with open(status_file(status_path), encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def trigger_running_daemon(status_path: Optional[str] = None) -> bool:
+    """
+    Ask a running daemon to rotate now.
+
+    Args:
+        status_path: Status file of the daemon; the one in the current
+            download directory by default
+
+    Returns:
+        True if the signal was delivered
+    """
+    status = read_status(status_path)
+    if not status or not hasattr(signal, "SIGUSR1"):
+        return False
+    try:
+        os.kill(status["pid"], signal.SIGUSR1)
+        return True
+    except (OSError, KeyError, TypeError):
+        return False
+
+
+def install_signal_handlers(daemon: RotationDaemon):
+    """
+    Stop on SIGINT/SIGTERM and rotate on SIGUSR1, where available.
+
+    Args:
+        daemon: Daemon to control; must run in the main thread
+    """
+    signal.signal(signal.SIGINT, lambda signum, frame: daemon.stop())
+    signal.signal(signal.SIGTERM, lambda signum, frame: daemon.stop())
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, lambda signum, frame: daemon.trigger("signal"))
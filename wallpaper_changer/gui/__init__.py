@@ -1,10 +1,22 @@
 """
 GUI components for the wallpaper changer application.
 Enhanced with modern UI elements and premium styling.
+
+Attributes are imported lazily on first access, so importing this package
+doesn't load PyQt5.
 """
 
-from .styles import DarkTheme, LightTheme
-from .main_window import WallpaperApp
-from .widgets import ImagePreviewCard, EnhancedListWidget, LoadingSpinner
+from wallpaper_changer._lazy import lazy_exports
+
+_EXPORTS = {
+    'DarkTheme': '.styles',
+    'LightTheme': '.styles',
+    'WallpaperApp': '.main_window',
+    'ImagePreviewCard': '.widgets',
+    'EnhancedListWidget': '.widgets',
+    'LoadingSpinner': '.widgets',
+    'StatsPanel': '.widgets',
+    'EventLoopWatchdog': '.watchdog',
+}
 
-__all__ = ['DarkTheme', 'LightTheme', 'WallpaperApp', 'ImagePreviewCard', 'EnhancedListWidget', 'LoadingSpinner']
+__getattr__, __dir__, __all__ = lazy_exports(__name__, _EXPORTS)
@@ -3,60 +3,285 @@ Main window GUI for the wallpaper changer application.
 """
 
 import os
-import random
+import time
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QLineEdit, QPushButton,
     QProgressBar, QLabel, QComboBox, QListWidget, QListWidgetItem,
-    QApplication, QFrame, QHBoxLayout
+    QApplication, QFrame, QHBoxLayout, QMenu
 )
-from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QPixmap, QImage, QIcon, QFont
+from PyQt5.QtCore import Qt, QTimer, QSize, pyqtSignal
+from PyQt5.QtGui import QPixmap, QImage, QIcon, QFont, QPalette, QColor
 
 from wallpaper_changer.config import (
-    GENRES, APP_TITLE, APP_GEOMETRY,
-    AUTO_CLOSE_AFTER_WALLPAPER, AUTO_CLOSE_DELAY_MS, APP_ICON_PATH
+    APP_TITLE, APP_GEOMETRY, APP_ICON_PATH,
+    PREVIEW_CACHE_SIZE, PREFETCH_NEIGHBOURS, PREFETCH_MAX_CONCURRENT,
+    THUMBNAIL_CACHE_SIZE, THUMBNAIL_MAX_CONCURRENT,
+    HISTORY_PAGE_SIZE, HISTORY_THUMBNAIL_SIZE, HISTORY_THUMBNAIL_CACHE_SIZE,
+    OFFLINE_FALLBACK_BUDGET_MS,
+    SEARCH_DEBOUNCE_MS, SEARCH_MIN_CHARS, SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL_S,
+    GENRE_SKIP_WINDOW_S, METRICS_EXPORT_INTERVAL_S, METRICS_PANEL_REFRESH_MS
 )
-from wallpaper_changer.workers import FetchWorker, DownloadWorker
-from wallpaper_changer.utils import WallpaperManager
+from wallpaper_changer.workers import (
+    FetchWorker, DownloadWorker, ImageFetchWorker, LocalThumbnailWorker,
+    ImagePrefetcher, TaskWorker, WallpaperApplier
+)
+from wallpaper_changer.settings import Settings, get_settings, get_settings_store
+from wallpaper_changer.utils import WallpaperManager, ImageCache
+from wallpaper_changer.utils.library import get_library
+from wallpaper_changer.utils.genre_sampler import get_genre_sampler
+from wallpaper_changer.utils.local_pool import LocalPool
+from wallpaper_changer.utils.memory_budget import get_memory_budget, payload_nbytes
+from wallpaper_changer.utils.metrics import get_metrics, summary_lines
+from wallpaper_changer.utils.phash import get_duplicate_index
+from wallpaper_changer.utils.query_cache import QueryCache
+from wallpaper_changer.utils.screen_fit import target_sizes
+from wallpaper_changer.utils.tracing import get_tracer
 from wallpaper_changer.gui.styles import DarkTheme
-from wallpaper_changer.gui.widgets import ImagePreviewCard, EnhancedListWidget, LoadingSpinner
+from wallpaper_changer.gui.widgets import ImagePreviewCard, EnhancedListWidget, LoadingSpinner, StatsPanel
+from wallpaper_changer.gui.single_instance import ACTION_SHOW, ACTION_APPLY_RANDOM, ACTION_SEARCH
+from wallpaper_changer.gui.watchdog import EventLoopWatchdog
 
 logger = logging.getLogger(__name__)
 
 
 class WallpaperApp(QMainWindow):
-    """Main application window for the wallpaper changer."""
+    """
+    Main application window for the wallpaper changer.
+
+    Startup is staged: the constructor only builds the widget tree so the
+    window can be shown right away. The stylesheet, icon and the startup
+    wallpaper fetch are deferred until after the first frame is painted.
+    """
+
+    # Settings snapshot and names of the changed settings; emitted from the
+    # settings watcher thread and delivered on the GUI thread
+    settings_changed = pyqtSignal(object, object)
     
-    def __init__(self):
-        """Initialize the main application window."""
+    def __init__(self, startup_started: Optional[float] = None,
+                 startup_command: Optional[Dict[str, Any]] = None,
+                 skip_startup_change: bool = False, auto_close: bool = True):
+        """
+        Initialize the main application window.
+
+        Args:
+            startup_started: ``time.perf_counter()`` value at process start,
+                used to report startup timings; defaults to now
+            startup_command: Command run once startup finishes (see
+                handle_command); a random wallpaper is applied when omitted
+            skip_startup_change: Don't apply a random wallpaper at startup,
+                whatever the startup command
+            auto_close: Whether the window may close itself after the
+                automatic change, as the settings ask
+        """
         super().__init__()
+
+        # Startup instrumentation
+        self._startup_started = startup_started if startup_started is not None else time.perf_counter()
+        self._first_frame_ms: Optional[float] = None
+        self._startup_command = startup_command
+        self._skip_startup_change = skip_startup_change
+        self._auto_close = auto_close
         
         # Application state
         self.downloaded_paths: List[str] = []
         self.photos: List[Dict[str, Any]] = []
+        self.photos_query: Optional[str] = None  # Query the current photos were found with
         self.selected_photo: Optional[Dict[str, Any]] = None
         self.wallpaper_manager = WallpaperManager()
         
         # Worker threads
         self.fetch_worker: Optional[FetchWorker] = None
         self.download_worker: Optional[DownloadWorker] = None
+
+        # Search-as-you-type: requests wait for a typing pause, only the
+        # latest one is shown, and related recent results answer at once
+        self._search_worker: Optional[FetchWorker] = None
+        self.query_cache = QueryCache(SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL_S)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(lambda: self._start_search(self.query_input.text().strip()))
+
+        # Wallpapers are applied in the background; the startup one closes the app
+        self.wallpaper_applier = WallpaperApplier(self)
+        self.wallpaper_applier.applied.connect(self._on_wallpaper_applied)
+        self._auto_apply_path: Optional[str] = None
+
+        # Wallpapers applied by hand are feedback for the genre sampler; one
+        # replacing the automatic wallpaper soon after counts as a skip
+        self._auto_applied: Optional[Tuple[str, float]] = None  # (path, monotonic time)
+        self._apply_events: Dict[str, str] = {}  # Path -> event other than "apply"
+
+        # The automatic change falls back to a downloaded wallpaper when the
+        # network fails or exceeds its latency budget
+        self._auto_pending = False
+        self._auto_started = 0.0  # perf_counter() at the start of the automatic change
+        self._auto_span = None  # Trace span of the automatic change, ended once it settles
+        self._auto_failure: Optional[Tuple[str, str]] = None  # (message, outcome) once the network failed
+        self._local_lookup: Optional[TaskWorker] = None  # Reads the local pool off the GUI thread
+        self._auto_fallback_timer = QTimer(self)
+        self._auto_fallback_timer.setSingleShot(True)
+        self._auto_fallback_timer.timeout.connect(
+            lambda: self._apply_local_fallback(f"No new wallpaper within {OFFLINE_FALLBACK_BUDGET_MS} ms")
+        )
+
+        # Preview loading; the generation token identifies the current selection
+        self._preview_generation = 0
+        self._preview_worker: Optional[ImageFetchWorker] = None
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(50)
+        self._preview_timer.timeout.connect(self._start_preview_load)
+
+        # Decoded images of all caches share one memory budget; past it, the
+        # least recently shown are dropped from whichever cache holds them
+        self.memory_budget = get_memory_budget()
+
+        # Previews of likely-next rows are fetched ahead of time into the cache
+        self.preview_cache = ImageCache(PREVIEW_CACHE_SIZE, self.memory_budget, "preview_cache")
+        self.prefetcher = ImagePrefetcher(
+            self.preview_cache, PREFETCH_MAX_CONCURRENT, parent=self, stage="preview_prefetch"
+        )
+        self._hovered_photo: Optional[Dict[str, Any]] = None
+
+        # List thumbnails are fetched and decoded at display size in the background
+        thumbnail_size = (EnhancedListWidget.THUMBNAIL_SIZE, EnhancedListWidget.THUMBNAIL_SIZE)
+        self.thumbnail_cache = ImageCache(THUMBNAIL_CACHE_SIZE, self.memory_budget, "thumbnail_cache")
+        self.thumbnail_loader = ImagePrefetcher(
+            self.thumbnail_cache, THUMBNAIL_MAX_CONCURRENT, thumbnail_size, self, stage="thumbnail",
+            match_duplicates=True
+        )
+        self.thumbnail_loader.prefetched.connect(self._on_thumbnail_loaded)
+        self.thumbnail_loader.duplicate.connect(self._on_duplicate_thumbnail)
+        # Thumbnail URL -> downloaded wallpaper it looks like, found by the loader's workers
+        self._duplicate_thumbnails: Dict[str, str] = {}
+
+        # Download history is read from the library a page at a time; its
+        # thumbnails are decoded from the local files via the on-disk cache
+        self._history_offset = 0
+        self._history_exhausted = False
+        self._history_items: Dict[str, QListWidgetItem] = {}
+        self.history_thumbnail_cache = ImageCache(
+            HISTORY_THUMBNAIL_CACHE_SIZE, self.memory_budget, "history_thumbnail_cache"
+        )
+        self.history_thumbnail_loader = ImagePrefetcher(
+            self.history_thumbnail_cache, THUMBNAIL_MAX_CONCURRENT, HISTORY_THUMBNAIL_SIZE, self,
+            worker_class=LocalThumbnailWorker
+        )
+        self.history_thumbnail_loader.prefetched.connect(self._on_history_thumbnail_loaded)
+
+        # Blocking the event loop once the window is up gets logged with a stack
+        self.watchdog = EventLoopWatchdog(parent=self)
         
         # Initialize UI
         self._setup_window()
         self._init_ui()
-        self._apply_theme()
-        
-        # Start auto-wallpaper change on startup
-        self.auto_change_wallpaper()
+
+        # Prefetched previews are decoded at the size the preview card shows them
+        self.prefetcher.target_size = self.selected_preview.image_size()
+
+        # Memory held outside the caches is measured when usage is reported
+        self.memory_budget.add_source(
+            "preview_cards", lambda: self.selected_preview.pixmap_bytes() + self.downloaded_preview.pixmap_bytes()
+        )
+        self.memory_budget.add_source("list_rows", self.preview_list.pixmap_bytes)
+        self.memory_budget.add_source("history_icons", self._history_icon_bytes)
+        self.memory_budget.add_source("photo_metadata", self._photo_metadata_bytes)
     
     def _setup_window(self):
         """Set up the main window properties."""
         self.setWindowTitle(APP_TITLE)
         self.setGeometry(*APP_GEOMETRY)
 
+        # Cheap dark background for the first frame, before the stylesheet is applied
+        palette = self.palette()
+        palette.setColor(QPalette.Window, QColor("#1A1A1A"))
+        palette.setColor(QPalette.WindowText, QColor("#E0E0E0"))
+        self.setPalette(palette)
+
+    def paintEvent(self, event):
+        """Kick off the deferred startup work once the first frame is painted."""
+        super().paintEvent(event)
+        if self._first_frame_ms is None:
+            self._first_frame_ms = (time.perf_counter() - self._startup_started) * 1000
+            QTimer.singleShot(0, self._finish_startup)
+
+    def _finish_startup(self):
+        """Run the startup work deferred past the first frame."""
+        self._load_icon()
+        self._apply_theme()
+
+        # Past downloads, read from the library index
+        self._load_history_page()
+
+        # Built from the library before the first thumbnails are compared with it
+        self._build_duplicate_index()
+
+        # Edits to the settings file apply without a restart
+        self.settings_changed.connect(self._on_settings_changed)
+        store = get_settings_store()
+        store.subscribe(self._notify_settings_changed)
+        store.start_watching()
+
+        # A search requested on the command line replaces the startup wallpaper change
+        command = self._startup_command or {}
+        if command.get("action") == ACTION_SEARCH:
+            self.handle_command(command)
+        elif not self._skip_startup_change:
+            self.auto_change_wallpaper()
+
+        # The next idle turn of the event loop is when the window responds to input
+        QTimer.singleShot(0, self._report_startup)
+
+        # From here on, work that blocks the event loop counts as a stall
+        self.watchdog.start()
+
+    def _build_duplicate_index(self):
+        """Build the shared duplicate index from the library on a worker thread."""
+        index_worker = TaskWorker(get_duplicate_index, name="duplicate_index", parent=self)
+        index_worker.finished.connect(index_worker.deleteLater)
+        index_worker.start()
+
+    def _report_startup(self):
+        """Log time-to-first-frame and time-to-interactive."""
+        interactive_ms = (time.perf_counter() - self._startup_started) * 1000
+        logger.info(
+            f"Startup: first frame after {self._first_frame_ms:.0f} ms, "
+            f"interactive after {interactive_ms:.0f} ms"
+        )
+        metrics = get_metrics()
+        metrics.set_gauge("startup_seconds", self._first_frame_ms / 1000, phase="first_frame")
+        metrics.set_gauge("startup_seconds", interactive_ms / 1000, phase="interactive")
+
+    def handle_command(self, command: Dict[str, Any]):
+        """
+        Handle a command forwarded by a later launch of the application.
+
+        Args:
+            command: Dictionary with an ``action`` of ``show``,
+                ``apply-random`` or ``search`` (with a ``query``)
+        """
+        # Bring the existing window to the front for every command
+        if self.isMinimized():
+            self.showNormal()
+        self.show()
+        self.raise_()
+        self.activateWindow()
+
+        action = command.get("action", ACTION_SHOW)
+        if action == ACTION_APPLY_RANDOM:
+            self.auto_change_wallpaper()
+        elif action == ACTION_SEARCH:
+            self.query_input.setText(command.get("query", ""))
+            self.fetch_photos()
+        elif action != ACTION_SHOW:
+            logger.warning(f"Unknown instance command: {action}")
+
+    def _load_icon(self):
+        """Load the window and application icon."""
         # Set application icon
         if os.path.exists(APP_ICON_PATH):
             icon = QIcon(APP_ICON_PATH)
@@ -122,10 +347,12 @@ class WallpaperApp(QMainWindow):
         self.query_input = QLineEdit()
         self.query_input.setPlaceholderText("🔍 Enter custom search query...")
         self.query_input.setMinimumHeight(45)
+        self.query_input.textEdited.connect(self._on_query_edited)
+        self.query_input.returnPressed.connect(self.fetch_photos)
 
         # Genre selection
         self.genre_combo = QComboBox()
-        self.genre_combo.addItems(["🎲 Random"] + [f"🏎️ {genre}" for genre in GENRES])
+        self._populate_genres(get_settings().genres)
         self.genre_combo.setMinimumHeight(45)
         self.genre_combo.setMinimumWidth(200)
 
@@ -162,7 +389,9 @@ class WallpaperApp(QMainWindow):
         self.preview_list = EnhancedListWidget()
         self.preview_list.setMinimumHeight(300)
         self.preview_list.setMinimumWidth(400)
-        self.preview_list.itemClicked.connect(self.preview_selected)
+        self.preview_list.currentItemChanged.connect(self._on_current_photo_changed)
+        self.preview_list.setMouseTracking(True)
+        self.preview_list.itemEntered.connect(self._on_photo_hovered)
 
         # Loading spinner for photo list
         self.photos_loading = LoadingSpinner(24)
@@ -247,6 +476,18 @@ class WallpaperApp(QMainWindow):
         status_frame.setLayout(status_layout)
         layout.addWidget(status_frame)
 
+        # Live pipeline timings, only while metrics are recorded
+        self.stats_panel: Optional[StatsPanel] = None
+        if get_metrics().enabled:
+            self.stats_panel = StatsPanel()
+            layout.addWidget(self.stats_panel)
+            self._stats_timer = QTimer(self)
+            self._stats_timer.timeout.connect(self._refresh_stats)
+            self._stats_timer.start(METRICS_PANEL_REFRESH_MS)
+            self._metrics_export_timer = QTimer(self)
+            self._metrics_export_timer.timeout.connect(get_metrics().export)
+            self._metrics_export_timer.start(METRICS_EXPORT_INTERVAL_S * 1000)
+
         # History section (collapsible)
         self._create_history_section(layout)
 
@@ -265,24 +506,98 @@ class WallpaperApp(QMainWindow):
         # History list
         self.history_list = QListWidget()
         self.history_list.setMaximumHeight(120)
+        self.history_list.setIconSize(QSize(*HISTORY_THUMBNAIL_SIZE))
         self.history_list.itemDoubleClicked.connect(self.set_wallpaper_from_history)
+        self.history_list.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.history_list.customContextMenuRequested.connect(self._show_history_menu)
+        self.history_list.verticalScrollBar().valueChanged.connect(self._on_history_scrolled)
 
         history_layout.addWidget(history_header)
         history_layout.addWidget(self.history_list)
         history_frame.setLayout(history_layout)
 
         layout.addWidget(history_frame)
-    
+
+    def _load_history_page(self):
+        """Append the next page of past downloads from the library."""
+        if self._history_exhausted:
+            return
+
+        try:
+            entries = get_library().recent(HISTORY_PAGE_SIZE, self._history_offset)
+        except Exception as e:
+            logger.error(f"Failed to load download history: {str(e)}")
+            self._history_exhausted = True
+            return
+
+        self._history_offset += len(entries)
+        self._history_exhausted = len(entries) < HISTORY_PAGE_SIZE
+        for entry in entries:
+            self._add_history_item(entry.path)
+        self._schedule_history_thumbnails()
+
+    def _on_history_scrolled(self, value: int):
+        """Load the next history page when the list is scrolled near its end."""
+        if value >= self.history_list.verticalScrollBar().maximum() - 2:
+            self._load_history_page()
+
+    def _add_history_item(self, path: str, row: Optional[int] = None) -> QListWidgetItem:
+        """
+        Add a download to the history list unless it is already shown.
+
+        Args:
+            path: Local path of the downloaded image
+            row: Row to insert at; appended when omitted
+
+        Returns:
+            The history item for the path
+        """
+        item = self._history_items.get(path)
+        if item is not None:
+            return item
+
+        item = QListWidgetItem(f"📁 {os.path.basename(path)}")
+        item.setData(Qt.UserRole, path)
+        image = self.history_thumbnail_cache.get(path)
+        if image is not None:
+            item.setIcon(QIcon(QPixmap.fromImage(image)))
+
+        if row is None:
+            self.history_list.addItem(item)
+        else:
+            self.history_list.insertItem(row, item)
+        self._history_items[path] = item
+        return item
+
+    def _schedule_history_thumbnails(self):
+        """Load thumbnails for the history rows that don't have one yet."""
+        paths = [path for path, item in self._history_items.items() if item.icon().isNull()]
+        self.history_thumbnail_loader.schedule(paths)
+
+    def _on_history_thumbnail_loaded(self, path: str, image: QImage):
+        """Show a background-loaded thumbnail in its history row."""
+        item = self._history_items.get(path)
+        if item is not None:
+            item.setIcon(QIcon(QPixmap.fromImage(image)))
+
     def _apply_theme(self):
-        """Apply the dark theme to the application."""
+        """Apply the dark theme to the window."""
         self.setStyleSheet(DarkTheme.get_stylesheet())
 
     def auto_change_wallpaper(self):
         """Automatically fetch, download, and set a random wallpaper on startup."""
-        query = random.choice(GENRES)
+        query = get_genre_sampler().pick()
         self.status_label.setText(f"Fetching random {query} wallpaper...")
 
-        self.fetch_worker = FetchWorker(query)
+        self._auto_pending = True
+        self._auto_failure = None
+        self._auto_started = time.perf_counter()
+        self._auto_span = get_tracer().span("auto_change_wallpaper", genre=query)
+        if OFFLINE_FALLBACK_BUDGET_MS > 0:
+            self._auto_fallback_timer.start(OFFLINE_FALLBACK_BUDGET_MS)
+
+        with get_tracer().use(self._auto_span):
+            self.fetch_worker = FetchWorker(query)
         self.fetch_worker.photos.connect(self.auto_download_random)
         self.fetch_worker.error.connect(self.show_error_and_close)
         self.fetch_worker.start()
@@ -290,40 +605,95 @@ class WallpaperApp(QMainWindow):
     def auto_download_random(self, photos: List[Dict[str, Any]]):
         """Download a random photo from the fetched results."""
         if not photos:
-            self.status_label.setText("No photos found")
-            if AUTO_CLOSE_AFTER_WALLPAPER:
-                QTimer.singleShot(AUTO_CLOSE_DELAY_MS, self.close)
+            self._apply_local_fallback("No photos found", outcome="no_photos")
             return
 
         self.photos = photos
-        random_photo = random.choice(photos)
-
-        self.download_worker = DownloadWorker(random_photo)
+        self.photos_query = getattr(self.sender(), "query", None)
+        # The worker picks among the photos that fit the screens; the others
+        # stand in if the pick is already in the library
+        with get_tracer().span("auto_download_random", parent=self._auto_span, photos=len(photos)):
+            self.download_worker = DownloadWorker(photos[0], self.photos_query, alternatives=photos,
+                                                  sizes=target_sizes())
         self.download_worker.finished.connect(self.auto_set_wallpaper)
         self.download_worker.error.connect(self.show_error_and_close)
         self.download_worker.start()
 
         self.status_label.setText("Downloading random wallpaper...")
 
-    def auto_set_wallpaper(self, path: str, pixmap: QPixmap):
+    def auto_set_wallpaper(self, path: str, thumbnail: QImage):
         """Set the downloaded wallpaper and optionally close the app."""
-        if path:
+        if path and not self._auto_pending:
+            # Arrived after the local fallback was applied; keep it for later
             self.downloaded_paths.append(path)
-            success = self.wallpaper_manager.set_desktop_wallpaper(path)
-            if success:
-                self.status_label.setText("Wallpaper set successfully")
-            else:
-                self.status_label.setText("Failed to set wallpaper")
+            self._add_downloaded_to_history(path, thumbnail)
+            return
 
-            # Only auto-close if configured to do so
-            if AUTO_CLOSE_AFTER_WALLPAPER:
-                QTimer.singleShot(AUTO_CLOSE_DELAY_MS, self.close)
-            else:
-                self.status_label.setText("Wallpaper set successfully - App ready for manual use")
+        if path:
+            self._auto_pending = False
+            self._auto_fallback_timer.stop()
+            self.downloaded_paths.append(path)
+            self._add_downloaded_to_history(path, thumbnail)
+            self.status_label.setText("Setting wallpaper...")
+            self._auto_apply_path = path
+            with get_tracer().span("auto_set_wallpaper", parent=self._auto_span, path=path):
+                self.wallpaper_applier.request(path, "desktop")
         else:
-            self.status_label.setText("Failed to download wallpaper")
-            if AUTO_CLOSE_AFTER_WALLPAPER:
-                QTimer.singleShot(AUTO_CLOSE_DELAY_MS, self.close)
+            self._apply_local_fallback("Failed to download wallpaper", outcome="download_failed")
+
+    def _apply_local_fallback(self, reason: str, outcome: Optional[str] = None):
+        """
+        Apply an already-downloaded wallpaper instead of waiting for the network.
+
+        Only acts while the automatic change hasn't applied anything yet. The
+        local pool is read on a worker, as picking may sync it with the
+        library; the wallpaper is applied once it answers.
+
+        Args:
+            reason: Why the network path was abandoned, shown in the status
+            outcome: Trace outcome if the network path failed for good; the
+                automatic change then ends if there is no local wallpaper
+                either. Omitted while the network path may still succeed.
+        """
+        if not self._auto_pending:
+            return
+        if outcome is not None and self._auto_failure is None:
+            self._auto_failure = (reason, outcome)
+        if self._local_lookup is not None:
+            # The lookup in progress ends the change if it finds nothing
+            return
+
+        self._auto_fallback_timer.stop()
+        with get_tracer().use(self._auto_span):
+            worker = TaskWorker(lambda: LocalPool().next_wallpaper(), name="local_pool", parent=self)
+        worker.done.connect(lambda path: self._on_local_wallpaper(path, reason))
+        worker.failed.connect(lambda message: self._on_local_wallpaper(None, reason))
+        worker.finished.connect(worker.deleteLater)
+        self._local_lookup = worker
+        worker.start()
+
+    def _on_local_wallpaper(self, path: Optional[str], reason: str):
+        """Apply the wallpaper picked from the local pool, or end a failed change."""
+        self._local_lookup = None
+        if not self._auto_pending:
+            # The network path won meanwhile
+            return
+
+        if path:
+            self._auto_pending = False
+            logger.info(f"{reason}; applying downloaded wallpaper {path}")
+            self.status_label.setText(f"{reason} - using a saved wallpaper")
+            self._auto_apply_path = path
+            with get_tracer().span("apply_local_fallback", parent=self._auto_span, reason=reason):
+                self.wallpaper_applier.request(path, "desktop")
+        elif self._auto_failure is not None:
+            message, outcome = self._auto_failure
+            self._auto_pending = False
+            self.status_label.setText(message)
+            self._end_auto_trace(outcome)
+            if not self._close_if_configured():
+                # Change status to indicate manual mode
+                QTimer.singleShot(2000, lambda: self.status_label.setText("Error occurred - App ready for manual use"))
 
     def fetch_photos(self):
         """Fetch photos based on user input."""
@@ -332,13 +702,53 @@ class WallpaperApp(QMainWindow):
         # Remove emoji prefixes
         query = query.replace("🎲 ", "").replace("🏎️ ", "")
         if query == "Random":
-            query = random.choice(GENRES)
+            query = get_genre_sampler().pick()
+        self._start_search(query)
+
+    def _on_query_edited(self, text: str):
+        """Answer from related cached results, or search once typing pauses."""
+        query = text.strip()
+        if len(query) < SEARCH_MIN_CHARS:
+            self._search_timer.stop()
+            return
+
+        cached = self.query_cache.lookup(query)
+        if cached is None:
+            self._search_timer.start()
+            return
+
+        self._search_timer.stop()
+        self._cancel_search()
+        self._clear_photos()
+        self.photos_query = query
+        self._add_photos(cached)
+        self.status_label.setText(f"⚡ {len(cached)} recent results for '{query}'")
+        self.progress_bar.setFormat(f"{len(cached)} photos loaded")
+
+    def _start_search(self, query: str):
+        """
+        Search for photos, replacing any search still in progress.
+
+        Args:
+            query: Search query
+        """
+        self._search_timer.stop()
+        if not query:
+            return
+        self._cancel_search()
+        self._clear_photos()
+
+        cached = self.query_cache.get(query)
+        if cached is not None:
+            self.photos_query = query
+            self._add_photos(cached)
+            self.status_label.setText(f"✅ Loaded {len(cached)} photos")
+            self.progress_bar.setFormat(f"{len(cached)} photos loaded")
+            return
 
         # Show loading state
-        self.preview_list.clear()
         self.photos_loading.show()
         self.photos_loading.start_animation()
-        self.selected_preview.show_placeholder()
 
         # Update UI state
         self.status_label.setText(f"🔍 Fetching {query} photos...")
@@ -346,19 +756,78 @@ class WallpaperApp(QMainWindow):
         self.fetch_button.setEnabled(False)
         self.fetch_button.setText("⏳ Fetching...")
 
+        self._search_worker = FetchWorker(query, sizes=target_sizes(), parent=self)
+        self._search_worker.local_photos.connect(self._display_local_photos)
+        self._search_worker.photos.connect(self.display_photos)
+        self._search_worker.error.connect(self.show_error)
+        self._search_worker.finished.connect(self._on_search_finished)
+        self._search_worker.start()
+
+    def _cancel_search(self):
+        """Drop the results of the search in progress, if any."""
+        worker = self._search_worker
+        if worker is None:
+            return
+        self._search_worker = None
+        worker.cancel()
+        worker.local_photos.disconnect(self._display_local_photos)
+        worker.photos.disconnect(self.display_photos)
+        worker.error.disconnect(self.show_error)
+
+    def is_loading(self) -> bool:
+        """Return True while a search, thumbnails or the preview are still loading."""
+        return (
+            self._search_worker is not None or self._preview_worker is not None
+            or self._preview_timer.isActive() or self.thumbnail_loader.is_busy()
+            or self.history_thumbnail_loader.is_busy()
+        )
+
+    def _on_search_finished(self):
+        """Release a finished search worker."""
+        worker = self.sender()
+        if worker is self._search_worker:
+            self._search_worker = None
+        worker.deleteLater()
+
+    def _clear_photos(self):
+        """Empty the photo list and everything loading for it."""
+        self._preview_generation += 1
+        self._cancel_preview_load()
+        self.prefetcher.cancel()
+        self.thumbnail_loader.cancel()
+        self._hovered_photo = None
+        self.photos = []
+        self.preview_list.clear()
+        self.photos_loading.hide()
+        self.photos_loading.stop_animation()
+        self.selected_preview.show_placeholder()
+        self.fetch_button.setEnabled(True)
+        self.fetch_button.setText("✨ Fetch Photos")
+
         # Disable action buttons
         self.download_button.setEnabled(False)
         self.set_wallpaper_button.setEnabled(False)
         self.set_lockscreen_button.setEnabled(False)
 
-        self.fetch_worker = FetchWorker(query)
-        self.fetch_worker.photos.connect(self.display_photos)
-        self.fetch_worker.error.connect(self.show_error)
-        self.fetch_worker.start()
+    def _display_local_photos(self, photos: List[Dict[str, Any]]):
+        """Answer from photos of earlier searches while Unsplash is queried."""
+        worker = self.sender()
+        if worker is not self._search_worker or self.photos or not photos:
+            return
+        self.photos_query = worker.query
+        self._add_photos(photos)
+        self.status_label.setText(f"⚡ {len(photos)} saved photos - searching Unsplash...")
 
     def display_photos(self, photos: List[Dict[str, Any]]):
-        """Display fetched photos in the enhanced preview list."""
-        self.photos = photos
+        """Display fetched photos after the saved ones already listed."""
+        worker = self.sender()
+        if worker is not self._search_worker:
+            # Superseded by a newer search
+            return
+        self.photos_query = worker.query
+        # Ranked by the worker, so cached answers come out in the same order
+        if photos:
+            self.query_cache.put(worker.query, photos)
 
         # Hide loading spinner
         self.photos_loading.hide()
@@ -368,48 +837,69 @@ class WallpaperApp(QMainWindow):
         self.fetch_button.setEnabled(True)
         self.fetch_button.setText("✨ Fetch Photos")
 
-        if not photos:
-            self.status_label.setText("❌ No photos found. Try a different search term.")
+        # Best screen fits first; poor fits aren't listed, so never downloaded
+        hidden = worker.found - len(photos)
+
+        shown = {photo.get("id") for photo in self.photos}
+        new_photos = [photo for photo in photos if photo.get("id") not in shown]
+        if not self.photos and not new_photos:
+            if worker.found:
+                self.status_label.setText(f"❌ None of the {worker.found} photos fit your screens")
+            else:
+                self.status_label.setText("❌ No photos found. Try a different search term.")
             self.progress_bar.setFormat("No results")
             return
 
-        # Add photos to enhanced list with async thumbnail loading
-        for i, photo in enumerate(photos):
-            # Add item without thumbnail first for immediate feedback
-            self.preview_list.add_photo_item(photo)
-
-            # Load thumbnail asynchronously
-            QTimer.singleShot(i * 100, lambda p=photo: self._load_thumbnail_async(p))
+        self._add_photos(new_photos)
 
         # Update status
-        self.status_label.setText(f"✅ Loaded {len(photos)} photos")
-        self.progress_bar.setFormat(f"{len(photos)} photos loaded")
-
-    def _load_thumbnail_async(self, photo: Dict[str, Any]):
-        """Load thumbnail asynchronously to avoid blocking UI."""
-        thumbnail_url = photo.get("urls", {}).get("thumb", "")
-        if thumbnail_url:
-            try:
-                import requests
-                response = requests.get(thumbnail_url, timeout=3)
-                if response.status_code == 200:
-                    pixmap = QPixmap.fromImage(QImage.fromData(response.content))
-                    # Find the corresponding item and update it
-                    for i in range(self.preview_list.count()):
-                        item = self.preview_list.item(i)
-                        if item and item.data(Qt.UserRole) == photo:
-                            # Update the thumbnail in the custom widget
-                            widget = self.preview_list.itemWidget(item)
-                            if widget:
-                                thumbnail_label = widget.findChild(QLabel)
-                                if thumbnail_label:
-                                    scaled_thumb = pixmap.scaled(
-                                        64, 64, Qt.KeepAspectRatio, Qt.SmoothTransformation
-                                    )
-                                    thumbnail_label.setPixmap(scaled_thumb)
-                            break
-            except Exception as e:
-                logger.warning(f"Failed to load thumbnail: {str(e)}")
+        if not worker.found:
+            self.status_label.setText(f"📁 Showing {len(self.photos)} saved photos (nothing new from Unsplash)")
+        elif shown:
+            self.status_label.setText(f"✅ Loaded {len(self.photos)} photos ({len(new_photos)} new)")
+        elif hidden:
+            self.status_label.setText(f"✅ Loaded {len(self.photos)} photos ({hidden} hidden: poor screen fit)")
+        else:
+            self.status_label.setText(f"✅ Loaded {len(self.photos)} photos")
+        self.progress_bar.setFormat(f"{len(self.photos)} photos loaded")
+
+    def _add_photos(self, photos: List[Dict[str, Any]]):
+        """Append photos to the preview list and load their thumbnails."""
+        self.photos.extend(photos)
+        for photo in photos:
+            # Add item with a cached thumbnail or a placeholder for immediate feedback
+            thumbnail_url = photo.get("urls", {}).get("thumb", "")
+            cached = self.thumbnail_cache.get(thumbnail_url) if thumbnail_url else None
+            thumbnail = QPixmap.fromImage(cached) if cached is not None else None
+            item = self.preview_list.add_photo_item(photo, thumbnail)
+            if thumbnail_url in self._duplicate_thumbnails:
+                self.preview_list.mark_item_duplicate(item, self._duplicate_thumbnails[thumbnail_url])
+
+        # Load the missing thumbnails in the background
+        self.thumbnail_loader.schedule([photo.get("urls", {}).get("thumb", "") for photo in self.photos])
+
+    def _on_thumbnail_loaded(self, url: str, image: QImage):
+        """Show a background-loaded thumbnail in the rows that use it."""
+        pixmap = QPixmap.fromImage(image)
+        for i in range(self.preview_list.count()):
+            item = self.preview_list.item(i)
+            photo = item.data(Qt.UserRole) if item else None
+            if photo and photo.get("urls", {}).get("thumb", "") == url:
+                self.preview_list.set_item_thumbnail(item, pixmap)
+
+    def _on_duplicate_thumbnail(self, url: str, path: str):
+        """Mark the result rows whose thumbnail looks like a downloaded wallpaper."""
+        self._duplicate_thumbnails[url] = path
+        for i in range(self.preview_list.count()):
+            item = self.preview_list.item(i)
+            photo = item.data(Qt.UserRole) if item else None
+            if photo and photo.get("urls", {}).get("thumb", "") == url:
+                self.preview_list.mark_item_duplicate(item, path)
+
+    def _on_current_photo_changed(self, current: QListWidgetItem, previous: QListWidgetItem):
+        """Preview the newly selected row, whether chosen by mouse or keyboard."""
+        if current is not None:
+            self.preview_selected(current)
 
     def preview_selected(self, item: QListWidgetItem):
         """Handle photo selection for enhanced preview."""
@@ -417,6 +907,11 @@ class WallpaperApp(QMainWindow):
             photo = item.data(Qt.UserRole)
             self.selected_photo = photo
 
+            # Supersede whatever preview or prefetch is still in flight
+            self._preview_generation += 1
+            self._cancel_preview_load()
+            self.prefetcher.cancel()
+
             # Enable download button
             self.download_button.setEnabled(True)
 
@@ -424,40 +919,92 @@ class WallpaperApp(QMainWindow):
             author_name = photo.get('user', {}).get('name', 'Unknown')
             self.selected_preview.show_loading(f"Loading preview by {author_name}...")
 
-            # Load preview image asynchronously
-            QTimer.singleShot(50, lambda: self._load_preview_async(photo))
+            # Coalesce rapid selection changes into a single fetch
+            self._preview_timer.start()
 
         except Exception as e:
             logger.error(f"Preview error: {str(e)}")
             self.selected_preview.show_error(f"Preview failed: {str(e)}")
 
-    def _load_preview_async(self, photo: Dict[str, Any]):
-        """Load preview image asynchronously."""
-        try:
-            image_url = photo.get("urls", {}).get("small", "")
-            if image_url:
-                import requests
-                response = requests.get(image_url, timeout=5)
-                if response.status_code == 200:
-                    pixmap = QPixmap.fromImage(QImage.fromData(response.content))
-
-                    # Create info text
-                    author_name = photo.get('user', {}).get('name', 'Unknown')
-                    width = photo.get('width', 0)
-                    height = photo.get('height', 0)
-                    info_text = f"📸 {author_name}"
-                    if width and height:
-                        info_text += f"\n📐 {width} × {height}"
-
-                    self.selected_preview.show_image(pixmap, info_text)
-                else:
-                    self.selected_preview.show_error("Failed to load preview")
-            else:
-                self.selected_preview.show_error("No preview URL available")
+    def _cancel_preview_load(self):
+        """Abort the in-flight preview fetch, if any."""
+        if self._preview_worker is not None:
+            self._preview_worker.cancel()
+            self._preview_worker = None
 
-        except Exception as e:
-            logger.error(f"Async preview error: {str(e)}")
-            self.selected_preview.show_error(f"Preview error: {str(e)}")
+    def _start_preview_load(self):
+        """Fetch the preview of the current selection in a worker thread."""
+        if not self.selected_photo:
+            return
+
+        image_url = self.selected_photo.get("urls", {}).get("small", "")
+        if not image_url:
+            self.selected_preview.show_error("No preview URL available")
+            return
+
+        cached = self.preview_cache.get(image_url)
+        if cached is not None:
+            self._on_preview_loaded(self._preview_generation, cached)
+            return
+
+        worker = ImageFetchWorker(
+            image_url, self._preview_generation, self.selected_preview.image_size(), timeout=5, parent=self
+        )
+        worker.loaded.connect(self._on_preview_loaded)
+        worker.failed.connect(self._on_preview_failed)
+        worker.finished.connect(worker.deleteLater)
+        self._preview_worker = worker
+        worker.start()
+
+    def _on_preview_loaded(self, generation: int, image: QImage):
+        """Show a decoded preview if it still matches the selection."""
+        if generation != self._preview_generation or not self.selected_photo:
+            return
+        self._preview_worker = None
+
+        self.preview_cache.put(self.selected_photo.get("urls", {}).get("small", ""), image)
+        pixmap = QPixmap.fromImage(image)
+
+        # Create info text
+        photo = self.selected_photo
+        author_name = photo.get('user', {}).get('name', 'Unknown')
+        width = photo.get('width', 0)
+        height = photo.get('height', 0)
+        info_text = f"📸 {author_name}"
+        if width and height:
+            info_text += f"\n📐 {width} × {height}"
+
+        self.selected_preview.show_image(pixmap, info_text)
+        self._schedule_prefetch()
+
+    def _on_preview_failed(self, generation: int, message: str):
+        """Show a preview error unless the request has been superseded."""
+        if generation != self._preview_generation:
+            return
+        self._preview_worker = None
+        self.selected_preview.show_error(message)
+
+    def _on_photo_hovered(self, item: QListWidgetItem):
+        """Remember the hovered row and prefetch it when the preview is idle."""
+        self._hovered_photo = item.data(Qt.UserRole)
+        if self._preview_worker is None and not self._preview_timer.isActive():
+            self._schedule_prefetch()
+
+    def _schedule_prefetch(self):
+        """Prefetch previews for the hovered row and the selection's neighbours."""
+        photos = []
+        if self._hovered_photo:
+            photos.append(self._hovered_photo)
+
+        row = self.preview_list.currentRow()
+        if row >= 0:
+            for distance in range(1, PREFETCH_NEIGHBOURS + 1):
+                for neighbour in (row + distance, row - distance):
+                    item = self.preview_list.item(neighbour)
+                    if item:
+                        photos.append(item.data(Qt.UserRole))
+
+        self.prefetcher.schedule([photo.get("urls", {}).get("small", "") for photo in photos])
 
     def download_selected(self):
         """Download the selected photo with enhanced UI feedback."""
@@ -475,7 +1022,7 @@ class WallpaperApp(QMainWindow):
         author_name = self.selected_photo.get('user', {}).get('name', 'Unknown')
         self.downloaded_preview.show_loading(f"Downloading {author_name}'s photo...")
 
-        self.download_worker = DownloadWorker(self.selected_photo)
+        self.download_worker = DownloadWorker(self.selected_photo, self.photos_query)
         self.download_worker.progress.connect(self._update_download_progress)
         self.download_worker.finished.connect(self.on_download_finished)
         self.download_worker.error.connect(self.show_error)
@@ -489,8 +1036,10 @@ class WallpaperApp(QMainWindow):
         else:
             self.progress_bar.setFormat("Processing...")
 
-    def on_download_finished(self, path: str, pixmap: QPixmap):
+    def on_download_finished(self, path: str, thumbnail: QImage):
         """Handle download completion with enhanced UI feedback."""
+        pixmap = QPixmap.fromImage(thumbnail)
+
         # Reset download button
         self.download_button.setEnabled(True)
         self.download_button.setText("💾 Download")
@@ -498,13 +1047,9 @@ class WallpaperApp(QMainWindow):
         if path:
             self.downloaded_paths.append(path)
 
-            # Add to history with enhanced styling
+            # Add to the top of the history
             filename = os.path.basename(path)
-            item = QListWidgetItem(f"📁 {filename}")
-            item.setData(Qt.UserRole, path)
-            if not pixmap.isNull():
-                item.setIcon(QIcon(pixmap))
-            self.history_list.addItem(item)
+            self._add_downloaded_to_history(path, thumbnail)
 
             # Update downloaded preview card
             if not pixmap.isNull():
@@ -549,8 +1094,8 @@ class WallpaperApp(QMainWindow):
         self.set_wallpaper_button.setEnabled(False)
         self.set_wallpaper_button.setText("⏳ Setting...")
 
-        # Use timer to allow UI update before blocking operation
-        QTimer.singleShot(100, lambda: self._set_wallpaper_async(path, "desktop"))
+        with get_tracer().span("set_wallpaper", path=path):
+            self.wallpaper_applier.request(path, "desktop")
 
     def set_lockscreen(self, path: Optional[str] = None):
         """Set lockscreen wallpaper with enhanced feedback."""
@@ -569,50 +1114,104 @@ class WallpaperApp(QMainWindow):
         self.set_lockscreen_button.setEnabled(False)
         self.set_lockscreen_button.setText("⏳ Setting...")
 
-        # Use timer to allow UI update before blocking operation
-        QTimer.singleShot(100, lambda: self._set_wallpaper_async(path, "lockscreen"))
-
-    def _set_wallpaper_async(self, path: str, wallpaper_type: str):
-        """Set wallpaper asynchronously with proper feedback."""
-        try:
-            if wallpaper_type == "desktop":
-                success = self.wallpaper_manager.set_desktop_wallpaper(path)
-                button = self.set_wallpaper_button
-                success_msg = "✅ Desktop wallpaper set successfully!"
-                fail_msg = "❌ Failed to set desktop wallpaper"
-                button_text = "🖥️ Set Desktop"
-            else:
-                success = self.wallpaper_manager.set_lockscreen_wallpaper(path)
-                button = self.set_lockscreen_button
-                success_msg = "✅ Lockscreen wallpaper set successfully!"
-                fail_msg = "❌ Failed to set lockscreen wallpaper"
-                button_text = "🔒 Set Lockscreen"
-
-            # Update UI based on result
+        self.wallpaper_applier.request(path, "lockscreen")
+
+    def _on_wallpaper_applied(self, path: str, wallpaper_type: str, success: bool, elapsed_ms: float):
+        """Update the UI once a background wallpaper apply job has finished."""
+        if wallpaper_type == "desktop" and path == self._auto_apply_path:
+            self._auto_apply_path = None
+            get_metrics().observe(
+                "auto_change_seconds", time.perf_counter() - self._auto_started,
+                outcome="ok" if success else "error"
+            )
+            self._end_auto_trace("ok" if success else "error")
             if success:
-                self.status_label.setText(success_msg)
-                self.progress_bar.setFormat("Wallpaper set!")
+                self._auto_applied = (path, time.monotonic())
+                self.status_label.setText("Wallpaper set successfully")
             else:
-                self.status_label.setText(fail_msg)
-                self.progress_bar.setFormat("Failed to set wallpaper")
+                self.status_label.setText("Failed to set wallpaper")
 
-            # Re-enable button
-            button.setEnabled(True)
-            button.setText(button_text)
+            # Only auto-close if configured to do so
+            if not self._close_if_configured() and success:
+                self.status_label.setText("Wallpaper set successfully - App ready for manual use")
+            return
 
-            # Reset progress bar after delay
-            QTimer.singleShot(3000, lambda: self.progress_bar.setFormat("Ready"))
+        if wallpaper_type == "desktop":
+            button = self.set_wallpaper_button
+            success_msg = "✅ Desktop wallpaper set successfully!"
+            fail_msg = "❌ Failed to set desktop wallpaper"
+            button_text = "🖥️ Set Desktop"
+        else:
+            button = self.set_lockscreen_button
+            success_msg = "✅ Lockscreen wallpaper set successfully!"
+            fail_msg = "❌ Failed to set lockscreen wallpaper"
+            button_text = "🔒 Set Lockscreen"
 
-        except Exception as e:
-            logger.error(f"Error setting {wallpaper_type} wallpaper: {str(e)}")
-            self.status_label.setText(f"❌ Error setting {wallpaper_type} wallpaper")
+        # Update UI based on result
+        if success:
+            if wallpaper_type == "desktop":
+                self._record_manual_apply(path)
+            self.status_label.setText(success_msg)
+            self.progress_bar.setFormat(f"Wallpaper set in {elapsed_ms:.0f} ms")
+        else:
+            self.status_label.setText(fail_msg)
+            self.progress_bar.setFormat("Failed to set wallpaper")
+
+        # Re-enable button once no newer request of this kind is outstanding
+        if not self.wallpaper_applier.is_busy(wallpaper_type):
             button.setEnabled(True)
             button.setText(button_text)
 
+        # Reset progress bar after delay
+        QTimer.singleShot(3000, lambda: self.progress_bar.setFormat("Ready"))
+
+    def _record_manual_apply(self, path: str):
+        """Turn a wallpaper applied by hand into genre feedback."""
+        sampler = get_genre_sampler()
+        if self._auto_applied is not None:
+            auto_path, applied_at = self._auto_applied
+            if auto_path != path and time.monotonic() - applied_at <= GENRE_SKIP_WINDOW_S:
+                sampler.record_for_path(auto_path, "skip")
+            self._auto_applied = None
+        sampler.record_for_path(path, self._apply_events.pop(path, "apply"))
+
+    def _show_history_menu(self, position):
+        """Offer actions for the history entry under the cursor."""
+        item = self.history_list.itemAt(position)
+        path = item.data(Qt.UserRole) if item else None
+        if not path:
+            return
+
+        menu = QMenu(self)
+        apply_action = menu.addAction("🖥️ Set as wallpaper")
+        favourite_action = menu.addAction("⭐ More like this")
+        chosen = menu.exec_(self.history_list.viewport().mapToGlobal(position))
+        if chosen is apply_action:
+            self.set_wallpaper_from_history(item)
+        elif chosen is favourite_action:
+            get_genre_sampler().record_for_path(path, "favourite")
+            self.status_label.setText("⭐ You'll see more wallpapers like this one")
+
+    def _add_downloaded_to_history(self, path: str, thumbnail: QImage):
+        """Show a fresh download at the top of the history list."""
+        if path in self._history_items:
+            return
+
+        item = self._add_history_item(path, row=0)
+        # The library already counts the new download, so keep paging aligned
+        self._history_offset += 1
+        if not thumbnail.isNull():
+            # Only the icon-sized copy is kept, not the download's full thumbnail
+            icon_image = thumbnail.scaled(QSize(*HISTORY_THUMBNAIL_SIZE), Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            item.setIcon(QIcon(QPixmap.fromImage(icon_image)))
+        else:
+            self._schedule_history_thumbnails()
+
     def set_wallpaper_from_history(self, item: QListWidgetItem):
         """Set wallpaper from history item."""
         path = item.data(Qt.UserRole)
         if path and os.path.exists(path):
+            self._apply_events[path] = "reapply"
             self.set_wallpaper(path)
 
     def show_error(self, message: str):
@@ -623,22 +1222,114 @@ class WallpaperApp(QMainWindow):
 
     def show_error_and_close(self, message: str):
         """Show error message and optionally close application after delay."""
-        self.status_label.setText(message)
-        if AUTO_CLOSE_AFTER_WALLPAPER:
-            QTimer.singleShot(AUTO_CLOSE_DELAY_MS, self.close)
-        else:
-            # Change status to indicate manual mode
-            QTimer.singleShot(2000, lambda: self.status_label.setText("Error occurred - App ready for manual use"))
+        # Ignored once the local fallback took over; the late error doesn't matter
+        self._apply_local_fallback(message, outcome="error")
+
+    def _refresh_stats(self):
+        """Show the current metrics in the stats panel."""
+        metrics = get_metrics()
+        metrics.set_gauge("image_cache_entries", len(self.preview_cache), cache="preview")
+        metrics.set_gauge("image_cache_entries", len(self.thumbnail_cache), cache="thumbnail")
+        metrics.set_gauge("image_cache_entries", len(self.history_thumbnail_cache), cache="history_thumbnail")
+        self.memory_budget.record_gauges()
+        self.stats_panel.show_lines(summary_lines(metrics.snapshot()))
+
+    def _end_auto_trace(self, outcome: str):
+        """Finish the automatic change's trace span and write the trace."""
+        if self._auto_span is None:
+            return
+        self._auto_span.end(outcome=outcome)
+        self._auto_span = None
+        get_tracer().write(role="gui")
+
+    def _history_icon_bytes(self) -> int:
+        """Measure the icons of the history rows."""
+        total = 0
+        for i in range(self.history_list.count()):
+            for size in self.history_list.item(i).icon().availableSizes():
+                total += size.width() * size.height() * 4
+        return total
+
+    def _photo_metadata_bytes(self) -> int:
+        """Measure the photo dictionaries of the listed and cached search results."""
+        seen = set()
+        total = payload_nbytes(self.photos, seen)
+        for photos in self.query_cache.photo_lists():
+            total += payload_nbytes(photos, seen)
+        return total
+
+    def _close_if_configured(self) -> bool:
+        """
+        Close the window after the automatic change if the settings ask for it.
+
+        Returns:
+            True if closing was scheduled
+        """
+        settings = get_settings()
+        if not (self._auto_close and settings.auto_close_after_wallpaper):
+            return False
+        QTimer.singleShot(settings.auto_close_delay_ms, self.close)
+        return True
+
+    def _populate_genres(self, genres):
+        """Fill the genre selector, keeping the selected genre if it still exists."""
+        selected = self.genre_combo.currentText()
+        self.genre_combo.clear()
+        self.genre_combo.addItems(["🎲 Random"] + [f"🏎️ {genre}" for genre in genres])
+        index = self.genre_combo.findText(selected)
+        self.genre_combo.setCurrentIndex(max(index, 0))
+
+    def _notify_settings_changed(self, settings: Settings, changed):
+        """Hand a settings change from the watcher thread to the GUI thread."""
+        self.settings_changed.emit(settings, changed)
+
+    def _on_settings_changed(self, settings: Settings, changed):
+        """Apply changed settings to the open window; other settings are read when used."""
+        if "genres" in changed:
+            self._populate_genres(settings.genres)
+        if "download_dir" in changed:
+            # The history and duplicates now come from the new directory's library
+            self.history_list.clear()
+            self._history_items.clear()
+            self._history_offset, self._history_exhausted = 0, False
+            self._load_history_page()
+            self._build_duplicate_index()
+            self.status_label.setText(f"📁 New downloads go to {settings.download_dir}")
 
     def closeEvent(self, event):
         """Handle application close event."""
+        get_settings_store().unsubscribe(self._notify_settings_changed)
+        for source in ("preview_cards", "list_rows", "history_icons", "photo_metadata"):
+            self.memory_budget.remove_source(source)
+        self.watchdog.stop()
+        get_metrics().export()
+        get_tracer().write(role="gui")
+
         # Clean up worker threads
         if self.fetch_worker and self.fetch_worker.isRunning():
             self.fetch_worker.terminate()
             self.fetch_worker.wait()
 
+        for worker in self.findChildren(FetchWorker):
+            if worker.isRunning():
+                worker.terminate()
+                worker.wait()
+
         if self.download_worker and self.download_worker.isRunning():
             self.download_worker.terminate()
             self.download_worker.wait()
 
+        # Never interrupt a platform wallpaper call halfway through
+        self.wallpaper_applier.wait()
+
+        # Preview fetches and thumbnail loads are abortable, so let them wind down on their own
+        self.history_thumbnail_loader.cancel()
+        for worker in self.findChildren(ImageFetchWorker) + self.findChildren(LocalThumbnailWorker):
+            worker.cancel()
+            worker.wait()
+
+        # Background library reads hold SQLite connections; let them finish
+        for worker in self.findChildren(TaskWorker):
+            worker.wait()
+
         event.accept()
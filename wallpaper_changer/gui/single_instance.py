@@ -0,0 +1,133 @@
+"""
+Single-instance coordination over a local socket.
+
+The first GUI process listens on a per-user QLocalServer. Later launches
+connect to it, forward their command (show the window, apply a random
+wallpaper, search) and exit without building a second Qt application.
+Only QtCore and QtNetwork are needed on the client side.
+"""
+
+import os
+import json
+import getpass
+import logging
+from typing import Any, Dict, Optional
+
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+
+logger = logging.getLogger(__name__)
+
+# Commands understood by the running instance
+ACTION_SHOW = "show"
+ACTION_APPLY_RANDOM = "apply-random"
+ACTION_SEARCH = "search"
+
+_ACK = b"ok\n"
+
+
+def _server_name() -> str:
+    """Name of the local socket, unique per user."""
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = os.environ.get("USERNAME") or os.environ.get("USER") or "default"
+    return f"pixeldrive-{user}"
+
+
+def send_to_running_instance(command: Dict[str, Any], timeout_ms: int = 500) -> bool:
+    """
+    Forward a command to an already running instance.
+
+    Args:
+        command: Command dictionary with an ``action`` key
+        timeout_ms: Maximum time to wait for each step of the exchange
+
+    Returns:
+        True if a running instance accepted the command
+    """
+    socket = QLocalSocket()
+    socket.connectToServer(_server_name())
+    if not socket.waitForConnected(timeout_ms):
+        return False
+
+    # flush() hands everything to the socket, so only the reply is waited for
+    socket.write(json.dumps(command).encode("utf-8") + b"\n")
+    socket.flush()
+    acknowledged = socket.waitForReadyRead(timeout_ms) and bytes(socket.readAll()) == _ACK
+    socket.disconnectFromServer()
+
+    if acknowledged:
+        logger.info(f"Forwarded '{command.get('action')}' to the running instance")
+    return acknowledged
+
+
+class SingleInstanceServer(QObject):
+    """Receives commands from later launches of the application."""
+
+    # Signals
+    command_received = pyqtSignal(dict)  # Emitted with each forwarded command
+
+    def __init__(self, parent=None):
+        """
+        Initialize the server.
+
+        Args:
+            parent: Parent QObject
+        """
+        super().__init__(parent)
+        self._server = QLocalServer(self)
+        self._server.newConnection.connect(self._on_new_connection)
+
+    def start(self) -> bool:
+        """
+        Start listening for other instances.
+
+        A socket left behind by a crashed instance is removed, but only after
+        checking that nothing answers on it.
+
+        Returns:
+            True if this process is now the primary instance
+        """
+        name = _server_name()
+        if self._server.listen(name):
+            return True
+
+        probe = QLocalSocket()
+        probe.connectToServer(name)
+        if probe.waitForConnected(200):
+            probe.disconnectFromServer()
+            logger.warning("Another instance is already listening")
+            return False
+
+        QLocalServer.removeServer(name)
+        if not self._server.listen(name):
+            logger.error(f"Failed to listen for other instances: {self._server.errorString()}")
+            return False
+        return True
+
+    def _on_new_connection(self):
+        """Accept a connection and read its command once it arrives."""
+        socket: Optional[QLocalSocket] = self._server.nextPendingConnection()
+        while socket is not None:
+            socket.readyRead.connect(lambda s=socket: self._read_command(s))
+            socket.disconnected.connect(socket.deleteLater)
+            socket = self._server.nextPendingConnection()
+
+    def _read_command(self, socket: QLocalSocket):
+        """Parse a complete command line, acknowledge it and emit it."""
+        if not socket.canReadLine():
+            return
+
+        line = bytes(socket.readLine()).decode("utf-8", errors="replace")
+        try:
+            command = json.loads(line)
+        except ValueError:
+            logger.warning(f"Ignoring malformed instance command: {line!r}")
+            socket.disconnectFromServer()
+            return
+
+        socket.write(_ACK)
+        socket.flush()
+        logger.info(f"Received '{command.get('action')}' from another instance")
+        self.command_received.emit(command)
@@ -0,0 +1,100 @@
+"""
+Watchdog that catches the window's event loop being blocked.
+
+Work done on the GUI thread (slots, timers, paint events) holds up every
+other event until it returns; the window doesn't repaint or react to input
+meanwhile. A timer on the GUI thread beats every WATCHDOG_HEARTBEAT_MS, and
+how late each beat arrives is recorded as ``event_loop_latency_seconds``.
+A background thread watches the beats: once none has arrived for
+WATCHDOG_STALL_MS, it captures the GUI thread's Python stack, which points
+at the code blocking the loop, and logs it with the stall duration so far.
+The full duration is logged when the loop resumes.
+"""
+
+import sys
+import time
+import logging
+import threading
+import traceback
+from typing import Optional
+
+from PyQt5.QtCore import QObject, QTimer, Qt
+
+from wallpaper_changer.config import WATCHDOG_HEARTBEAT_MS, WATCHDOG_STALL_MS
+from wallpaper_changer.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoopWatchdog(QObject):
+    """Measures event-loop latency and logs where the GUI thread stalls."""
+
+    def __init__(self, stall_ms: int = WATCHDOG_STALL_MS, heartbeat_ms: int = WATCHDOG_HEARTBEAT_MS, parent=None):
+        """
+        Initialize the watchdog; it must be created on the GUI thread.
+
+        Args:
+            stall_ms: Time without a heartbeat that counts as a stall; 0
+                disables the watchdog
+            heartbeat_ms: Interval of the heartbeat timer
+            parent: Parent QObject
+        """
+        super().__init__(parent)
+        self.stall_ms = stall_ms
+        self.heartbeat_ms = heartbeat_ms
+        self.stalls = 0  # Stalls detected so far
+        self._gui_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()  # Written by the GUI thread only
+        self._reported_beat: Optional[float] = None  # Beat the last stall followed; written by the watcher only
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.setInterval(heartbeat_ms)
+        self._timer.timeout.connect(self._beat)
+
+    def start(self):
+        """Start the heartbeat and the watcher thread."""
+        if self.stall_ms <= 0 or self._thread is not None:
+            return
+        self._last_beat = time.monotonic()
+        self._timer.start()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._watch, name="stall-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop watching, e.g. before the window closes."""
+        self._timer.stop()
+        self._stopping.set()
+        self._thread = None
+
+    def _beat(self):
+        """Record how late this beat is and report the end of a stall."""
+        now = time.monotonic()
+        previous, self._last_beat = self._last_beat, now
+        gap = now - previous
+        metrics = get_metrics()
+        metrics.observe("event_loop_latency_seconds", max(gap - self.heartbeat_ms / 1000, 0.0))
+
+        if self._reported_beat == previous:
+            logger.warning(f"Event loop resumed after being blocked for {gap * 1000:.0f} ms")
+            metrics.observe("event_loop_stall_seconds", gap)
+
+    def _watch(self):
+        """Check for missing beats until stop() is called."""
+        while not self._stopping.wait(self.heartbeat_ms / 1000):
+            last_beat = self._last_beat
+            stalled_ms = (time.monotonic() - last_beat) * 1000
+            if stalled_ms >= self.stall_ms and self._reported_beat != last_beat:
+                self._reported_beat = last_beat
+                self._report(stalled_ms)
+
+    def _report(self, stalled_ms: float):
+        """Log the GUI thread's stack during a stall."""
+        self.stalls += 1
+        get_metrics().count("event_loop_stalls_total")
+        frame = sys._current_frames().get(self._gui_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else "  (not running Python code)\n"
+        logger.warning(f"Event loop blocked for {stalled_ms:.0f} ms so far; GUI thread stack:\n{stack.rstrip()}")
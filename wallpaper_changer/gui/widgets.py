@@ -3,7 +3,7 @@ Custom UI widgets for enhanced user experience.
 """
 
 import os
-from typing import Optional
+from typing import List, Optional
 from PyQt5.QtWidgets import (
     QLabel, QFrame, QVBoxLayout, QHBoxLayout, QWidget, 
     QGraphicsDropShadowEffect, QListWidget, QListWidgetItem
@@ -11,6 +11,8 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, pyqtProperty
 from PyQt5.QtGui import QPixmap, QMovie, QPainter, QPen, QColor, QFont
 
+from wallpaper_changer.utils.memory_budget import image_nbytes
+
 
 class LoadingSpinner(QLabel):
     """Animated loading spinner widget."""
@@ -147,15 +149,25 @@ class ImagePreviewCard(QFrame):
         self.loading_spinner.stop_animation()
         self.image_label.show()
         
-        # Scale pixmap to fit
-        scaled_pixmap = pixmap.scaled(
-            self.image_label.size(), 
-            Qt.KeepAspectRatio, 
-            Qt.SmoothTransformation
-        )
-        self.image_label.setPixmap(scaled_pixmap)
+        # Scale pixmap to fit, unless it was already decoded at display size
+        if pixmap.width() > self.image_label.width() or pixmap.height() > self.image_label.height():
+            pixmap = pixmap.scaled(
+                self.image_label.size(), 
+                Qt.KeepAspectRatio, 
+                Qt.SmoothTransformation
+            )
+        self.image_label.setPixmap(pixmap)
         self.info_label.setText(info)
         
+    def image_size(self) -> tuple:
+        """Return the (width, height) images are displayed at."""
+        return self.image_label.width(), self.image_label.height()
+
+    def pixmap_bytes(self) -> int:
+        """Return the size of the pixmap the card holds."""
+        pixmap = self.image_label.pixmap()
+        return image_nbytes(pixmap) if pixmap is not None else 0
+        
     def show_error(self, message: str = "Failed to load image"):
         """Show error state."""
         self.placeholder_label.show()
@@ -169,6 +181,8 @@ class ImagePreviewCard(QFrame):
 class EnhancedListWidget(QListWidget):
     """Enhanced list widget with better styling and animations."""
     
+    THUMBNAIL_SIZE = 64
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setVerticalScrollMode(QListWidget.ScrollPerPixel)
@@ -187,15 +201,13 @@ class EnhancedListWidget(QListWidget):
         
         # Thumbnail
         thumbnail_label = QLabel()
-        thumbnail_label.setFixedSize(64, 64)
+        thumbnail_label.setObjectName("thumbnail")
+        thumbnail_label.setFixedSize(self.THUMBNAIL_SIZE, self.THUMBNAIL_SIZE)
         thumbnail_label.setAlignment(Qt.AlignCenter)
         thumbnail_label.setProperty("class", "image-preview")
         
         if thumbnail_pixmap and not thumbnail_pixmap.isNull():
-            scaled_thumb = thumbnail_pixmap.scaled(
-                64, 64, Qt.KeepAspectRatio, Qt.SmoothTransformation
-            )
-            thumbnail_label.setPixmap(scaled_thumb)
+            self._set_thumbnail(thumbnail_label, thumbnail_pixmap)
         else:
             thumbnail_label.setText("📷")
             thumbnail_label.setProperty("class", "placeholder")
@@ -218,6 +230,7 @@ class EnhancedListWidget(QListWidget):
             description = f"{width} × {height}" if width and height else "High resolution"
         
         desc_label = QLabel(description[:50] + "..." if len(description) > 50 else description)
+        desc_label.setObjectName("description")
         desc_label.setProperty("class", "subtitle")
         desc_label.setWordWrap(True)
         
@@ -240,3 +253,64 @@ class EnhancedListWidget(QListWidget):
         self.setItemWidget(item, item_widget)
         
         return item
+    
+    def set_item_thumbnail(self, item: QListWidgetItem, pixmap: QPixmap):
+        """Replace the placeholder thumbnail of an existing item."""
+        widget = self.itemWidget(item)
+        thumbnail_label = widget.findChild(QLabel, "thumbnail") if widget else None
+        if thumbnail_label:
+            self._set_thumbnail(thumbnail_label, pixmap)
+    
+    def mark_item_duplicate(self, item: QListWidgetItem, path: str):
+        """Flag an item whose photo looks like a wallpaper that is already downloaded."""
+        widget = self.itemWidget(item)
+        desc_label = widget.findChild(QLabel, "description") if widget else None
+        if desc_label:
+            desc_label.setText("⚠️ Similar to a saved wallpaper")
+            widget.setToolTip(f"Looks like {os.path.basename(path)}")
+
+    def pixmap_bytes(self) -> int:
+        """Return the size of the thumbnails shown in the rows."""
+        total = 0
+        for i in range(self.count()):
+            widget = self.itemWidget(self.item(i))
+            label = widget.findChild(QLabel, "thumbnail") if widget else None
+            pixmap = label.pixmap() if label else None
+            if pixmap is not None:
+                total += image_nbytes(pixmap)
+        return total
+
+    def _set_thumbnail(self, label: QLabel, pixmap: QPixmap):
+        """Show a thumbnail, scaling only if it wasn't decoded at thumbnail size."""
+        if pixmap.width() > self.THUMBNAIL_SIZE or pixmap.height() > self.THUMBNAIL_SIZE:
+            pixmap = pixmap.scaled(
+                self.THUMBNAIL_SIZE, self.THUMBNAIL_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation
+            )
+        label.setPixmap(pixmap)
+
+
+class StatsPanel(QFrame):
+    """Live view of the pipeline metrics, one line per series."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setProperty("class", "card")
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(12, 8, 12, 8)
+        layout.setSpacing(4)
+
+        title = QLabel("📊 Pipeline stats")
+        title.setProperty("class", "subtitle")
+
+        self.text_label = QLabel("No measurements yet")
+        self.text_label.setFont(QFont("Consolas", 9))
+        self.text_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+
+        layout.addWidget(title)
+        layout.addWidget(self.text_label)
+        self.setLayout(layout)
+
+    def show_lines(self, lines: List[str]):
+        """Replace the shown metrics with the given summary lines."""
+        self.text_label.setText("\n".join(lines) if lines else "No measurements yet")
@@ -0,0 +1,146 @@
+"""
+Headless wallpaper rotation.
+
+Fetches, downloads and applies a wallpaper using only the API client and
+WallpaperManager, without importing PyQt5 up front. Used by ``pixeldrive
+apply`` so that rotating the wallpaper at login doesn't pay for a full GUI
+start; Qt is only loaded on the network thread to hash thumbnails, as the
+download worker does to avoid duplicates. When
+the network is down or slow, an already-downloaded wallpaper is used.
+"""
+
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+from wallpaper_changer.api import UnsplashAPI
+from wallpaper_changer.config import OFFLINE_FALLBACK_BUDGET_MS, LATE_DOWNLOAD_WAIT_S
+from wallpaper_changer.utils import WallpaperManager
+from wallpaper_changer.utils.downloads import index_download, photo_file_path, pick_distinct_photo
+from wallpaper_changer.utils.library import get_library
+from wallpaper_changer.utils.genre_sampler import get_genre_sampler
+from wallpaper_changer.utils.local_pool import LocalPool
+from wallpaper_changer.utils.photo_index import get_photo_index
+from wallpaper_changer.utils.screen_fit import target_sizes, wallpaper_candidates
+from wallpaper_changer.utils.tracing import get_tracer
+
+logger = logging.getLogger(__name__)
+
+
+def download_random_photo(query: Optional[str] = None,
+                          should_abort: Optional[Callable[[], bool]] = None) -> Optional[str]:
+    """
+    Search for photos and download a random one into the library.
+
+    Args:
+        query: Search query; a genre from the genre sampler is used when omitted
+        should_abort: Optional callable checked during the download; returning
+            True abandons it without leaving a file behind
+
+    Returns:
+        Path to the downloaded image, or None if any step failed
+    """
+    query = query or get_genre_sampler().pick()
+    api = UnsplashAPI()
+
+    try:
+        photos = api.search_photos(query)
+    except Exception as e:
+        logger.error(f"Failed to fetch photos: {str(e)}")
+        return None
+
+    if not photos:
+        logger.warning(f"No photos found for query: '{query}'")
+        return None
+    get_photo_index().add(photos, query)
+
+    # Random pick among photos that fit the screen, preferring those that
+    # match the selection rules, skipping those that look like a library
+    # wallpaper. No screen detection here, so the screen is FIT_FALLBACK_SCREEN.
+    photo, thumbnail = pick_distinct_photo(api, wallpaper_candidates(photos, target_sizes([])))
+    image_url = photo.get("urls", {}).get("full", "")
+    if not image_url:
+        logger.error("No image URL found in photo data")
+        return None
+
+    image_path = photo_file_path(photo)
+    if not api.download_photo(image_url, image_path, should_abort=should_abort):
+        return None
+
+    get_library().record_download(photo, image_path, query)
+    index_download(image_path, thumbnail)
+    return image_path
+
+
+def rotate_wallpaper(query: Optional[str] = None, lockscreen: bool = False,
+                     budget_ms: int = OFFLINE_FALLBACK_BUDGET_MS,
+                     late_wait_s: float = LATE_DOWNLOAD_WAIT_S) -> Optional[str]:
+    """
+    Fetch a random photo, download it and set it as wallpaper.
+
+    If the network path fails or takes longer than the budget, a wallpaper
+    from the local pool is applied instead. The download keeps going for up
+    to ``late_wait_s`` after that, so it still lands in the library for later
+    runs; past that it is cancelled. Either way the network thread has ended
+    when this returns.
+
+    Args:
+        query: Search query; a genre from the genre sampler is used when omitted
+        lockscreen: Also set the photo as lockscreen wallpaper
+        budget_ms: Time allowed for search and download; 0 waits indefinitely
+        late_wait_s: Time a download that missed the budget is given to
+            finish once the local wallpaper is applied
+
+    Returns:
+        Path to the applied image, or None if any step failed
+    """
+    tracer = get_tracer()
+    with tracer.span("rotate_wallpaper", query=query) as root:
+        result: Dict[str, Optional[str]] = {}
+        done = threading.Event()
+        cancelled = threading.Event()
+
+        def network():
+            with tracer.span("download_random_photo", parent=root):
+                result["path"] = download_random_photo(query, should_abort=cancelled.is_set)
+            done.set()
+
+        # A daemon thread, so a request hung before the download can't keep the process alive
+        thread = threading.Thread(target=network, name="rotation-network", daemon=True)
+        thread.start()
+        try:
+            finished = done.wait(budget_ms / 1000 if budget_ms > 0 else None)
+
+            image_path = result.get("path")
+            if not image_path:
+                reason = "failed" if finished else f"exceeded {budget_ms} ms"
+                logger.warning(f"Network path {reason}, using a downloaded wallpaper")
+                image_path = LocalPool().next_wallpaper()
+                if not image_path:
+                    root.set("outcome", "no_wallpaper")
+                    return None
+
+            success = WallpaperManager.apply(
+                desktop=image_path,
+                lockscreen=image_path if lockscreen else None
+            )
+            if success:
+                get_library().record_applied(image_path)
+            root.set("outcome", "ok" if success else "error")
+            return image_path if success else None
+        finally:
+            _finish_late_download(thread, done, cancelled, late_wait_s)
+
+
+def _finish_late_download(thread: threading.Thread, done: threading.Event,
+                          cancelled: threading.Event, wait_s: float):
+    """Give a late download time to finish, then cancel it and wait for the thread."""
+    if done.is_set():
+        thread.join()
+        return
+    logger.info(f"Waiting up to {wait_s:g} s for the late download to finish")
+    if not done.wait(wait_s):
+        logger.warning("Cancelling the late download")
+        cancelled.set()
+    # Bounded, as a request that hangs before the download never checks for cancellation
+    thread.join(wait_s)
@@ -0,0 +1,104 @@
+"""
+Import-time profiling for the wallpaper_changer package.
+
+Runs ``python -X importtime`` in a fresh interpreter and turns its output
+into a per-module breakdown, so cold-start regressions can be spotted and
+checked against a budget.
+"""
+
+import sys
+import subprocess
+from typing import Dict, List, NamedTuple, Optional
+
+# Cumulative import-time budgets in milliseconds for the entry modules of each
+# startup path. Generous on purpose: they catch accidental eager imports, not
+# machine-to-machine noise.
+IMPORT_BUDGETS_MS: Dict[str, float] = {
+    "wallpaper_changer.headless": 60.0,
+    "wallpaper_changer.gui.main_window": 400.0,
+}
+
+
+class ImportRecord(NamedTuple):
+    """Timing of one imported module, as reported by ``-X importtime``."""
+
+    module: str
+    self_ms: float
+    cumulative_ms: float
+    depth: int
+
+
+def measure_imports(module: str) -> List[ImportRecord]:
+    """
+    Import a module in a fresh interpreter and record every import it triggers.
+
+    Args:
+        module: Dotted name of the module to import
+
+    Returns:
+        One record per imported module, in the order reported by Python
+
+    Raises:
+        RuntimeError: If the module fails to import
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    records = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        records.append(ImportRecord(
+            name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000, depth
+        ))
+    return records
+
+
+def cumulative_ms(records: List[ImportRecord], module: str) -> Optional[float]:
+    """
+    Get the cumulative import time of a module from measured records.
+
+    Returns:
+        Milliseconds, or None if the module isn't among the records, e.g.
+        because it was already imported at interpreter startup
+    """
+    for record in records:
+        if record.module == module:
+            return record.cumulative_ms
+    return None
+
+
+def print_report(module: str, top: int = 20) -> int:
+    """
+    Print the slowest imports triggered by importing a module.
+
+    Args:
+        module: Dotted name of the module to import
+        top: Number of modules to list, sorted by self time
+
+    Returns:
+        Process exit code: 1 if the module exceeds its budget, 0 otherwise
+    """
+    records = measure_imports(module)
+    total = cumulative_ms(records, module)
+    if total is None:
+        print(f"{module} was not among the {len(records)} measured imports")
+        return 1
+
+    print(f"Import time for {module}: {total:.1f} ms over {len(records)} modules")
+    print(f"{'self ms':>9} {'cumul ms':>9}  module")
+    for record in sorted(records, key=lambda r: r.self_ms, reverse=True)[:top]:
+        print(f"{record.self_ms:9.1f} {record.cumulative_ms:9.1f}  {record.module}")
+
+    budget = IMPORT_BUDGETS_MS.get(module)
+    if budget is not None:
+        status = "within" if total <= budget else "OVER"
+        print(f"Budget: {budget:.0f} ms ({status})")
+        return 0 if total <= budget else 1
+    return 0
@@ -1,13 +1,30 @@
 """
 Main entry point for the Wallpaper Changer application.
+
+``pixeldrive`` starts the GUI, or hands ``--random`` / ``--search`` over to
+the instance that is already running. ``pixeldrive apply`` rotates the
+wallpaper headlessly, without loading PyQt5, which is much cheaper at login;
+``pixeldrive daemon`` keeps doing so on a schedule.
 """
 
+import time
+
+# Reference point for the startup timings logged by the GUI
+_PROCESS_STARTED = time.perf_counter()
+
+import os
 import sys
+import json
 import logging
-from PyQt5.QtWidgets import QApplication
+import argparse
+import statistics
+import subprocess
+from typing import List, Optional
 
-from wallpaper_changer.config import LOG_LEVEL, LOG_FORMAT
-from wallpaper_changer.gui import WallpaperApp
+from wallpaper_changer.config import (
+    LOG_LEVEL, LOG_FORMAT, DAEMON_INTERVAL_MINUTES, DAEMON_SCHEDULE, DAEMON_ON_UNLOCK,
+    DARK_MAX_BRIGHTNESS
+)
 
 
 def setup_logging():
@@ -18,26 +35,464 @@ def setup_logging():
     )
 
 
-def main():
+def _add_gui_arguments(parser: argparse.ArgumentParser):
+    """Add the options that are forwarded to an already running GUI."""
+    action = parser.add_mutually_exclusive_group()
+    action.add_argument(
+        "--random", action="store_true", default=argparse.SUPPRESS,
+        help="Apply a random wallpaper in the GUI"
+    )
+    action.add_argument("--search", default=argparse.SUPPRESS, help="Search for wallpapers in the GUI")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser."""
+    parser = argparse.ArgumentParser(
+        prog="pixeldrive",
+        description="Premium automotive wallpaper manager"
+    )
+    _add_gui_arguments(parser)
+    subparsers = parser.add_subparsers(dest="command")
+
+    gui_parser = subparsers.add_parser("gui", help="Start the graphical interface (default)")
+    _add_gui_arguments(gui_parser)
+
+    apply_parser = subparsers.add_parser(
+        "apply", help="Set a new wallpaper without starting the GUI"
+    )
+    source = apply_parser.add_mutually_exclusive_group()
+    source.add_argument(
+        "--random", action="store_true",
+        help="Pick a random genre (default)"
+    )
+    source.add_argument("--query", help="Search query to pick the wallpaper from")
+    apply_parser.add_argument(
+        "--lockscreen", action="store_true",
+        help="Also set the lockscreen wallpaper"
+    )
+
+    daemon_parser = subparsers.add_parser(
+        "daemon", help="Keep running and rotate the wallpaper on a schedule"
+    )
+    daemon_parser.add_argument(
+        "--interval", type=float, default=DAEMON_INTERVAL_MINUTES,
+        help=f"Minutes between rotations, 0 to disable (default: {DAEMON_INTERVAL_MINUTES:g})"
+    )
+    daemon_parser.add_argument(
+        "--at", action="append", default=list(DAEMON_SCHEDULE), metavar="CRON",
+        help='Cron expression to rotate at, e.g. "0 8 * * *"; repeatable'
+    )
+    daemon_parser.add_argument(
+        "--on-unlock", action="store_true", default=DAEMON_ON_UNLOCK,
+        help="Also rotate when the session is unlocked (GNOME)"
+    )
+    daemon_parser.add_argument("--query", help="Search query; a random genre by default")
+    daemon_parser.add_argument(
+        "--lockscreen", action="store_true",
+        help="Also set the lockscreen wallpaper"
+    )
+    control = daemon_parser.add_mutually_exclusive_group()
+    control.add_argument(
+        "--status", action="store_true",
+        help="Print the running daemon's next-run and last-run timings"
+    )
+    control.add_argument(
+        "--trigger", action="store_true",
+        help="Ask the running daemon to rotate now"
+    )
+
+    library_parser = subparsers.add_parser(
+        "library", help="List the downloaded wallpapers in the library index"
+    )
+    library_parser.add_argument(
+        "--sync", action="store_true",
+        help="Index files in the download directory and drop missing ones first"
+    )
+    library_parser.add_argument(
+        "--dedupe", action="store_true",
+        help="Hash unhashed wallpapers and list groups of near-duplicates"
+    )
+    library_parser.add_argument(
+        "--analyze", action="store_true",
+        help="Compute brightness and colour statistics of unanalyzed wallpapers"
+    )
+    library_parser.add_argument(
+        "--dark", type=float, metavar="MAX", nargs="?", const=DARK_MAX_BRIGHTNESS,
+        help="List wallpapers with mean brightness at most MAX (0-1)"
+    )
+    library_parser.add_argument(
+        "--accent", metavar="HEX",
+        help="List wallpapers with a dominant colour close to HEX, e.g. '#1e90ff'"
+    )
+    library_parser.add_argument(
+        "--genres", action="store_true",
+        help="List the genres by their current chance of being picked"
+    )
+    library_parser.add_argument("--limit", type=int, default=20, help="Wallpapers to list")
+
+    metrics_parser = subparsers.add_parser(
+        "metrics", help="Show the pipeline metrics last exported by each process"
+    )
+    metrics_parser.add_argument(
+        "--prometheus", action="store_true",
+        help="Print the Prometheus text files instead of the summary"
+    )
+
+    bench_parser = subparsers.add_parser(
+        "bench-startup", help="Compare headless and GUI startup time"
+    )
+    bench_parser.add_argument("--runs", type=int, default=5, help="Runs per path")
+
+    importtime_parser = subparsers.add_parser(
+        "importtime", help="Show the per-module import-time breakdown"
+    )
+    importtime_parser.add_argument(
+        "module", nargs="?", default="wallpaper_changer.gui.main_window",
+        help="Module to import (default: the GUI main window)"
+    )
+    importtime_parser.add_argument("--top", type=int, default=20, help="Modules to list")
+
+    memory_parser = subparsers.add_parser(
+        "memory-report", help="Run searches offscreen and show what retains memory"
+    )
+    memory_parser.add_argument("--searches", type=int, default=5, help="Searches to run")
+    memory_parser.add_argument("--top", type=int, default=15, help="Allocation sites to list")
+    memory_parser.add_argument(
+        "--query", action="append",
+        help="Query to search, repeatable; the configured genres by default"
+    )
+
+    return parser
+
+
+def gui_command(args: argparse.Namespace) -> dict:
+    """
+    Build the single-instance command for the GUI options.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        Command dictionary understood by WallpaperApp.handle_command
+    """
+    from wallpaper_changer.gui.single_instance import ACTION_SHOW, ACTION_APPLY_RANDOM, ACTION_SEARCH
+
+    if getattr(args, "search", None):
+        return {"action": ACTION_SEARCH, "query": args.search}
+    if getattr(args, "random", False):
+        return {"action": ACTION_APPLY_RANDOM}
+    return {"action": ACTION_SHOW}
+
+
+def run_gui(qt_args: List[str], command: Optional[dict] = None) -> int:
+    """
+    Run the graphical application.
+
+    If another instance is already running, the command is forwarded to it
+    and this process exits without creating any widgets.
+
+    Args:
+        qt_args: Arguments passed on to QApplication
+        command: Single-instance command; shows the window when omitted
+
+    Returns:
+        Process exit code
+    """
+    from wallpaper_changer.gui.single_instance import (
+        ACTION_SHOW, SingleInstanceServer, send_to_running_instance
+    )
+
+    command = command or {"action": ACTION_SHOW}
+    if send_to_running_instance(command):
+        return 0
+
+    from PyQt5.QtWidgets import QApplication
+    from wallpaper_changer.gui import WallpaperApp
+    from wallpaper_changer.utils.metrics import get_metrics
+
+    get_metrics().role = "gui"
+
+    # Create QApplication
+    app = QApplication(qt_args)
+
+    # Create and show main window; heavy startup work runs after the first frame
+    window = WallpaperApp(startup_started=_PROCESS_STARTED, startup_command=command)
+
+    # Let later launches reuse this window
+    server = SingleInstanceServer(window)
+    if server.start():
+        server.command_received.connect(window.handle_command)
+
+    window.show()
+
+    # Start event loop
+    return app.exec_()
+
+
+def run_apply(args: argparse.Namespace) -> int:
+    """
+    Rotate the wallpaper headlessly.
+
+    Args:
+        args: Parsed ``apply`` arguments
+
+    Returns:
+        Process exit code
+    """
+    from wallpaper_changer.headless import rotate_wallpaper
+    from wallpaper_changer.utils.metrics import get_metrics
+    from wallpaper_changer.utils.tracing import get_tracer
+
+    metrics = get_metrics()
+    metrics.role = "apply"
+    with metrics.timed("rotation_seconds", reason="apply"):
+        path = rotate_wallpaper(query=args.query, lockscreen=args.lockscreen)
+    metrics.export()
+    get_tracer().write(role="apply")
+    return 0 if path else 1
+
+
+def run_daemon(args: argparse.Namespace) -> int:
+    """
+    Run or control the rotation daemon.
+
+    Args:
+        args: Parsed ``daemon`` arguments
+
+    Returns:
+        Process exit code
+    """
+    from wallpaper_changer import daemon
+    from wallpaper_changer.utils.schedule import IntervalSchedule, CronSchedule
+
+    if args.status:
+        status = daemon.read_status()
+        if status is None:
+            print("No daemon status found")
+            return 1
+        print(json.dumps(status, indent=2))
+        return 0
+
+    if args.trigger:
+        if daemon.trigger_running_daemon():
+            return 0
+        print("No running daemon to trigger")
+        return 1
+
+    schedules = [CronSchedule(expression) for expression in args.at]
+    if args.interval > 0:
+        schedules.append(IntervalSchedule(args.interval))
+    if not schedules and not args.on_unlock:
+        print("Nothing to schedule: set --interval, --at or --on-unlock")
+        return 1
+
+    from wallpaper_changer.utils.metrics import get_metrics
+
+    get_metrics().role = "daemon"
+    rotation_daemon = daemon.RotationDaemon(
+        schedules, query=args.query, lockscreen=args.lockscreen, on_unlock=args.on_unlock
+    )
+    daemon.install_signal_handlers(rotation_daemon)
+    rotation_daemon.run_forever()
+    return 0
+
+
+def run_metrics(args: argparse.Namespace) -> int:
+    """
+    Print the metrics exported by the GUI, the daemon and headless runs.
+
+    Args:
+        args: Parsed ``metrics`` arguments
+
+    Returns:
+        Process exit code
+    """
+    from datetime import datetime
+    from wallpaper_changer.config import METRICS_NAME, data_path
+    from wallpaper_changer.utils.metrics import read_exports, summary_lines
+
+    metrics_dir = data_path(METRICS_NAME)
+    documents = read_exports(metrics_dir)
+    if not documents:
+        print(f"No metrics exported to {metrics_dir}; run with PIXELDRIVE_METRICS=1 to record them")
+        return 1
+
+    for document in documents:
+        if args.prometheus:
+            try:
+                with open(os.path.join(metrics_dir, f"{document['role']}.prom"), encoding="utf-8") as file:
+                    print(file.read(), end="")
+            except OSError:
+                continue
+            continue
+        exported = datetime.fromtimestamp(document["exported_at"]).strftime("%Y-%m-%d %H:%M:%S")
+        print(f"{document['role']} (pid {document['pid']}, exported {exported})")
+        for line in summary_lines(document["metrics"]):
+            print(f"  {line}")
+    return 0
+
+
+def run_library(args: argparse.Namespace) -> int:
+    """
+    Print the newest wallpapers in the library index.
+
+    Args:
+        args: Parsed ``library`` arguments
+
+    Returns:
+        Process exit code
+    """
+    from datetime import datetime
+    from wallpaper_changer.utils.library import get_library
+
+    library = get_library()
+    if args.sync:
+        changes = library.sync_directory()
+        print(f"Synced: {changes['added']} added, {changes['removed']} removed")
+
+    if args.dedupe:
+        from wallpaper_changer.utils.phash import scan_library, find_duplicate_groups
+
+        started = time.perf_counter()
+        hashed = scan_library(library)
+        groups = find_duplicate_groups(library.phashes())
+        print(f"Hashed {hashed} wallpapers in {time.perf_counter() - started:.1f} s")
+        print(f"{len(groups)} groups of near-duplicates")
+        for group in groups[:args.limit]:
+            print("  " + ", ".join(os.path.basename(path) for path in group))
+        return 0
+
+    if args.genres:
+        from wallpaper_changer.utils.genre_sampler import GenreSampler
+
+        weights = GenreSampler(library=library).weights()
+        total = sum(weights.values())
+        for genre, weight in sorted(weights.items(), key=lambda item: item[1], reverse=True)[:args.limit]:
+            print(f"{weight / total:6.1%}  {genre}")
+        return 0
+
+    if args.analyze:
+        from wallpaper_changer.utils.image_stats import analyze_library
+
+        started = time.perf_counter()
+        analyzed = analyze_library(library)
+        print(f"Analyzed {analyzed} wallpapers in {time.perf_counter() - started:.1f} s")
+
+    if args.dark is not None or args.accent:
+        from wallpaper_changer.utils.image_stats import get_stats_store
+        from wallpaper_changer.utils.selection import SelectionCriteria, hex_to_rgb
+
+        accent = hex_to_rgb(args.accent) if args.accent else None
+        if args.accent and accent is None:
+            print(f"Invalid colour: {args.accent}", file=sys.stderr)
+            return 2
+
+        store = get_stats_store()
+        total = len(store)  # Loads the columns outside the timing
+        started = time.perf_counter()
+        matches = store.select(SelectionCriteria(args.dark, accent))
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"{len(matches)} of {total} analyzed wallpapers match ({elapsed_ms:.1f} ms)")
+        for path in matches[:args.limit]:
+            print(f"  {os.path.basename(path)}")
+        return 0
+
+    print(f"{library.count()} wallpapers indexed")
+    for entry in library.recent(args.limit):
+        downloaded = datetime.fromtimestamp(entry.downloaded_at).strftime("%Y-%m-%d %H:%M")
+        print(
+            f"{downloaded}  {entry.query or '-':<20} applied {entry.apply_count:>3}x  "
+            f"{os.path.basename(entry.path)}"
+        )
+    return 0
+
+
+# Code run by bench-startup for each path, up to the point where the
+# wallpaper fetch would start (the fetch itself is skipped)
+_STARTUP_PROBES = {
+    "headless": "import wallpaper_changer.headless",
+    "gui": (
+        "import sys\n"
+        "from PyQt5.QtWidgets import QApplication\n"
+        "from wallpaper_changer.gui import WallpaperApp\n"
+        "WallpaperApp.auto_change_wallpaper = lambda self: None\n"
+        "app = QApplication(sys.argv)\n"
+        "window = WallpaperApp()\n"
+        "window.show()\n"
+        "app.processEvents()\n"
+    ),
+}
+
+
+def benchmark_startup(runs: int = 5) -> int:
+    """
+    Measure the wall time to start each path in a fresh interpreter.
+
+    Args:
+        runs: Number of runs per path; the median is reported
+
+    Returns:
+        Process exit code
+    """
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    medians = {}
+    for name, code in _STARTUP_PROBES.items():
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True)
+            timings.append((time.perf_counter() - started) * 1000)
+            if result.returncode != 0:
+                print(f"{name} startup failed:\n{result.stderr.decode(errors='replace')}")
+                return 1
+        medians[name] = statistics.median(timings)
+        print(f"{name:>9}: median {medians[name]:7.1f} ms over {runs} runs")
+
+    print(f"  speedup: {medians['gui'] / medians['headless']:.1f}x faster headless")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None):
     """Main entry point for the application."""
+    argv = sys.argv[1:] if argv is None else argv
+
     # Set up logging
     setup_logging()
     logger = logging.getLogger(__name__)
-    
+
+    # Unknown arguments are left for Qt (e.g. -style) in GUI mode
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if extra and args.command not in (None, "gui"):
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+
     try:
-        # Create QApplication
-        app = QApplication(sys.argv)
-        
-        # Create and show main window
-        window = WallpaperApp()
-        window.show()
-        
-        # Start event loop
-        sys.exit(app.exec_())
-        
+        if args.command == "apply":
+            exit_code = run_apply(args)
+        elif args.command == "daemon":
+            exit_code = run_daemon(args)
+        elif args.command == "library":
+            exit_code = run_library(args)
+        elif args.command == "metrics":
+            exit_code = run_metrics(args)
+        elif args.command == "bench-startup":
+            exit_code = benchmark_startup(args.runs)
+        elif args.command == "importtime":
+            from wallpaper_changer.importtime import print_report
+            exit_code = print_report(args.module, args.top)
+        elif args.command == "memory-report":
+            from wallpaper_changer.memory_report import run_report
+            exit_code = run_report(args.searches, args.top, args.query)
+        else:
+            exit_code = run_gui([sys.argv[0]] + extra, gui_command(args))
+
     except Exception as e:
         logger.error(f"Application failed to start: {str(e)}")
-        sys.exit(1)
+        exit_code = 1
+
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,132 @@
+"""
+Memory report of the window after a series of searches.
+
+Opens the window offscreen, runs a number of searches the way a user would
+(search, wait for the thumbnails, preview the first result) and compares a
+tracemalloc snapshot taken after them with one taken after a warm-up
+search, which leaves out lazy imports and other one-time allocations. The
+allocation sites that grew most are what the searches left behind.
+
+tracemalloc only sees memory allocated by Python, such as the photo
+dictionaries; the pixel buffers of QImages and QPixmaps are allocated by
+Qt. Those are reported from the window's MemoryBudget instead.
+"""
+
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from typing import List, Optional
+
+# Stack depth recorded per allocation
+_TRACE_FRAMES = 10
+
+# Seconds the window is given to finish its deferred startup work
+_STARTUP_SETTLE_S = 1.0
+
+# Allocations by the import machinery and tracemalloc itself aren't retainers
+_IGNORED_FILES = (
+    "<frozen importlib._bootstrap>",
+    "<frozen importlib._bootstrap_external>",
+    "<unknown>",
+    tracemalloc.__file__,
+)
+
+
+def _wait_until_idle(app, window, timeout_s: float, min_s: float = 0.0):
+    """Process events until the window has nothing loading, or the timeout passes."""
+    from PyQt5.QtCore import QEvent
+
+    started = time.monotonic()
+    while time.monotonic() - started < timeout_s:
+        app.processEvents()
+        # Outside exec_(), objects passed to deleteLater() are only deleted on request
+        app.sendPostedEvents(None, QEvent.DeferredDelete)
+        if time.monotonic() - started >= min_s and not window.is_loading():
+            return
+        time.sleep(0.02)
+
+
+def _search(app, window, query: str, timeout_s: float):
+    """Search like a user would: wait for the results and thumbnails, then preview the first."""
+    from wallpaper_changer.gui.single_instance import ACTION_SEARCH
+
+    window.handle_command({"action": ACTION_SEARCH, "query": query})
+    _wait_until_idle(app, window, timeout_s)
+    if window.preview_list.count():
+        window.preview_list.setCurrentRow(0)
+        _wait_until_idle(app, window, timeout_s)
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    """Take a snapshot of the live Python allocations."""
+    gc.collect()
+    return tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, pattern) for pattern in _IGNORED_FILES]
+    )
+
+
+def run_report(searches: int = 5, top: int = 15, queries: Optional[List[str]] = None,
+               timeout_s: float = 30.0) -> int:
+    """
+    Run searches in an offscreen window and print what retains memory.
+
+    Args:
+        searches: Number of searches to run
+        top: Number of allocation sites to list
+        queries: Queries to search, repeated as needed; the genres of the
+            current settings by default
+        timeout_s: Time allowed per search for results and thumbnails
+
+    Returns:
+        Process exit code
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    tracemalloc.start(_TRACE_FRAMES)
+
+    from PyQt5.QtWidgets import QApplication
+    from wallpaper_changer.gui import WallpaperApp
+    from wallpaper_changer.settings import get_settings
+
+    queries = queries or list(get_settings().genres)
+    if not queries:
+        print("No queries to search", file=sys.stderr)
+        return 2
+
+    app = QApplication.instance() or QApplication([sys.argv[0]])
+    # The report must not change the desktop wallpaper or close partway through
+    window = WallpaperApp(skip_startup_change=True, auto_close=False)
+    window.show()
+    _wait_until_idle(app, window, timeout_s, _STARTUP_SETTLE_S)
+    # Taking snapshots blocks the event loop on purpose
+    window.watchdog.stop()
+
+    _search(app, window, queries[-1], timeout_s)
+    baseline = _snapshot()
+
+    for i in range(searches):
+        query = queries[i % len(queries)]
+        started = time.perf_counter()
+        _search(app, window, query, timeout_s)
+        print(f"Search {i + 1}: '{query}', {window.preview_list.count()} photos "
+              f"in {time.perf_counter() - started:.1f} s")
+
+    snapshot = _snapshot()
+    growth = snapshot.compare_to(baseline, "traceback")
+    total = sum(stat.size_diff for stat in growth)
+    print(f"\nPython allocations grew by {total / 1024:.1f} KiB over {searches} searches; top retainers:")
+    for stat in [stat for stat in growth if stat.size_diff > 0][:top]:
+        frame = stat.traceback[-1]  # Frames run from the oldest; the last one allocated
+        print(f"{stat.size_diff / 1024:10.1f} KiB {stat.count_diff:+7d} blocks  "
+              f"{frame.filename}:{frame.lineno}")
+        for caller in list(stat.traceback)[-2:-4:-1]:
+            print(f"{'':31}from {caller.filename}:{caller.lineno}")
+
+    print("\nImages and metadata by subsystem (including Qt pixel buffers):")
+    for line in window.memory_budget.summary_lines():
+        print(f"  {line}")
+
+    tracemalloc.stop()
+    window.close()
+    return 0
@@ -0,0 +1,283 @@
+"""
+User settings that take effect while the application runs.
+
+config.py holds the built-in defaults; a user's overrides live in a JSON
+file at SETTINGS_PATH (written by ``python wallpaper_config.py``). The
+current values form one immutable Settings snapshot. Code reads it with
+get_settings() where a value is used instead of importing the constant, so
+a change reaches the API client, downloads and the window without a restart.
+
+While watched, the file is polled for changes. A changed file is parsed and
+validated as a whole before the new snapshot replaces the old one, so
+readers see either all of an edit or none of it; an invalid file is logged
+and ignored. Subscribers are then called, on the watcher thread, with the
+new snapshot and the names of the settings that changed.
+"""
+
+import os
+import json
+import logging
+import threading
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from wallpaper_changer import config
+from wallpaper_changer.config import SETTINGS_PATH, SETTINGS_POLL_S
+
+logger = logging.getLogger(__name__)
+
+
+class Settings(NamedTuple):
+    """Snapshot of the user-adjustable settings."""
+
+    auto_close_after_wallpaper: bool
+    auto_close_delay_ms: int
+    genres: Tuple[str, ...]
+    api_key: str
+    download_dir: str
+
+    @classmethod
+    def defaults(cls) -> "Settings":
+        """Build the snapshot of the built-in defaults from config.py."""
+        return cls(
+            auto_close_after_wallpaper=config.AUTO_CLOSE_AFTER_WALLPAPER,
+            auto_close_delay_ms=config.AUTO_CLOSE_DELAY_MS,
+            genres=tuple(config.GENRES),
+            api_key=config.API_KEY,
+            download_dir=config.DOWNLOAD_DIR,
+        )
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """HTTP headers authenticating Unsplash API requests."""
+        return {"Authorization": f"Client-ID {self.api_key}", "Accept-Version": config.UNSPLASH_API_VERSION}
+
+
+SettingsCallback = Callable[[Settings, Set[str]], None]
+
+
+def _coerce(name: str, value: Any) -> Any:
+    """
+    Check a value from the settings file against the setting's type.
+
+    Args:
+        name: Setting name, one of Settings._fields
+        value: Value as parsed from JSON
+
+    Returns:
+        The value in the setting's type
+
+    Raises:
+        ValueError: If the value has the wrong type
+    """
+    kind = Settings.__annotations__[name]
+    if kind is bool and isinstance(value, bool):
+        return value
+    if kind is int and isinstance(value, int) and not isinstance(value, bool) and value >= 0:
+        return value
+    if kind is str and isinstance(value, str):
+        return os.path.expanduser(value) if name == "download_dir" else value
+    if name == "genres" and isinstance(value, list) and all(isinstance(genre, str) and genre.strip() for genre in value):
+        return tuple(genre.strip() for genre in value)
+    raise ValueError(f"invalid value for '{name}': {value!r}")
+
+
+def parse_settings(data: Any, defaults: Optional[Settings] = None) -> Settings:
+    """
+    Build a snapshot from the contents of a settings file.
+
+    Settings missing from the file, or left empty, keep their defaults.
+
+    Args:
+        data: Parsed JSON of the settings file
+        defaults: Values of settings the file leaves out; the built-in
+            defaults when omitted
+
+    Returns:
+        The resulting settings
+
+    Raises:
+        ValueError: If the file isn't a JSON object or a value is invalid
+    """
+    if not isinstance(data, dict):
+        raise ValueError("the settings file must contain a JSON object")
+
+    values = {}
+    for name, value in data.items():
+        if name not in Settings._fields:
+            logger.warning(f"Ignoring unknown setting '{name}'")
+            continue
+        if value in ("", [], None):
+            continue
+        values[name] = _coerce(name, value)
+    return (defaults or Settings.defaults())._replace(**values)
+
+
+class SettingsStore:
+    """Holds the current settings and reloads them when the file changes."""
+
+    def __init__(self, path: str = SETTINGS_PATH, poll_interval: float = SETTINGS_POLL_S):
+        """
+        Load the settings file.
+
+        Args:
+            path: JSON settings file; the defaults apply while it doesn't exist
+            poll_interval: Seconds between checks for changes while watching
+        """
+        self.path = path
+        self.poll_interval = poll_interval
+        self._settings = Settings.defaults()
+        self._signature: Optional[Tuple[int, int]] = None
+        self._subscribers: List[SettingsCallback] = []
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self.reload()
+
+    @property
+    def current(self) -> Settings:
+        """The current settings snapshot."""
+        return self._settings
+
+    def subscribe(self, callback: SettingsCallback):
+        """
+        Get notified of changes.
+
+        Args:
+            callback: Called as ``callback(settings, changed_names)`` after
+                each reload that changed something, from the reloading thread
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: SettingsCallback):
+        """Stop notifying a callback passed to subscribe()."""
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        """Modification time and size of the file, or None if it doesn't exist."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload(self, force: bool = False) -> Set[str]:
+        """
+        Re-read the file if it changed and swap in the new settings.
+
+        Args:
+            force: Re-read even if the file looks unchanged
+
+        Returns:
+            Names of the settings that changed
+        """
+        with self._lock:
+            signature = self._file_signature()
+            if signature == self._signature and not force:
+                return set()
+            self._signature = signature
+
+            try:
+                data = {}
+                if signature is not None:
+                    with open(self.path, encoding="utf-8") as file:
+                        data = json.load(file)
+                settings = parse_settings(data)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Keeping the current settings, {self.path} is invalid: {str(e)}")
+                return set()
+
+            previous, self._settings = self._settings, settings
+            subscribers = list(self._subscribers)
+
+        changed = {name for name in Settings._fields if getattr(settings, name) != getattr(previous, name)}
+        if changed:
+            logger.info(f"Settings changed: {', '.join(sorted(changed))}")
+            for callback in subscribers:
+                try:
+                    callback(settings, changed)
+                except Exception as e:
+                    logger.error(f"Settings subscriber failed: {str(e)}")
+        return changed
+
+    def save(self, values: Dict[str, Any]) -> Set[str]:
+        """
+        Write settings to the file and apply them.
+
+        Args:
+            values: Settings to change, by name; other settings in the file
+                are kept
+
+        Returns:
+            Names of the settings that changed
+
+        Raises:
+            ValueError: If a value is invalid; nothing is written then
+            OSError: If the file can't be written
+        """
+        data: Dict[str, Any] = {}
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            pass
+        if not isinstance(data, dict):
+            data = {}
+        data.update(values)
+        parse_settings(data)
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=2)
+        os.replace(temp_path, self.path)
+        return self.reload(force=True)
+
+    def start_watching(self):
+        """Start checking the file for changes on a background thread."""
+        with self._lock:
+            if self._watcher is not None and self._watcher.is_alive():
+                return
+            self._stopping.clear()
+            self._watcher = threading.Thread(target=self._watch, name="settings-watcher", daemon=True)
+            self._watcher.start()
+
+    def stop_watching(self):
+        """Stop checking the file for changes."""
+        self._stopping.set()
+
+    def _watch(self):
+        """Poll the file until stop_watching() is called."""
+        while not self._stopping.wait(self.poll_interval):
+            self.reload()
+
+
+_store: Optional[SettingsStore] = None
+_store_lock = threading.Lock()
+
+
+def get_settings_store() -> SettingsStore:
+    """
+    Get the shared settings store, loading the file on first use.
+
+    Returns:
+        The process-wide SettingsStore instance
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SettingsStore()
+        return _store
+
+
+def get_settings() -> Settings:
+    """
+    Get the current settings.
+
+    Returns:
+        The current snapshot; hold on to it only as long as values from the
+        same moment are needed
+    """
+    return get_settings_store().current
@@ -1,7 +1,23 @@
 """
 Utility modules for wallpaper operations.
+
+Attributes are imported lazily on first access.
 """
 
-from .wallpaper import WallpaperManager
+from wallpaper_changer._lazy import lazy_exports
+
+_EXPORTS = {
+    'WallpaperManager': '.wallpaper',
+    'ImageCache': '.image_cache',
+    'WallpaperBackend': '.backends',
+    'FakeBackend': '.backends',
+    'register_backend': '.backends',
+    'get_backend': '.backends',
+    'set_backend': '.backends',
+    'WallpaperLibrary': '.library',
+    'get_library': '.library',
+    'MemoryBudget': '.memory_budget',
+    'get_memory_budget': '.memory_budget',
+}
 
-__all__ = ['WallpaperManager']
+__getattr__, __dir__, __all__ = lazy_exports(__name__, _EXPORTS)
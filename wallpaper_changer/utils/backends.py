@@ -0,0 +1,390 @@
+"""
+Pluggable platform backends for applying wallpapers.
+
+The backend for the running desktop environment is detected once and cached.
+Each backend applies the desktop, lockscreen and dark-mode wallpapers in one
+batched operation using as few process spawns as the platform allows.
+"""
+
+import os
+import sys
+import time
+import shutil
+import ctypes
+import logging
+import subprocess
+from typing import Any, Dict, List, Optional, Type
+
+from wallpaper_changer.utils.tracing import get_tracer
+
+try:
+    import winreg
+except ImportError:
+    winreg = None  # Not available on non-Windows platforms
+
+logger = logging.getLogger(__name__)
+
+# Environment variable forcing a backend by name, e.g. "fake" in tests
+BACKEND_ENV_VAR = "PIXELDRIVE_BACKEND"
+
+
+class WallpaperBackend:
+    """Base class for platform wallpaper backends."""
+
+    name = "base"
+
+    def __init__(self):
+        """Initialize the backend."""
+        self.last_timings: Dict[str, float] = {}  # Step name -> milliseconds
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Return True if this backend can drive the current desktop."""
+        return False
+
+    def apply(
+        self,
+        desktop: Optional[str] = None,
+        lockscreen: Optional[str] = None,
+        dark: Optional[str] = None,
+        spanned: bool = False
+    ) -> bool:
+        """
+        Apply wallpapers in one batch.
+
+        Args:
+            desktop: Image for the desktop background
+            lockscreen: Image for the lockscreen
+            dark: Image for the dark-mode desktop background; defaults to
+                ``desktop`` on backends that distinguish the two
+            spanned: The images were rendered to cover the whole layout of
+                several screens; backends that can switch the desktop to
+                span one image across the screens do so
+
+        Returns:
+            True if every requested wallpaper was applied
+        """
+        self.last_timings = {}
+        started = time.perf_counter()
+        with get_tracer().span("backend.apply", backend=self.name, spanned=spanned) as span:
+            try:
+                success = self._apply(desktop, lockscreen, dark, spanned)
+            except Exception as e:
+                logger.error(f"{self.name} backend failed to apply wallpaper: {str(e)}")
+                success = False
+            span.set("success", success)
+        self.last_timings["total"] = (time.perf_counter() - started) * 1000
+
+        timings = ", ".join(f"{step}={ms:.0f} ms" for step, ms in self.last_timings.items())
+        logger.info(f"{self.name} backend applied wallpaper ({timings})")
+        return success
+
+    def _apply(self, desktop: Optional[str], lockscreen: Optional[str], dark: Optional[str],
+               spanned: bool) -> bool:
+        """Apply wallpapers; implemented by subclasses."""
+        raise NotImplementedError
+
+    def _timed(self, step: str, func, *args) -> bool:
+        """Run one platform call and record how long it took."""
+        started = time.perf_counter()
+        try:
+            with get_tracer().span(step):
+                return func(*args)
+        finally:
+            self.last_timings[step] = (time.perf_counter() - started) * 1000
+
+    def _run(self, cmd: List[str], input_text: Optional[str] = None) -> bool:
+        """Run a command, logging its error output on failure."""
+        result = subprocess.run(cmd, input=input_text, capture_output=True, text=True)
+        if result.returncode != 0:
+            logger.error(f"Command '{cmd[0]}' failed: {result.stderr.strip()}")
+        return result.returncode == 0
+
+
+_BACKENDS: List[Type[WallpaperBackend]] = []
+_detected: Optional[WallpaperBackend] = None
+
+
+def register_backend(backend_class: Type[WallpaperBackend]) -> Type[WallpaperBackend]:
+    """
+    Register a backend class; earlier registrations are preferred.
+
+    Can be used as a class decorator.
+    """
+    _BACKENDS.append(backend_class)
+    return backend_class
+
+
+def get_backend() -> Optional[WallpaperBackend]:
+    """
+    Get the backend for the running desktop, detecting it on first use.
+
+    Returns:
+        The cached backend instance, or None if the platform is unsupported
+    """
+    global _detected
+    if _detected is None:
+        _detected = _detect_backend()
+    return _detected
+
+
+def set_backend(backend: Optional[WallpaperBackend]):
+    """Override the cached backend; None re-runs detection on next use."""
+    global _detected
+    _detected = backend
+
+
+def _detect_backend() -> Optional[WallpaperBackend]:
+    """Pick the first available registered backend."""
+    forced = os.environ.get(BACKEND_ENV_VAR)
+    for backend_class in _BACKENDS:
+        if (forced and backend_class.name == forced) or (not forced and backend_class.is_available()):
+            logger.info(f"Using {backend_class.name} wallpaper backend")
+            return backend_class()
+
+    logger.error(f"No wallpaper backend available for platform: {sys.platform}")
+    return None
+
+
+@register_backend
+class WindowsBackend(WallpaperBackend):
+    """Windows backend using SystemParametersInfoW and the PersonalizationCSP key."""
+
+    name = "windows"
+
+    SPI_SETDESKWALLPAPER = 20
+    SPIF_UPDATE_AND_BROADCAST = 3
+    WALLPAPER_STYLE_SPAN = "22"  # WallpaperStyle value spanning one image across all monitors
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return sys.platform == "win32"
+
+    def _apply(self, desktop: Optional[str], lockscreen: Optional[str], dark: Optional[str],
+               spanned: bool) -> bool:
+        success = True
+        if desktop and spanned:
+            # Read by SystemParametersInfoW, so it must be written first
+            success = self._timed("span_style", self._set_span_style) and success
+        if desktop:
+            success = self._timed("desktop", self._set_desktop, desktop) and success
+        if lockscreen:
+            success = self._timed("lockscreen", self._set_lockscreen, lockscreen) and success
+            if not desktop:
+                # Also set as desktop wallpaper as fallback
+                self._timed("desktop", self._set_desktop, lockscreen)
+        return success
+
+    def _set_desktop(self, image_path: str) -> bool:
+        """Set Windows desktop wallpaper."""
+        # Convert to absolute path with Windows path separators
+        abs_path = os.path.abspath(image_path).replace('/', '\\')
+        result = ctypes.windll.user32.SystemParametersInfoW(
+            self.SPI_SETDESKWALLPAPER, 0, abs_path, self.SPIF_UPDATE_AND_BROADCAST
+        )
+
+        if result:
+            logger.info(f"Successfully set Windows desktop wallpaper: {abs_path}")
+            return True
+        logger.error("Failed to set Windows desktop wallpaper")
+        return False
+
+    def _set_span_style(self) -> bool:
+        """Make the desktop wallpaper span all monitors."""
+        if not winreg:
+            logger.error("winreg module not available")
+            return False
+
+        try:
+            key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Control Panel\Desktop", 0, winreg.KEY_SET_VALUE)
+            winreg.SetValueEx(key, "WallpaperStyle", 0, winreg.REG_SZ, self.WALLPAPER_STYLE_SPAN)
+            winreg.SetValueEx(key, "TileWallpaper", 0, winreg.REG_SZ, "0")
+            winreg.CloseKey(key)
+            return True
+        except OSError as e:
+            logger.error(f"Failed to set the span wallpaper style: {str(e)}")
+            return False
+
+    def _set_lockscreen(self, image_path: str) -> bool:
+        """Set Windows lockscreen wallpaper."""
+        if not winreg:
+            logger.error("winreg module not available")
+            return False
+
+        try:
+            abs_path = os.path.abspath(image_path).replace('/', '\\')
+            reg_path = r"SOFTWARE\Microsoft\Windows\CurrentVersion\PersonalizationCSP"
+
+            try:
+                key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, reg_path, 0, winreg.KEY_ALL_ACCESS)
+            except FileNotFoundError:
+                key = winreg.CreateKey(winreg.HKEY_LOCAL_MACHINE, reg_path)
+
+            winreg.SetValueEx(key, "LockScreenImagePath", 0, winreg.REG_SZ, abs_path)
+            winreg.SetValueEx(key, "LockScreenImageStatus", 0, winreg.REG_DWORD, 1)
+            winreg.CloseKey(key)
+
+            logger.info(f"Successfully set Windows lockscreen wallpaper: {abs_path}")
+            return True
+
+        except PermissionError:
+            logger.error("Permission denied: Run as administrator to set lockscreen")
+            return False
+
+
+@register_backend
+class MacOSBackend(WallpaperBackend):
+    """
+    macOS backend using a single osascript call.
+
+    macOS can't span one image across displays; a spanned render is set on
+    every desktop as is.
+    """
+
+    name = "macos"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return sys.platform == "darwin"
+
+    def _apply(self, desktop: Optional[str], lockscreen: Optional[str], dark: Optional[str],
+               spanned: bool) -> bool:
+        # macOS doesn't have separate lockscreen wallpaper
+        image_path = desktop or lockscreen
+        if not image_path:
+            return True
+
+        abs_path = os.path.abspath(image_path)
+        cmd = [
+            "osascript", "-e",
+            f'tell app "System Events" to set picture of every desktop to "{abs_path}"'
+        ]
+        success = self._timed("osascript", self._run, cmd)
+        if success:
+            logger.info(f"Successfully set macOS desktop wallpaper: {abs_path}")
+        return success
+
+
+@register_backend
+class GnomeBackend(WallpaperBackend):
+    """
+    GNOME backend.
+
+    All keys, including ``picture-uri-dark`` used by GNOME 42+, are written
+    with a single ``dconf load`` when dconf is installed; otherwise each key
+    costs one ``gsettings`` process. Spanned renders also set
+    ``picture-options`` to ``spanned``.
+    """
+
+    name = "gnome"
+
+    # Desktops reading org.gnome.desktop.background, as named in XDG_CURRENT_DESKTOP
+    DESKTOPS = ("gnome", "unity", "budgie", "pop", "ubuntu")
+
+    # Schema holding the wallpaper keys, probed when the session isn't known
+    SCHEMA = "org.gnome.desktop.background"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        if not sys.platform.startswith("linux") or not (shutil.which("dconf") or shutil.which("gsettings")):
+            return False
+        # The tools are installed on many non-GNOME desktops; the session tells
+        desktops = os.environ.get("XDG_CURRENT_DESKTOP", "").lower().split(":")
+        desktops.append(os.environ.get("DESKTOP_SESSION", "").lower())
+        desktops = [name for name in desktops if name]
+        if desktops:
+            return any(name.startswith(cls.DESKTOPS) for name in desktops)
+        # Systemd user units, cron and ssh don't set either variable
+        return cls._has_schema()
+
+    @classmethod
+    def _has_schema(cls) -> bool:
+        """Probe for the GNOME background settings outside a desktop session."""
+        if shutil.which("gsettings"):
+            cmd = ["gsettings", "list-keys", cls.SCHEMA]
+        else:
+            cmd = ["dconf", "read", "/" + cls.SCHEMA.replace(".", "/") + "/picture-uri"]
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.debug(f"GNOME settings probe failed: {str(e)}")
+            return False
+        # dconf exits successfully for unset keys; only a stored value shows GNOME is in use
+        return result.returncode == 0 and bool(result.stdout.strip())
+
+    def __init__(self):
+        super().__init__()
+        self.use_dconf = bool(shutil.which("dconf"))
+
+    def _apply(self, desktop: Optional[str], lockscreen: Optional[str], dark: Optional[str],
+               spanned: bool) -> bool:
+        settings = []  # (schema suffix, key, string value)
+        if desktop:
+            settings.append(("background", "picture-uri", self._uri(desktop)))
+            settings.append(("background", "picture-uri-dark", self._uri(dark or desktop)))
+        elif dark:
+            settings.append(("background", "picture-uri-dark", self._uri(dark)))
+        if lockscreen:
+            settings.append(("screensaver", "picture-uri", self._uri(lockscreen)))
+        if spanned:
+            for schema in dict.fromkeys(schema for schema, _, _ in settings):
+                settings.append((schema, "picture-options", "spanned"))
+        if not settings:
+            return True
+
+        if self.use_dconf:
+            success = self._timed("dconf", self._apply_dconf, settings)
+        else:
+            success = self._timed("gsettings", self._apply_gsettings, settings)
+
+        if success:
+            logger.info(f"Successfully set GNOME wallpaper keys: {[key for _, key, _ in settings]}")
+        return success
+
+    @staticmethod
+    def _uri(image_path: str) -> str:
+        return f"file://{os.path.abspath(image_path)}"
+
+    def _apply_dconf(self, settings: List[tuple]) -> bool:
+        """Write all keys with one dconf process."""
+        sections: Dict[str, List[str]] = {}
+        for schema, key, value in settings:
+            quoted = value.replace("\\", "\\\\").replace("'", "\\'")
+            sections.setdefault(schema, []).append(f"{key}='{quoted}'")
+
+        keyfile = "".join(
+            f"[{schema}]\n" + "\n".join(lines) + "\n" for schema, lines in sections.items()
+        )
+        return self._run(["dconf", "load", "/org/gnome/desktop/"], input_text=keyfile)
+
+    def _apply_gsettings(self, settings: List[tuple]) -> bool:
+        """Write each key with its own gsettings process."""
+        success = True
+        for schema, key, value in settings:
+            ok = self._run(["gsettings", "set", f"org.gnome.desktop.{schema}", key, value])
+            # Older GNOME releases have no dark variant; that's not a failure
+            if not ok and key != "picture-uri-dark":
+                success = False
+        return success
+
+
+@register_backend
+class FakeBackend(WallpaperBackend):
+    """
+    Backend that only records what it would do.
+
+    Never detected automatically; select it with ``PIXELDRIVE_BACKEND=fake``
+    or :func:`set_backend` in tests.
+    """
+
+    name = "fake"
+
+    def __init__(self, succeed: bool = True):
+        super().__init__()
+        self.succeed = succeed
+        self.commands: List[Dict[str, Any]] = []
+
+    def _apply(self, desktop: Optional[str], lockscreen: Optional[str], dark: Optional[str],
+               spanned: bool) -> bool:
+        self.commands.append({"desktop": desktop, "lockscreen": lockscreen, "dark": dark, "spanned": spanned})
+        return self.succeed
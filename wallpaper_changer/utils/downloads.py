@@ -0,0 +1,120 @@
+"""
+Helpers for picking and storing downloaded photos.
+
+Shared by the download worker and the headless rotation, so both skip photos
+that look like a wallpaper already in the library and index what they
+download the same way. Qt and NumPy are imported on first use, which keeps
+importing this module cheap for the headless path.
+"""
+
+import os
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from wallpaper_changer.config import DUPLICATE_MAX_CANDIDATES, ensure_download_dir
+
+logger = logging.getLogger(__name__)
+
+
+def photo_file_path(photo: Dict[str, Any], directory: Optional[str] = None) -> str:
+    """
+    Build a unique local path for a photo about to be downloaded.
+
+    Args:
+        photo: Photo dictionary from Unsplash API
+        directory: Directory the photo is stored in; defaults to the
+            download directory, which is created if missing
+
+    Returns:
+        Path of the form ``<directory>/<photo id>_<timestamp>.jpg``
+    """
+    directory = directory or ensure_download_dir()
+    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+    photo_id = photo.get('id', 'unsplash')
+    return os.path.join(directory, f"{photo_id}_{timestamp}.jpg")
+
+
+def fetch_thumbnail(api, photo: Dict[str, Any]):
+    """
+    Download and decode a photo's list thumbnail.
+
+    Args:
+        api: UnsplashAPI instance used for the request
+        photo: Photo dictionary from Unsplash API
+
+    Returns:
+        QImage of the thumbnail, or a null image if it couldn't be fetched
+    """
+    from PyQt5.QtGui import QImage
+    from wallpaper_changer.utils.image_decode import decode_image
+
+    try:
+        thumbnail_url = photo.get("urls", {}).get("thumb", "")
+        if thumbnail_url:
+            thumbnail_data = api.get_photo_thumbnail(thumbnail_url)
+            if thumbnail_data:
+                return decode_image(thumbnail_data, source=thumbnail_url)
+    except Exception as e:
+        logger.warning(f"Failed to get thumbnail: {str(e)}")
+    return QImage()
+
+
+def pick_distinct_photo(api, candidates: List[Dict[str, Any]],
+                        max_candidates: int = DUPLICATE_MAX_CANDIDATES) -> Tuple[Dict[str, Any], Any]:
+    """
+    Pick the first candidate that doesn't look like a library wallpaper.
+
+    Only thumbnails are fetched for the check. At most ``max_candidates``
+    photos are tried; if all of them are duplicates the first is kept.
+
+    Args:
+        api: UnsplashAPI instance used to fetch the thumbnails
+        candidates: Photos in order of preference
+        max_candidates: Number of photos checked
+
+    Returns:
+        Tuple of the photo to download and its thumbnail (a null image if
+        it couldn't be fetched)
+    """
+    from wallpaper_changer.utils.phash import dhash, get_duplicate_index
+
+    index = get_duplicate_index()
+    thumbnails = []
+    for photo in candidates[:max(max_candidates, 1)]:
+        thumbnail = fetch_thumbnail(api, photo)
+        thumbnails.append(thumbnail)
+        value = dhash(thumbnail)
+        matches = index.find(value) if value is not None else []
+        if not matches:
+            return photo, thumbnail
+        logger.info(
+            f"Skipping photo {photo.get('id')}: {matches[0][0]} bits from {matches[0][1]}"
+        )
+    return candidates[0], thumbnails[0]
+
+
+def index_download(image_path: str, thumbnail):
+    """
+    Store the perceptual hash and image statistics of a downloaded photo.
+
+    The hash lets later downloads spot this picture; the statistics let the
+    selection rules filter on brightness and colour.
+
+    Args:
+        image_path: Path of the downloaded photo, already in the library
+        thumbnail: Decoded thumbnail of the photo the hash is computed from
+    """
+    from wallpaper_changer.utils.library import get_library
+    from wallpaper_changer.utils.phash import dhash, get_duplicate_index
+    from wallpaper_changer.utils.image_stats import analyze_files, get_stats_store
+
+    value = dhash(thumbnail)
+    if value is not None:
+        get_library().set_phash(image_path, value)
+        get_duplicate_index().add(value, image_path)
+    try:
+        paths, columns = analyze_files([image_path])
+        get_stats_store().add(paths, columns)
+    except Exception as e:
+        logger.warning(f"Failed to analyze {image_path}: {str(e)}")
@@ -0,0 +1,240 @@
+"""
+Weighted choice of the genre for automatic wallpaper changes.
+
+Each genre's weight comes from feedback events (applied by hand, applied
+again from the history, marked favourite, skipped soon after an automatic
+change) whose values add up to a score that halves every
+GENRE_SCORE_HALF_LIFE_DAYS. Scores live in the library database, so the
+GUI, the daemon and headless runs share them.
+
+Weights are kept in a Fenwick tree: an event updates one genre in
+O(log n) and a draw is a single O(log n) descent. Genres picked recently
+are suppressed by rejecting draws with a probability that fades over
+GENRE_RECENCY_HOURS, which keeps draws cheap while most genres are not
+suppressed.
+"""
+
+import time
+import random
+import logging
+import threading
+from typing import Dict, List, Optional, Sequence
+
+from wallpaper_changer.config import (
+    GENRE_EVENT_VALUES, GENRE_SCORE_HALF_LIFE_DAYS, GENRE_MIN_WEIGHT,
+    GENRE_MAX_WEIGHT, GENRE_RECENCY_HOURS
+)
+from wallpaper_changer.settings import get_settings
+from wallpaper_changer.utils.library import WallpaperLibrary, get_library
+
+logger = logging.getLogger(__name__)
+
+# Chance a genre picked a moment ago is still accepted
+_MIN_RECENCY_FACTOR = 0.02
+
+# Rejected draws before the exact (linear) computation takes over
+_MAX_REJECTIONS = 32
+
+# Weights are recomputed this often so scores keep decaying in long-running processes
+_RELOAD_S = 86400
+
+
+class FenwickTree:
+    """Prefix sums over non-negative weights with point updates."""
+
+    def __init__(self, weights: Sequence[float]):
+        """
+        Build the tree in O(n).
+
+        Args:
+            weights: Initial weight per position
+        """
+        self._weights = list(weights)
+        self._tree = [0.0] + self._weights
+        for i in range(1, len(self._tree)):
+            parent = i + (i & -i)
+            if parent < len(self._tree):
+                self._tree[parent] += self._tree[i]
+        self._top = 1 << (len(self._weights).bit_length() - 1) if self._weights else 0
+
+    def set(self, position: int, weight: float):
+        """Change the weight at a position."""
+        delta = weight - self._weights[position]
+        self._weights[position] = weight
+        i = position + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def total(self) -> float:
+        """Sum of all weights."""
+        total, i = 0.0, len(self._weights)
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def find(self, value: float) -> int:
+        """
+        Find the position whose cumulative weight range contains a value.
+
+        Args:
+            value: Number from 0 (inclusive) to total() (exclusive)
+
+        Returns:
+            Position of the weight that value falls into
+        """
+        position, step = 0, self._top
+        while step:
+            following = position + step
+            if following < len(self._tree) and self._tree[following] <= value:
+                value -= self._tree[following]
+                position = following
+            step >>= 1
+        return min(position, len(self._weights) - 1)
+
+    def __getitem__(self, position: int) -> float:
+        return self._weights[position]
+
+
+class GenreSampler:
+    """Draws genres in proportion to their feedback-driven weights."""
+
+    def __init__(self, genres: Optional[Sequence[str]] = None, library: Optional[WallpaperLibrary] = None):
+        """
+        Load the genres' feedback.
+
+        Args:
+            genres: Genres to choose from; those of the current settings by default
+            library: Library holding the feedback; the shared one by default
+        """
+        self.genres: List[str] = list(get_settings().genres if genres is None else genres)
+        self.library = library or get_library()
+        self._positions = {genre: i for i, genre in enumerate(self.genres)}
+        self._lock = threading.Lock()
+        self._last_picked: Dict[str, Optional[float]] = {}
+        self._load(time.time())
+
+    def _load(self, now: float):
+        """Compute every genre's weight from the stored feedback."""
+        stats = self.library.genre_stats()
+        weights = []
+        for genre in self.genres:
+            stat = stats.get(genre)
+            score = self._decayed(stat.score, stat.updated_at, now) if stat else 0.0
+            weights.append(self.weight(score))
+            self._last_picked[genre] = stat.last_picked if stat else None
+        self._tree = FenwickTree(weights)
+        self._loaded_at = now
+
+    @staticmethod
+    def _decayed(score: float, updated_at: Optional[float], now: float) -> float:
+        """Decay a score from when it was last updated to now."""
+        age = max(now - (updated_at or now), 0.0)
+        return score * 0.5 ** (age / (GENRE_SCORE_HALF_LIFE_DAYS * 86400))
+
+    @staticmethod
+    def weight(score: float) -> float:
+        """Turn a feedback score into a sampling weight."""
+        return min(max(1.0 + score, GENRE_MIN_WEIGHT), GENRE_MAX_WEIGHT)
+
+    def recency_factor(self, genre: str, now: float) -> float:
+        """Chance that a draw of a genre is accepted, given when it was last picked."""
+        last_picked = self._last_picked.get(genre)
+        if last_picked is None or GENRE_RECENCY_HOURS <= 0:
+            return 1.0
+        elapsed_hours = max(now - last_picked, 0.0) / 3600
+        return min(max(elapsed_hours / GENRE_RECENCY_HOURS, _MIN_RECENCY_FACTOR), 1.0)
+
+    def pick(self, now: Optional[float] = None) -> str:
+        """
+        Draw a genre and remember it as picked.
+
+        Args:
+            now: Time of the pick; defaults to now
+
+        Returns:
+            One of the genres
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            if now - self._loaded_at > _RELOAD_S:
+                self._load(now)
+            genre = self._draw(now)
+            self._last_picked[genre] = now
+        self.library.mark_genre_picked(genre, now)
+        logger.debug(f"Picked genre '{genre}'")
+        return genre
+
+    def _draw(self, now: float) -> str:
+        """Draw with recency suppression; the caller holds the lock."""
+        total = self._tree.total()
+        for _ in range(_MAX_REJECTIONS):
+            genre = self.genres[self._tree.find(random.random() * total)]
+            if random.random() < self.recency_factor(genre, now):
+                return genre
+
+        # Nearly everything was picked recently: draw from the exact weights
+        weights = [self._tree[i] * self.recency_factor(genre, now) for i, genre in enumerate(self.genres)]
+        return random.choices(self.genres, weights)[0]
+
+    def record(self, genre: Optional[str], event: str, now: Optional[float] = None):
+        """
+        Record feedback on a genre and update its weight.
+
+        Args:
+            genre: Genre the feedback is about; ignored unless it is one of
+                the sampled genres (e.g. a custom search query)
+            event: One of GENRE_EVENT_VALUES
+            now: Event time; defaults to now
+        """
+        position = self._positions.get(genre)
+        if position is None:
+            return
+        score = self.library.adjust_genre_score(
+            genre, GENRE_EVENT_VALUES[event], GENRE_SCORE_HALF_LIFE_DAYS * 86400, now
+        )
+        with self._lock:
+            self._tree.set(position, self.weight(score))
+        logger.debug(f"Genre '{genre}' {event}: score {score:.2f}")
+
+    def record_for_path(self, path: Optional[str], event: str):
+        """
+        Record feedback on the genre a downloaded wallpaper was found with.
+
+        Args:
+            path: Local path of the wallpaper
+            event: One of GENRE_EVENT_VALUES
+        """
+        entry = self.library.get(path) if path else None
+        if entry is not None:
+            self.record(entry.query, event)
+
+    def weights(self, now: Optional[float] = None) -> Dict[str, float]:
+        """Get each genre's current weight, including recency suppression."""
+        now = time.time() if now is None else now
+        with self._lock:
+            return {
+                genre: self._tree[i] * self.recency_factor(genre, now)
+                for i, genre in enumerate(self.genres)
+            }
+
+
+_sampler: Optional[GenreSampler] = None
+_sampler_lock = threading.Lock()
+
+
+def get_genre_sampler() -> GenreSampler:
+    """
+    Get the shared sampler, loading the feedback on first use and again
+    when the genres in the settings change.
+
+    Returns:
+        The process-wide GenreSampler instance
+    """
+    global _sampler
+    genres = get_settings().genres
+    with _sampler_lock:
+        if _sampler is None or tuple(_sampler.genres) != genres:
+            _sampler = GenreSampler(genres)
+        return _sampler
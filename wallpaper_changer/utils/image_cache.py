@@ -0,0 +1,75 @@
+"""
+Small in-memory caches for fetched images.
+"""
+
+from collections import OrderedDict
+from typing import Any, Optional
+
+from wallpaper_changer.utils.memory_budget import MemoryBudget, image_nbytes
+
+
+class ImageCache:
+    """Least-recently-used cache of images keyed by URL."""
+
+    def __init__(self, max_entries: int = 32, budget: Optional[MemoryBudget] = None, name: str = "images"):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of images kept before the least
+                recently used one is dropped
+            budget: Memory budget the images are accounted to; it may also
+                evict them to make room for images of other caches
+            name: Subsystem the images are accounted under
+        """
+        self.max_entries = max_entries
+        self.budget = budget
+        self.name = name
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+
+    def get(self, url: str) -> Optional[Any]:
+        """
+        Look up an image and mark it as recently used.
+
+        Args:
+            url: URL the image was fetched from
+
+        Returns:
+            The cached image or None if it is not cached
+        """
+        image = self._entries.get(url)
+        if image is not None:
+            self._entries.move_to_end(url)
+            if self.budget is not None:
+                self.budget.touch(self.name, url)
+        return image
+
+    def put(self, url: str, image: Any):
+        """
+        Store an image, evicting the least recently used entry if full.
+
+        Args:
+            url: URL the image was fetched from
+            image: Image payload to cache
+        """
+        self._entries[url] = image
+        self._entries.move_to_end(url)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            if self.budget is not None:
+                self.budget.release(self.name, evicted)
+        if self.budget is not None:
+            self.budget.track(self.name, url, image_nbytes(image), lambda: self._entries.pop(url, None))
+
+    def clear(self):
+        """Drop all cached images."""
+        if self.budget is not None:
+            for url in self._entries:
+                self.budget.release(self.name, url)
+        self._entries.clear()
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,71 @@
+"""
+Image decoding helpers that are safe to call from worker threads.
+
+Decoding produces ``QImage`` objects only; converting to ``QPixmap`` must
+happen on the GUI thread.
+"""
+
+import time
+import logging
+from typing import Optional, Tuple
+
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, QSize, Qt
+from PyQt5.QtGui import QImage, QImageReader
+
+logger = logging.getLogger(__name__)
+
+
+def _read_scaled(reader: QImageReader, max_size: Optional[Tuple[int, int]], source: str) -> QImage:
+    """Read an image, letting the decoder scale it to fit within max_size."""
+    started = time.perf_counter()
+
+    if max_size:
+        original = reader.size()
+        bounds = QSize(*max_size)
+        if original.isValid() and (original.width() > bounds.width() or original.height() > bounds.height()):
+            # JPEG decoders use this to decode at reduced resolution directly
+            reader.setScaledSize(original.scaled(bounds, Qt.KeepAspectRatio))
+
+    image = reader.read()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    if image.isNull():
+        logger.warning(f"Failed to decode image from {source}: {reader.errorString()}")
+    else:
+        logger.debug(
+            f"Decoded {source} to {image.width()}x{image.height()} in {elapsed_ms:.1f} ms"
+        )
+    return image
+
+
+def decode_image(data: bytes, max_size: Optional[Tuple[int, int]] = None, source: str = "memory") -> QImage:
+    """
+    Decode encoded image data, scaling during decode.
+
+    Args:
+        data: Encoded image bytes (JPEG, PNG, ...)
+        max_size: Optional (width, height) bounds; larger images are decoded
+            at the largest size that fits while keeping the aspect ratio
+        source: Description of where the data came from, used in log messages
+
+    Returns:
+        Decoded QImage, which is null if decoding failed
+    """
+    buffer = QBuffer()
+    buffer.setData(QByteArray(data))
+    buffer.open(QIODevice.ReadOnly)
+    return _read_scaled(QImageReader(buffer), max_size, source)
+
+
+def decode_image_file(path: str, max_size: Optional[Tuple[int, int]] = None) -> QImage:
+    """
+    Decode an image file, scaling during decode.
+
+    Args:
+        path: Path to the image file
+        max_size: Optional (width, height) bounds, see :func:`decode_image`
+
+    Returns:
+        Decoded QImage, which is null if decoding failed
+    """
+    return _read_scaled(QImageReader(path), max_size, path)
@@ -0,0 +1,347 @@
+"""
+Per-image statistics for choosing wallpapers by look.
+
+Each downloaded wallpaper is reduced to a 32x32 RGB grid from which, for a
+whole batch at once, NumPy computes:
+
+- ``brightness``: mean relative luminance (0-1)
+- ``contrast``: RMS contrast, the standard deviation of luminance (0-0.5)
+- ``histogram``: 16-bin luminance histogram, normalised to sum to 1
+- ``colors`` / ``color_weights``: dominant colours from k-means and the
+  share of pixels each one covers
+
+The values are stored with each wallpaper in the library and read back
+column by column, so queries like "dark wallpapers" or "close to this accent
+colour" are a few vectorized comparisons over all images rather than a
+decode per file.
+
+NumPy and Qt are imported on first use, so the headless path stays light.
+"""
+
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from wallpaper_changer.utils.selection import SelectionCriteria
+
+logger = logging.getLogger(__name__)
+
+GRID_SIZE = 32
+HISTOGRAM_BINS = 16
+DOMINANT_COLORS = 3
+_KMEANS_ITERATIONS = 8
+
+# Dominant colours covering less than this share of the image don't count as its accent
+_MIN_ACCENT_WEIGHT = 0.2
+
+# Decode size before reducing to the grid; JPEG decoders scale during decode
+_DECODE_SIZE = (128, 128)
+
+# Rec. 709 luminance weights
+_LUMA = (0.2126, 0.7152, 0.0722)
+
+
+def rgb_grid(image):
+    """
+    Reduce a decoded QImage to the statistics grid.
+
+    Args:
+        image: Decoded QImage of any size
+
+    Returns:
+        uint8 array of shape (GRID_SIZE, GRID_SIZE, 3)
+    """
+    import numpy as np
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtGui import QImage
+
+    small = image.scaled(GRID_SIZE, GRID_SIZE, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+    small = small.convertToFormat(QImage.Format_RGB888)
+    bits = small.constBits()
+    bits.setsize(small.bytesPerLine() * GRID_SIZE)
+    # Rows are padded to 4 bytes
+    rows = np.frombuffer(bits, dtype=np.uint8).reshape(GRID_SIZE, small.bytesPerLine())
+    return rows[:, :GRID_SIZE * 3].reshape(GRID_SIZE, GRID_SIZE, 3).copy()
+
+
+def dominant_colors(pixels, k: int = DOMINANT_COLORS, iterations: int = _KMEANS_ITERATIONS):
+    """
+    Run k-means on every image of a batch at once.
+
+    Centroids start at pixels spread evenly over each image's luminance
+    order, which makes the result deterministic.
+
+    Args:
+        pixels: float32 array of shape (n, pixels, 3)
+        k: Number of colours per image
+        iterations: Lloyd iterations
+
+    Returns:
+        (colors, weights): uint8 array (n, k, 3) sorted by weight, and
+        float32 array (n, k) of pixel shares
+    """
+    import numpy as np
+
+    n, count, _ = pixels.shape
+    order = np.argsort(pixels @ np.array(_LUMA, dtype=np.float32), axis=1)
+    seeds = order[:, ((np.arange(k) + 0.5) * count / k).astype(int)]
+    centroids = np.take_along_axis(pixels, seeds[:, :, None], axis=1)
+
+    # Cluster ids offset per image, so one bincount covers the whole batch
+    offsets = np.arange(n)[:, None] * k
+    for _ in range(iterations):
+        # |p - c|^2 without the |p|^2 term, which doesn't change the argmin
+        distances = (centroids ** 2).sum(axis=-1)[:, None, :] - 2 * (pixels @ centroids.transpose(0, 2, 1))
+        labels = (distances.argmin(axis=-1) + offsets).ravel()
+        sizes = np.bincount(labels, minlength=n * k).reshape(n, k)
+        sums = np.stack([
+            np.bincount(labels, weights=pixels[:, :, channel].ravel(), minlength=n * k)
+            for channel in range(3)
+        ], axis=-1).reshape(n, k, 3)
+        # Empty clusters keep their previous centroid
+        centroids = np.where(sizes[:, :, None] > 0, sums / np.maximum(sizes, 1)[:, :, None], centroids)
+        centroids = centroids.astype(np.float32)
+
+    weights = sizes / count
+    ranking = np.argsort(-weights, axis=1)
+    colors = np.take_along_axis(centroids, ranking[:, :, None], axis=1)
+    weights = np.take_along_axis(weights, ranking, axis=1)
+    return np.clip(np.rint(colors), 0, 255).astype(np.uint8), weights.astype(np.float32)
+
+
+def compute_stats(grids) -> Dict[str, object]:
+    """
+    Compute the statistics columns for a batch of grids.
+
+    Args:
+        grids: uint8 array of shape (n, GRID_SIZE, GRID_SIZE, 3)
+
+    Returns:
+        Column name to array with one row per image
+    """
+    import numpy as np
+
+    n = len(grids)
+    pixels = np.asarray(grids, dtype=np.float32).reshape(n, -1, 3)
+    luma = pixels @ np.array(_LUMA, dtype=np.float32) / 255
+
+    # Histograms of all images in one bincount, offsetting each image's bins
+    bins = np.minimum((luma * HISTOGRAM_BINS).astype(np.int64), HISTOGRAM_BINS - 1)
+    offsets = np.arange(n)[:, None] * HISTOGRAM_BINS
+    histogram = np.bincount((bins + offsets).ravel(), minlength=n * HISTOGRAM_BINS)
+    histogram = histogram.reshape(n, HISTOGRAM_BINS) / luma.shape[1]
+
+    colors, weights = dominant_colors(pixels)
+    return {
+        "brightness": luma.mean(axis=1).astype(np.float32),
+        "contrast": luma.std(axis=1).astype(np.float32),
+        "histogram": histogram.astype(np.float16),
+        "colors": colors,
+        "color_weights": weights.astype(np.float16),
+    }
+
+
+def _decode_grid(path: str):
+    """Decode a file straight to its statistics grid, or None if unreadable."""
+    from wallpaper_changer.utils.image_decode import decode_image_file
+
+    image = decode_image_file(path, _DECODE_SIZE)
+    return None if image.isNull() else rgb_grid(image)
+
+
+def analyze_files(paths: Sequence[str], workers: Optional[int] = None) -> Tuple[List[str], Dict[str, object]]:
+    """
+    Compute statistics for image files, decoding in parallel.
+
+    Args:
+        paths: Image files to analyze
+        workers: Decoder threads; defaults to the CPU count
+
+    Returns:
+        The readable paths and their statistics columns, in the same order
+    """
+    import numpy as np
+
+    if len(paths) == 1:
+        grids = [_decode_grid(paths[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 4) as pool:
+            grids = list(pool.map(_decode_grid, paths))
+
+    readable = [(path, grid) for path, grid in zip(paths, grids) if grid is not None]
+    if not readable:
+        return [], {}
+    return [path for path, _ in readable], compute_stats(np.stack([grid for _, grid in readable]))
+
+
+class ImageStatsStore:
+    """
+    Columnar statistics of the downloaded wallpapers.
+
+    Each wallpaper's statistics are packed into a few dozen bytes and stored
+    in its library row, which several processes (the GUI and the daemon)
+    can write safely. The columns used by select() are a derived cache,
+    reread whenever the library changed.
+    """
+
+    COLUMNS = ("brightness", "contrast", "histogram", "colors", "color_weights")
+
+    def __init__(self, library=None):
+        """
+        Initialize the store.
+
+        Args:
+            library: WallpaperLibrary holding the statistics; the shared one
+                by default
+        """
+        from wallpaper_changer.utils.library import get_library
+
+        self.library = library or get_library()
+        self._lock = threading.Lock()
+        self._version = None  # Library data_version() the columns were read at
+        self._paths: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._columns: Dict[str, object] = {}
+
+    def _load(self):
+        """Reread the columns if the library changed since they were read."""
+        version = self.library.data_version()
+        if version == self._version:
+            return
+
+        import numpy as np
+
+        stats = self.library.stats()
+        dtype = _row_dtype()
+        packed = {path: data for path, data in stats.items() if len(data) == dtype.itemsize}
+        if len(packed) < len(stats):
+            logger.warning(f"Ignoring {len(stats) - len(packed)} image statistics of an unknown format")
+        rows = np.frombuffer(b"".join(packed.values()), dtype=dtype)
+        self._paths = list(packed)
+        self._rows = {path: row for row, path in enumerate(self._paths)}
+        self._columns = {name: rows[name] for name in self.COLUMNS}
+        self._version = version
+
+    def add(self, paths: List[str], columns: Dict[str, object]):
+        """
+        Store statistics, replacing those of paths already analyzed.
+
+        Paths that aren't in the library are ignored.
+
+        Args:
+            paths: Image paths, one per row of the columns
+            columns: Output of compute_stats()
+        """
+        import numpy as np
+
+        if not paths:
+            return
+        rows = np.zeros(len(paths), dtype=_row_dtype())
+        for name in self.COLUMNS:
+            rows[name] = columns[name]
+        self.library.set_stats({path: row.tobytes() for path, row in zip(paths, rows)})
+
+    def __contains__(self, path: str) -> bool:
+        with self._lock:
+            self._load()
+            return path in self._rows
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._load()
+            return len(self._paths)
+
+    def get(self, path: str) -> Optional[Dict[str, object]]:
+        """Get the statistics of one image, or None if it wasn't analyzed."""
+        with self._lock:
+            self._load()
+            row = self._rows.get(path)
+            if row is None:
+                return None
+            return {name: column[row] for name, column in self._columns.items()}
+
+    def select(self, criteria: SelectionCriteria) -> List[str]:
+        """
+        Find the images satisfying every rule of the criteria.
+
+        Args:
+            criteria: Rules to evaluate
+
+        Returns:
+            Matching image paths, in storage order
+        """
+        import numpy as np
+
+        with self._lock:
+            self._load()
+            if not self._paths:
+                return []
+
+            mask = np.ones(len(self._paths), dtype=bool)
+            if criteria.max_brightness is not None:
+                mask &= self._columns["brightness"] <= criteria.max_brightness
+            if criteria.accent_color is not None:
+                offsets = self._columns["colors"].astype(np.float32) - np.array(criteria.accent_color, np.float32)
+                close = np.sqrt((offsets ** 2).sum(axis=-1)) <= criteria.accent_distance
+                mask &= (close & (self._columns["color_weights"] >= _MIN_ACCENT_WEIGHT)).any(axis=1)
+
+            return [self._paths[row] for row in np.flatnonzero(mask)]
+
+
+def _row_dtype():
+    """NumPy record type of one image's packed statistics, as stored in the library."""
+    import numpy as np
+
+    return np.dtype([
+        ("brightness", "<f4"),
+        ("contrast", "<f4"),
+        ("histogram", "<f2", (HISTOGRAM_BINS,)),
+        ("colors", "u1", (DOMINANT_COLORS, 3)),
+        ("color_weights", "<f2", (DOMINANT_COLORS,)),
+    ])
+
+
+_store: Optional[ImageStatsStore] = None
+_store_lock = threading.Lock()
+
+
+def get_stats_store() -> ImageStatsStore:
+    """Get the shared statistics store, over the shared library."""
+    global _store
+    from wallpaper_changer.utils.library import get_library
+
+    with _store_lock:
+        library = get_library()
+        if _store is None or _store.library is not library:
+            _store = ImageStatsStore(library)
+        return _store
+
+
+def analyze_library(library=None, store: Optional[ImageStatsStore] = None, batch_size: int = 256) -> int:
+    """
+    Analyze every library wallpaper that has no statistics yet.
+
+    Args:
+        library: WallpaperLibrary to scan; the shared one by default
+        store: Store receiving the statistics, over the library to scan;
+            one over ``library`` by default
+        batch_size: Files decoded and stored per batch
+
+    Returns:
+        Number of files analyzed
+    """
+    if store is None:
+        store = ImageStatsStore(library) if library is not None else get_stats_store()
+    pending = store.library.unanalyzed_paths()
+
+    analyzed = 0
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        paths, columns = analyze_files(batch)
+        store.add(paths, columns)
+        analyzed += len(paths)
+        # Unreadable files are dropped from paths, so progress counts the batch
+        logger.info(f"Processed {start + len(batch)}/{len(pending)} wallpapers, {analyzed} analyzed")
+    return analyzed
@@ -0,0 +1,451 @@
+"""
+SQLite index of the wallpapers in the download directory.
+
+Every finished download is recorded with its Unsplash metadata, and every
+successful apply bumps its counters, so history, deduplication and offline
+rotation can query the library through indexes instead of rescanning the
+directory or refetching from the API. The database lives next to the
+downloads and is shared safely between threads and processes (the GUI and
+the daemon).
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from wallpaper_changer.config import LIBRARY_DB_NAME, data_path
+from wallpaper_changer.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS wallpapers (
+    path TEXT PRIMARY KEY,
+    photo_id TEXT NOT NULL,
+    query TEXT,
+    author TEXT,
+    width INTEGER,
+    height INTEGER,
+    file_size INTEGER,
+    color TEXT,
+    downloaded_at REAL NOT NULL,
+    apply_count INTEGER NOT NULL DEFAULT 0,
+    last_applied REAL,
+    phash INTEGER,
+    stats BLOB
+);
+CREATE INDEX IF NOT EXISTS wallpapers_photo_id ON wallpapers (photo_id);
+CREATE INDEX IF NOT EXISTS wallpapers_query ON wallpapers (query COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS wallpapers_downloaded_at ON wallpapers (downloaded_at);
+CREATE INDEX IF NOT EXISTS wallpapers_last_applied ON wallpapers (last_applied);
+CREATE TABLE IF NOT EXISTS genre_stats (
+    genre TEXT PRIMARY KEY,
+    score REAL NOT NULL DEFAULT 0,
+    updated_at REAL,
+    last_picked REAL
+);
+"""
+
+# Columns added after the first release, created on older databases when opened
+_ADDED_COLUMNS = {
+    "phash": "INTEGER",
+    "stats": "BLOB",
+}
+
+_COLUMNS = (
+    "path, photo_id, query, author, width, height, file_size, color, "
+    "downloaded_at, apply_count, last_applied"
+)
+
+
+class LibraryEntry(NamedTuple):
+    """One downloaded wallpaper."""
+
+    path: str
+    photo_id: str
+    query: Optional[str]
+    author: Optional[str]
+    width: Optional[int]
+    height: Optional[int]
+    file_size: Optional[int]
+    color: Optional[str]  # Dominant colour as "#rrggbb"
+    downloaded_at: float  # Unix timestamp
+    apply_count: int
+    last_applied: Optional[float]  # Unix timestamp
+
+
+class GenreStat(NamedTuple):
+    """Feedback on one genre (see utils/genre_sampler.py)."""
+
+    score: float  # Sum of event values, decayed to updated_at
+    updated_at: Optional[float]  # Unix timestamp
+    last_picked: Optional[float]  # Unix timestamp
+
+
+class WallpaperLibrary:
+    """Index of downloaded wallpapers backed by SQLite."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Open (and create if needed) the library database.
+
+        Args:
+            db_path: Database file path, or ":memory:"; the library in the
+                current download directory by default
+        """
+        db_path = db_path or data_path(LIBRARY_DB_NAME)
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, timeout=5.0, check_same_thread=False)
+        with self._lock, self._connection:
+            if db_path != ":memory:":
+                # Readers in other processes don't block writers
+                self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(_SCHEMA)
+            existing = {row[1] for row in self._connection.execute("PRAGMA table_info(wallpapers)")}
+            for column, column_type in _ADDED_COLUMNS.items():
+                if column not in existing:
+                    self._connection.execute(f"ALTER TABLE wallpapers ADD COLUMN {column} {column_type}")
+
+    def _query(self, sql: str, parameters: tuple = ()) -> List[LibraryEntry]:
+        """Run a SELECT over the wallpaper columns."""
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT {_COLUMNS} FROM wallpapers {sql}", parameters
+            ).fetchall()
+        return [LibraryEntry(*row) for row in rows]
+
+    def _execute(self, sql: str, parameters: tuple = ()) -> int:
+        """Run a write statement in its own transaction; returns changed rows."""
+        try:
+            with self._lock, self._connection:
+                return self._connection.execute(sql, parameters).rowcount
+        except sqlite3.Error as e:
+            logger.error(f"Library update failed: {str(e)}")
+            return 0
+
+    def record_download(self, photo: Dict[str, Any], path: str, query: Optional[str] = None):
+        """
+        Record a finished download.
+
+        Args:
+            photo: Photo dictionary from Unsplash API
+            path: Local path of the downloaded file
+            query: Search query or genre the photo was found with
+        """
+        try:
+            file_size = os.path.getsize(path)
+        except OSError:
+            file_size = None
+
+        self._execute(
+            f"INSERT OR REPLACE INTO wallpapers ({_COLUMNS}) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0, NULL)",
+            (
+                path,
+                photo.get("id", "unsplash"),
+                query,
+                photo.get("user", {}).get("name"),
+                photo.get("width"),
+                photo.get("height"),
+                file_size,
+                photo.get("color"),
+                time.time(),
+            )
+        )
+
+    def record_applied(self, path: str, applied_at: Optional[float] = None):
+        """
+        Count a successful apply of a wallpaper.
+
+        Paths that aren't in the library (e.g. files picked by hand) are ignored.
+
+        Args:
+            path: Local path of the applied file
+            applied_at: Unix timestamp; defaults to now
+        """
+        self._execute(
+            "UPDATE wallpapers SET apply_count = apply_count + 1, last_applied = ? WHERE path = ?",
+            (applied_at if applied_at is not None else time.time(), path)
+        )
+
+    def remove(self, path: str):
+        """Forget a wallpaper, e.g. after its file was deleted."""
+        self._execute("DELETE FROM wallpapers WHERE path = ?", (path,))
+
+    def get(self, path: str) -> Optional[LibraryEntry]:
+        """Look up a wallpaper by its local path."""
+        entries = self._query("WHERE path = ?", (path,))
+        return entries[0] if entries else None
+
+    def find_photo(self, photo_id: str) -> List[LibraryEntry]:
+        """Get every local copy of an Unsplash photo, newest first."""
+        return self._query("WHERE photo_id = ? ORDER BY downloaded_at DESC", (photo_id,))
+
+    def has_photo(self, photo_id: str) -> bool:
+        """Check whether an Unsplash photo was already downloaded."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM wallpapers WHERE photo_id = ? LIMIT 1", (photo_id,)
+            ).fetchone()
+        return row is not None
+
+    def recent(self, limit: int = 50, offset: int = 0) -> List[LibraryEntry]:
+        """
+        Get downloads, newest first, one page at a time.
+
+        Args:
+            limit: Page size
+            offset: Number of entries to skip
+
+        Returns:
+            Entries of the requested page
+        """
+        return self._query("ORDER BY downloaded_at DESC LIMIT ? OFFSET ?", (limit, offset))
+
+    def by_query(self, query: str, limit: int = 50) -> List[LibraryEntry]:
+        """Get the newest downloads found with a query (case-insensitive)."""
+        return self._query(
+            "WHERE query = ? COLLATE NOCASE ORDER BY downloaded_at DESC LIMIT ?", (query, limit)
+        )
+
+    def least_recently_applied(self, limit: int = 50) -> List[LibraryEntry]:
+        """Get wallpapers never or least recently applied first."""
+        return self._query(
+            "ORDER BY last_applied IS NOT NULL, last_applied, downloaded_at LIMIT ?", (limit,)
+        )
+
+    def applied_times(self) -> Dict[str, Optional[float]]:
+        """Get the last apply time (None if never applied) of every wallpaper by path."""
+        with self._lock:
+            rows = self._connection.execute("SELECT path, last_applied FROM wallpapers").fetchall()
+        return dict(rows)
+
+    def genre_stats(self) -> Dict[str, GenreStat]:
+        """Get the feedback recorded for every genre that has any."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT genre, score, updated_at, last_picked FROM genre_stats"
+            ).fetchall()
+        return {row[0]: GenreStat(*row[1:]) for row in rows}
+
+    def adjust_genre_score(self, genre: str, delta: float, half_life_s: float,
+                           now: Optional[float] = None) -> float:
+        """
+        Decay a genre's score to now and add an event's value to it.
+
+        Runs in one write transaction, so events from several processes
+        aren't lost.
+
+        Args:
+            genre: Genre the event is about
+            delta: Value of the event
+            half_life_s: Time in which an old score halves
+            now: Event time; defaults to now
+
+        Returns:
+            The new score
+        """
+        now = time.time() if now is None else now
+        try:
+            with self._lock, self._connection:
+                self._connection.execute("BEGIN IMMEDIATE")
+                row = self._connection.execute(
+                    "SELECT score, updated_at FROM genre_stats WHERE genre = ?", (genre,)
+                ).fetchone()
+                score = delta
+                if row is not None:
+                    age = max(now - (row[1] or now), 0.0)
+                    score += row[0] * 0.5 ** (age / half_life_s)
+                self._connection.execute(
+                    "INSERT INTO genre_stats (genre, score, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (genre) DO UPDATE SET score = excluded.score, updated_at = excluded.updated_at",
+                    (genre, score, now)
+                )
+            return score
+        except sqlite3.Error as e:
+            logger.error(f"Library update failed: {str(e)}")
+            return delta
+
+    def mark_genre_picked(self, genre: str, now: Optional[float] = None):
+        """Record that a genre was just picked for a rotation."""
+        self._execute(
+            "INSERT INTO genre_stats (genre, last_picked) VALUES (?, ?) "
+            "ON CONFLICT (genre) DO UPDATE SET last_picked = excluded.last_picked",
+            (genre, time.time() if now is None else now)
+        )
+
+    def set_phash(self, path: str, value: int):
+        """Store the perceptual hash of a wallpaper (see utils/phash.py)."""
+        self.set_phashes({path: value})
+
+    def set_phashes(self, hashes: Dict[str, int]):
+        """Store perceptual hashes of several wallpapers in one transaction."""
+        try:
+            with self._lock, self._connection:
+                self._connection.executemany(
+                    "UPDATE wallpapers SET phash = ? WHERE path = ?",
+                    [(_to_signed(value), path) for path, value in hashes.items()]
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Library update failed: {str(e)}")
+
+    def phashes(self) -> Dict[str, int]:
+        """Get the perceptual hash of every hashed wallpaper by path."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT path, phash FROM wallpapers WHERE phash IS NOT NULL"
+            ).fetchall()
+        return {path: _to_unsigned(value) for path, value in rows}
+
+    def unhashed_paths(self) -> List[str]:
+        """Get the paths of wallpapers without a perceptual hash."""
+        with self._lock:
+            rows = self._connection.execute("SELECT path FROM wallpapers WHERE phash IS NULL").fetchall()
+        return [row[0] for row in rows]
+
+    def set_stats(self, stats: Dict[str, bytes]):
+        """Store the packed image statistics of several wallpapers (see utils/image_stats.py)."""
+        try:
+            with self._lock, self._connection:
+                self._connection.executemany(
+                    "UPDATE wallpapers SET stats = ? WHERE path = ?",
+                    [(value, path) for path, value in stats.items()]
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Library update failed: {str(e)}")
+
+    def stats(self) -> Dict[str, bytes]:
+        """Get the packed image statistics of every analyzed wallpaper by path."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT path, stats FROM wallpapers WHERE stats IS NOT NULL"
+            ).fetchall()
+        return dict(rows)
+
+    def unanalyzed_paths(self) -> List[str]:
+        """Get the paths of wallpapers without image statistics."""
+        with self._lock:
+            rows = self._connection.execute("SELECT path FROM wallpapers WHERE stats IS NULL").fetchall()
+        return [row[0] for row in rows]
+
+    def data_version(self) -> tuple:
+        """
+        Get a value that changes whenever the database does.
+
+        Covers commits of this process and of others (the GUI and the
+        daemon), so caches derived from the library know when to reload.
+        """
+        with self._lock:
+            (version,) = self._connection.execute("PRAGMA data_version").fetchone()
+            return version, self._connection.total_changes
+
+    def count(self) -> int:
+        """Get the number of indexed wallpapers."""
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM wallpapers").fetchone()[0]
+
+    def sync_directory(self, directory: Optional[str] = None) -> Dict[str, int]:
+        """
+        Reconcile the index with the files on disk.
+
+        Images downloaded before the library existed are added with the
+        metadata their file name and size provide; entries whose file is
+        gone are removed. Only needed once, or after files were changed by hand.
+
+        Args:
+            directory: Directory to scan; the current download directory by default
+
+        Returns:
+            Number of entries ``added`` and ``removed``
+        """
+        directory = os.path.normpath(directory or get_settings().download_dir)
+        with self._lock:
+            known = {row[0] for row in self._connection.execute("SELECT path FROM wallpapers")}
+
+        on_disk = {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.lower().endswith((".jpg", ".jpeg", ".png")):
+                        on_disk[entry.path] = entry.stat()
+        except OSError as e:
+            logger.warning(f"Failed to scan {directory}: {str(e)}")
+            return {"added": 0, "removed": 0}
+
+        added = [
+            # File names are "<photo id>_<timestamp>.jpg"
+            (path, os.path.basename(path).rsplit("_", 1)[0], stat.st_size, stat.st_mtime)
+            for path, stat in on_disk.items() if path not in known
+        ]
+        # Only entries inside the scanned directory can be judged missing
+        removed = [
+            (path,) for path in known
+            if os.path.dirname(path) == directory and path not in on_disk
+        ]
+
+        try:
+            with self._lock, self._connection:
+                self._connection.executemany(
+                    "INSERT INTO wallpapers (path, photo_id, file_size, downloaded_at) VALUES (?, ?, ?, ?)",
+                    added
+                )
+                self._connection.executemany("DELETE FROM wallpapers WHERE path = ?", removed)
+        except sqlite3.Error as e:
+            logger.error(f"Library sync failed: {str(e)}")
+            return {"added": 0, "removed": 0}
+
+        if added or removed:
+            logger.info(f"Library synced: {len(added)} added, {len(removed)} removed")
+        return {"added": len(added), "removed": len(removed)}
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+
+def _to_signed(value: int) -> int:
+    """Map an unsigned 64-bit hash onto SQLite's signed INTEGER range."""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def _to_unsigned(value: int) -> int:
+    """Inverse of _to_signed."""
+    return value + (1 << 64) if value < 0 else value
+
+
+_library: Optional[WallpaperLibrary] = None
+_library_pinned = False  # Set by set_library(); kept whatever the download directory
+_library_lock = threading.Lock()
+
+
+def get_library() -> WallpaperLibrary:
+    """
+    Get the shared library, opening it on first use.
+
+    The library of a new download directory is opened once the settings
+    change it; the previous one closes when no longer referenced.
+
+    Returns:
+        The process-wide WallpaperLibrary instance
+    """
+    global _library
+    with _library_lock:
+        if _library is None or (not _library_pinned and _library.db_path != data_path(LIBRARY_DB_NAME)):
+            _library = WallpaperLibrary()
+        return _library
+
+
+def set_library(library: Optional[WallpaperLibrary]):
+    """Override the shared library; None reopens the default one on next use."""
+    global _library, _library_pinned
+    with _library_lock:
+        _library = library
+        _library_pinned = library is not None
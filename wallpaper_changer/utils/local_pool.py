@@ -0,0 +1,151 @@
+"""
+Rotation through already-downloaded wallpapers.
+
+Used when the network is down or too slow. Picks follow a precomputed,
+persisted shuffle order, so no wallpaper repeats until every other one in
+the pool has been shown. The order is a weighted shuffle: wallpapers that
+haven't been applied for a long time (or never) tend to come first, recently
+applied ones last. When selection rules apply (e.g. dark wallpapers at night),
+the next matching wallpaper in the order is taken first.
+"""
+
+import os
+import json
+import time
+import random
+import logging
+from typing import Dict, List, Optional
+
+from wallpaper_changer.config import LOCAL_POOL_STATE_NAME, LOCAL_POOL_MAX_AGE_HOURS, data_path
+from wallpaper_changer.utils.library import WallpaperLibrary, get_library
+from wallpaper_changer.utils.selection import current_criteria
+
+logger = logging.getLogger(__name__)
+
+
+class LocalPool:
+    """Picks wallpapers from the library without repeats."""
+
+    def __init__(self, library: Optional[WallpaperLibrary] = None,
+                 state_path: Optional[str] = None):
+        """
+        Initialize the pool.
+
+        Args:
+            library: Library to pick from; the shared one by default
+            state_path: JSON file keeping the shuffle order between runs; the
+                one in the current download directory by default
+        """
+        self.library = library or get_library()
+        self.state_path = state_path or data_path(LOCAL_POOL_STATE_NAME)
+
+    def next_wallpaper(self) -> Optional[str]:
+        """
+        Pick the next wallpaper in the shuffle order.
+
+        Missing files are skipped. A new order is computed when the current
+        one is used up, starting with a different wallpaper than it ended on.
+
+        Returns:
+            Path of an existing downloaded image, or None if there is none
+        """
+        order, cursor = self._load_state()
+        self._promote_matching(order, cursor)
+
+        while cursor < len(order):
+            path = order[cursor]
+            cursor += 1
+            if os.path.exists(path):
+                self._save_state(order, cursor)
+                return path
+
+        candidates = self.library.applied_times()
+        if not candidates:
+            # Downloads from before the library existed
+            self.library.sync_directory()
+            candidates = self.library.applied_times()
+
+        last_pick = order[-1] if order else None
+        order = [path for path in self.shuffle(candidates, avoid_first=last_pick) if os.path.exists(path)]
+        if not order:
+            logger.warning("No downloaded wallpapers available for offline rotation")
+            return None
+
+        logger.info(f"New offline rotation order over {len(order)} wallpapers")
+        self._promote_matching(order, 0)
+        self._save_state(order, 1)
+        return order[0]
+
+    @staticmethod
+    def _promote_matching(order: List[str], cursor: int):
+        """
+        Swap the next wallpaper matching the selection rules to the cursor.
+
+        The wallpaper it displaces moves to the matching one's place, so
+        nothing is skipped and the no-repeat guarantee holds.
+        """
+        criteria = current_criteria()
+        if not criteria.active or cursor >= len(order):
+            return
+
+        from wallpaper_changer.utils.image_stats import get_stats_store
+
+        matching = set(get_stats_store().select(criteria))
+        for position in range(cursor, len(order)):
+            if order[position] in matching:
+                order[cursor], order[position] = order[position], order[cursor]
+                return
+
+    @staticmethod
+    def shuffle(candidates: Dict[str, Optional[float]], avoid_first: Optional[str] = None,
+                now: Optional[float] = None) -> List[str]:
+        """
+        Order wallpapers randomly, weighted by how long ago they were applied.
+
+        Uses weighted random sampling without replacement (each path gets
+        the key ``u ** (1 / weight)`` and keys are sorted descending), with a
+        weight growing linearly with the hours since the last apply, capped
+        at LOCAL_POOL_MAX_AGE_HOURS. Never-applied wallpapers get the cap.
+
+        Args:
+            candidates: Last apply time (Unix timestamp or None) per path
+            avoid_first: Path that must not come first, e.g. the current wallpaper
+            now: Reference time; defaults to now
+
+        Returns:
+            Every candidate path in pick order
+        """
+        now = time.time() if now is None else now
+        keys = {}
+        for path, last_applied in candidates.items():
+            if last_applied is None:
+                hours = LOCAL_POOL_MAX_AGE_HOURS
+            else:
+                hours = min(max((now - last_applied) / 3600, 0.0), LOCAL_POOL_MAX_AGE_HOURS)
+            weight = 1.0 + hours
+            keys[path] = random.random() ** (1.0 / weight)
+
+        order = sorted(keys, key=keys.get, reverse=True)
+        if len(order) > 1 and order[0] == avoid_first:
+            order.append(order.pop(0))
+        return order
+
+    def _load_state(self):
+        """Read the persisted order and cursor."""
+        try:
+            with open(self.state_path, encoding="utf-8") as file:
+                state = json.load(file)
+            return list(state["order"]), int(state["cursor"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return [], 0
+
+    def _save_state(self, order: List[str], cursor: int):
+        """Persist the order and cursor atomically."""
+        try:
+            os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+            temp_path = f"{self.state_path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump({"order": order, "cursor": cursor}, file)
+            os.replace(temp_path, self.state_path)
+        except OSError as e:
+            logger.warning(f"Failed to save offline rotation state: {str(e)}")
@@ -0,0 +1,226 @@
+"""
+Memory accounting of decoded images and photo metadata.
+
+Images decoded for the window (previews, list thumbnails, history
+thumbnails) are kept in ImageCaches that limit how many they hold, but not
+how large those are. The caches report every image to one MemoryBudget
+under their subsystem name. Once the images together exceed the cap, the
+least recently shown ones are evicted, from whichever cache holds them.
+
+Memory that isn't cached, such as pixmaps shown in widgets and the photo
+dictionaries of the search results, is accounted by sources: functions
+measuring a subsystem when usage is reported. Neither is visible to
+tracemalloc, which only sees Python allocations, not Qt's image buffers.
+"""
+
+import sys
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from wallpaper_changer.config import IMAGE_MEMORY_BUDGET_MB
+from wallpaper_changer.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[str, str]  # (subsystem, key within it)
+
+
+def image_nbytes(image: Any) -> int:
+    """
+    Size of an image's pixel data.
+
+    Args:
+        image: QImage, QPixmap or raw bytes
+
+    Returns:
+        Size in bytes; 0 for anything else
+    """
+    if isinstance(image, (bytes, bytearray)):
+        return len(image)
+    if hasattr(image, "sizeInBytes"):  # QImage
+        return image.sizeInBytes()
+    if hasattr(image, "depth") and hasattr(image, "width"):  # QPixmap
+        return image.width() * image.height() * image.depth() // 8
+    return 0
+
+
+def payload_nbytes(payload: Any, seen: Optional[Set[int]] = None) -> int:
+    """
+    Estimate the memory held by nested dicts, lists and scalars, such as
+    the photo dictionaries returned by the Unsplash API.
+
+    Args:
+        payload: Object to measure
+        seen: Ids of objects already counted; pass one set to measure
+            several payloads that share objects without counting them twice
+
+    Returns:
+        Approximate size in bytes
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    pending = [payload]
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            pending.extend(obj.keys())
+            pending.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set)):
+            pending.extend(obj)
+    return total
+
+
+class MemoryBudget:
+    """Bytes held per subsystem, evicting the least recently shown images past a cap."""
+
+    def __init__(self, cap_bytes: int = IMAGE_MEMORY_BUDGET_MB * 1024 * 1024):
+        """
+        Initialize an empty budget.
+
+        Args:
+            cap_bytes: Bytes of tracked images kept before evicting; 0
+                disables eviction
+        """
+        self.cap_bytes = cap_bytes
+        self.evictions = 0
+        self._images: "OrderedDict[Key, Tuple[int, Callable[[], None]]]" = OrderedDict()
+        self._image_bytes = 0
+        self._sources: Dict[str, Callable[[], int]] = {}
+        self._lock = threading.Lock()
+
+    def track(self, subsystem: str, key: str, nbytes: int, evict: Callable[[], None]):
+        """
+        Account an image as just shown, evicting others if over the cap.
+
+        Args:
+            subsystem: Owner of the image, e.g. "preview_cache"
+            key: Key of the image within its owner
+            nbytes: Size of the image
+            evict: Called to drop the image when it is evicted; the image
+                is no longer tracked by then
+        """
+        evicted = []
+        with self._lock:
+            previous = self._images.pop((subsystem, key), None)
+            if previous is not None:
+                self._image_bytes -= previous[0]
+            self._images[(subsystem, key)] = (nbytes, evict)
+            self._image_bytes += nbytes
+            # The image just tracked stays even if it alone exceeds the cap
+            while self.cap_bytes and self._image_bytes > self.cap_bytes and len(self._images) > 1:
+                oldest, (size, callback) = self._images.popitem(last=False)
+                self._image_bytes -= size
+                evicted.append((oldest, callback))
+            self.evictions += len(evicted)
+
+        metrics = get_metrics()
+        for (owner, _), callback in evicted:
+            metrics.count("memory_evictions_total", subsystem=owner)
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Evicting an image from {owner} failed: {str(e)}")
+
+    def touch(self, subsystem: str, key: str):
+        """Mark a tracked image as just shown."""
+        with self._lock:
+            if (subsystem, key) in self._images:
+                self._images.move_to_end((subsystem, key))
+
+    def release(self, subsystem: str, key: str):
+        """Stop accounting an image its owner dropped."""
+        with self._lock:
+            entry = self._images.pop((subsystem, key), None)
+            if entry is not None:
+                self._image_bytes -= entry[0]
+
+    def add_source(self, subsystem: str, measure: Callable[[], int]):
+        """
+        Account memory that isn't tracked image by image.
+
+        Args:
+            subsystem: Name the memory is reported under
+            measure: Returns the subsystem's current size in bytes; called
+                whenever usage is reported
+        """
+        with self._lock:
+            self._sources[subsystem] = measure
+
+    def remove_source(self, subsystem: str):
+        """Stop reporting a source added with add_source()."""
+        with self._lock:
+            self._sources.pop(subsystem, None)
+
+    @property
+    def image_bytes(self) -> int:
+        """Bytes of the tracked images."""
+        return self._image_bytes
+
+    def usage(self) -> Dict[str, int]:
+        """
+        Measure every subsystem.
+
+        Returns:
+            Bytes per subsystem, tracked images and sources alike
+        """
+        with self._lock:
+            totals: Dict[str, int] = {}
+            for (subsystem, _), (nbytes, _) in self._images.items():
+                totals[subsystem] = totals.get(subsystem, 0) + nbytes
+            sources = dict(self._sources)
+        for subsystem, measure in sources.items():
+            try:
+                totals[subsystem] = totals.get(subsystem, 0) + measure()
+            except Exception as e:
+                logger.error(f"Measuring {subsystem} failed: {str(e)}")
+        return totals
+
+    def record_gauges(self) -> Dict[str, int]:
+        """
+        Export the usage as ``memory_bytes`` gauges.
+
+        Returns:
+            Bytes per subsystem, as from usage()
+        """
+        totals = self.usage()
+        metrics = get_metrics()
+        for subsystem, nbytes in totals.items():
+            metrics.set_gauge("memory_bytes", nbytes, subsystem=subsystem)
+        return totals
+
+    def summary_lines(self) -> List[str]:
+        """Format the usage as one line per subsystem, largest first."""
+        totals = self.usage()
+        lines = [
+            f"{subsystem:<24} {nbytes / 1024:10.1f} KiB"
+            for subsystem, nbytes in sorted(totals.items(), key=lambda item: item[1], reverse=True)
+        ]
+        cap = f"{self.cap_bytes / 1024:.0f} KiB" if self.cap_bytes else "no cap"
+        lines.append(
+            f"{'cached images':<24} {self._image_bytes / 1024:10.1f} KiB of {cap}, {self.evictions} evicted"
+        )
+        return lines
+
+
+_budget: Optional[MemoryBudget] = None
+_budget_lock = threading.Lock()
+
+
+def get_memory_budget() -> MemoryBudget:
+    """
+    Get the shared memory budget.
+
+    Returns:
+        The process-wide MemoryBudget instance
+    """
+    global _budget
+    with _budget_lock:
+        if _budget is None:
+            _budget = MemoryBudget()
+        return _budget
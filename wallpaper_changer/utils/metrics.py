@@ -0,0 +1,414 @@
+"""
+Counters, gauges and latency histograms for the wallpaper pipeline.
+
+Every stage records into one process-wide registry: Unsplash API calls,
+photo downloads, thumbnail and preview fetching and decoding, and applying
+the wallpaper. A slow start can then be traced to the stage that caused it.
+The registry is exported to a JSON file and a Prometheus text-format file
+(for node_exporter's textfile collector) in the metrics directory next to
+the downloads, one pair per
+process role, and the window shows it live in its stats panel.
+
+Recording is off unless METRICS_ENABLED is set (``PIXELDRIVE_METRICS=1``).
+Disabled, every call returns after one attribute check and timed() hands
+out a shared no-op context manager.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from wallpaper_changer.config import METRICS_ENABLED, METRICS_NAME, data_path
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Prefix of the exported Prometheus metric names
+PROMETHEUS_PREFIX = "pixeldrive_"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Counter:
+    """Value that only goes up, e.g. requests made or bytes downloaded."""
+
+    kind = "counter"
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        """Add to the count; the caller holds the registry lock."""
+        self.value += amount
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"value": self.value}
+
+
+class Gauge:
+    """Value that goes up and down, e.g. workers running."""
+
+    kind = "gauge"
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float):
+        """Replace the value; the caller holds the registry lock."""
+        self.value = value
+
+    def inc(self, amount: float = 1.0):
+        """Add to the value; the caller holds the registry lock."""
+        self.value += amount
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"value": self.value}
+
+
+class Histogram:
+    """Distribution of durations over LATENCY_BUCKETS."""
+
+    kind = "histogram"
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # Last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def observe(self, value: float):
+        """Record a duration in seconds; the caller holds the registry lock."""
+        index = 0
+        while index < len(LATENCY_BUCKETS) and value > LATENCY_BUCKETS[index]:
+            index += 1
+        self.buckets[index] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        self.last = value
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile from the buckets.
+
+        Args:
+            q: Quantile from 0 to 1, e.g. 0.95
+
+        Returns:
+            Estimated duration in seconds, interpolated within its bucket
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            if count and seen + count >= rank:
+                lower = LATENCY_BUCKETS[index - 1] if index else 0.0
+                upper = LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max)
+            seen += count
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "max": self.max,
+            "last": self.last,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": dict(zip([str(bound) for bound in LATENCY_BUCKETS] + ["+Inf"], self.buckets)),
+        }
+
+
+class _NullTimer:
+    """Stand-in for _Timer while recording is off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    """Context manager recording the time spent inside it into a histogram."""
+
+    def __init__(self, registry: "MetricsRegistry", name: str, labels: Labels):
+        self._registry = registry
+        self._name = name
+        self._labels = labels
+        self._started = 0.0
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._registry._observe(self._name, self._labels, time.perf_counter() - self._started)
+        return False
+
+
+class MetricsRegistry:
+    """Named metrics with optional labels, created on first use."""
+
+    def __init__(self, enabled: bool = METRICS_ENABLED, role: str = "pixeldrive"):
+        """
+        Initialize an empty registry.
+
+        Args:
+            enabled: Whether anything is recorded
+            role: Name of the process (e.g. "gui", "daemon"); exported files
+                and series are named after it so processes don't overwrite
+                each other
+        """
+        self.enabled = enabled
+        self.role = role
+        self._metrics: Dict[Tuple[str, Labels], Any] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, kind: type, name: str, labels: Labels):
+        """Find or create a metric; the caller holds the lock."""
+        metric = self._metrics.get((name, labels))
+        if metric is None:
+            metric = self._metrics[(name, labels)] = kind()
+        return metric
+
+    def count(self, name: str, amount: float = 1.0, **labels: str):
+        """
+        Add to a counter.
+
+        Args:
+            name: Metric name, ending in ``_total`` by convention
+            amount: Amount to add
+            **labels: Label values, e.g. ``outcome="error"``
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._get(Counter, name, tuple(sorted(labels.items()))).inc(amount)
+
+    def set_gauge(self, name: str, value: float, **labels: str):
+        """
+        Set a gauge.
+
+        Args:
+            name: Metric name
+            value: New value
+            **labels: Label values
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._get(Gauge, name, tuple(sorted(labels.items()))).set(value)
+
+    def add_gauge(self, name: str, amount: float, **labels: str):
+        """
+        Add to (or, with a negative amount, subtract from) a gauge.
+
+        Args:
+            name: Metric name
+            amount: Amount to add
+            **labels: Label values
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._get(Gauge, name, tuple(sorted(labels.items()))).inc(amount)
+
+    def observe(self, name: str, seconds: float, **labels: str):
+        """
+        Record a duration.
+
+        Args:
+            name: Metric name, ending in ``_seconds`` by convention
+            seconds: Duration to record
+            **labels: Label values
+        """
+        if not self.enabled:
+            return
+        self._observe(name, tuple(sorted(labels.items())), seconds)
+
+    def _observe(self, name: str, labels: Labels, seconds: float):
+        with self._lock:
+            self._get(Histogram, name, labels).observe(seconds)
+
+    def timed(self, name: str, **labels: str):
+        """
+        Time a block of code into a histogram.
+
+        Args:
+            name: Metric name, ending in ``_seconds`` by convention
+            **labels: Label values
+
+        Returns:
+            Context manager; exceptions pass through and still count
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, tuple(sorted(labels.items())))
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """
+        Copy every metric's current state.
+
+        Returns:
+            One dictionary per series with ``name``, ``kind``, ``labels`` and
+            the metric's values, sorted by name
+        """
+        with self._lock:
+            series = [
+                {"name": name, "kind": metric.kind, "labels": dict(labels), **metric.to_dict()}
+                for (name, labels), metric in self._metrics.items()
+            ]
+        return sorted(series, key=lambda entry: (entry["name"], sorted(entry["labels"].items())))
+
+    def to_prometheus(self) -> str:
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        Returns:
+            The text, with a ``role`` label on every series
+        """
+        lines = []
+        typed = set()
+        for entry in self.snapshot():
+            name = PROMETHEUS_PREFIX + entry["name"]
+            if name not in typed:
+                lines.append(f"# TYPE {name} {entry['kind']}")
+                typed.add(name)
+            labels = {"role": self.role, **entry["labels"]}
+            if entry["kind"] != "histogram":
+                lines.append(f"{name}{_format_labels(labels)} {entry['value']:g}")
+                continue
+            cumulative = 0
+            for bound, count in entry["buckets"].items():
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels({**labels, 'le': bound})} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {entry['sum']:g}")
+            lines.append(f"{name}_count{_format_labels(labels)} {entry['count']}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, directory: Optional[str] = None) -> Optional[str]:
+        """
+        Write the metrics to ``<role>.json`` and ``<role>.prom``.
+
+        Args:
+            directory: Directory the files are written to; the metrics
+                directory in the current download directory by default
+
+        Returns:
+            Path of the JSON file, or None if recording is off or writing failed
+        """
+        if not self.enabled:
+            return None
+        directory = directory or data_path(METRICS_NAME)
+        json_path = os.path.join(directory, f"{self.role}.json")
+        try:
+            os.makedirs(directory, exist_ok=True)
+            document = {"role": self.role, "pid": os.getpid(), "exported_at": time.time(),
+                        "metrics": self.snapshot()}
+            _write_atomically(json_path, json.dumps(document, indent=1))
+            _write_atomically(os.path.join(directory, f"{self.role}.prom"), self.to_prometheus())
+        except OSError as e:
+            logger.warning(f"Failed to export metrics: {str(e)}")
+            return None
+        return json_path
+
+    def reset(self):
+        """Drop every metric."""
+        with self._lock:
+            self._metrics.clear()
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    """Render labels as ``{key="value",...}``."""
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _write_atomically(path: str, text: str):
+    """Replace a file's content in one step, so readers never see half of it."""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        file.write(text)
+    os.replace(temp_path, path)
+
+
+def summary_lines(series: List[Dict[str, Any]]) -> List[str]:
+    """
+    Format metrics as one line per series, for the stats panel and the CLI.
+
+    Args:
+        series: Entries as returned by MetricsRegistry.snapshot()
+
+    Returns:
+        Lines with the count and latency percentiles of histograms and the
+        value of counters and gauges
+    """
+    lines = []
+    for entry in series:
+        labels = ",".join(f"{key}={value}" for key, value in entry["labels"].items())
+        name = f"{entry['name']}{{{labels}}}" if labels else entry["name"]
+        if entry["kind"] == "histogram":
+            lines.append(
+                f"{name:<52} n={entry['count']:<5d} p50={entry['p50'] * 1000:7.1f} ms  "
+                f"p95={entry['p95'] * 1000:7.1f} ms  max={entry['max'] * 1000:7.1f} ms"
+            )
+        else:
+            lines.append(f"{name:<52} {entry['value']:g}")
+    return lines
+
+
+def read_exports(directory: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Read the JSON exports of every process role.
+
+    Args:
+        directory: Directory the exports were written to; the metrics
+            directory in the current download directory by default
+
+    Returns:
+        Parsed export documents, by role
+    """
+    directory = directory or data_path(METRICS_NAME)
+    documents = []
+    try:
+        names = sorted(name for name in os.listdir(directory) if name.endswith(".json"))
+    except OSError:
+        return []
+    for name in names:
+        try:
+            with open(os.path.join(directory, name), encoding="utf-8") as file:
+                documents.append(json.load(file))
+        except (OSError, ValueError):
+            continue
+    return documents
+
+
+# Created at import so recording never waits on a lock to find the registry
+_registry = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """
+    Get the process-wide registry.
+
+    Returns:
+        The shared MetricsRegistry instance
+    """
+    return _registry
@@ -0,0 +1,307 @@
+"""
+Perceptual hashing for near-duplicate detection.
+
+Images are hashed with dHash: the image is shrunk to 9x8 grey pixels and each
+of the 64 bits records whether a pixel is brighter than its right neighbour.
+Near-identical shots (re-crops, re-encodes, resizes) end up a few bits apart,
+so duplicates are found by Hamming distance through a BK-tree. Hashing works
+on small decodes (list thumbnails or scaled file reads) and is vectorized
+with NumPy across whole batches.
+
+NumPy is imported on first use to keep application startup fast.
+"""
+
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage
+
+from wallpaper_changer.config import DUPLICATE_MAX_DISTANCE
+from wallpaper_changer.utils.image_decode import decode_image_file
+
+logger = logging.getLogger(__name__)
+
+HASH_WIDTH = 9
+HASH_HEIGHT = 8
+
+# Files are decoded at this size before shrinking to the hash grid
+_SCAN_DECODE_SIZE = (64, 64)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Count the bits in which two hashes differ."""
+    return bin(a ^ b).count("1")
+
+
+def grey_pixels(image: QImage):
+    """
+    Shrink an image to the hash grid as grey levels.
+
+    Args:
+        image: Decoded image of any size
+
+    Returns:
+        uint8 array of shape (HASH_HEIGHT, HASH_WIDTH)
+    """
+    import numpy as np
+
+    small = image.scaled(HASH_WIDTH, HASH_HEIGHT, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+    small = small.convertToFormat(QImage.Format_Grayscale8)
+    bits = small.constBits()
+    bits.setsize(small.bytesPerLine() * HASH_HEIGHT)
+    # Rows are padded to 4 bytes
+    rows = np.frombuffer(bits, dtype=np.uint8).reshape(HASH_HEIGHT, small.bytesPerLine())
+    return rows[:, :HASH_WIDTH].copy()
+
+
+def dhash_batch(pixels) -> List[int]:
+    """
+    Compute dHashes for a batch of grey grids at once.
+
+    Args:
+        pixels: Array of shape (n, HASH_HEIGHT, HASH_WIDTH)
+
+    Returns:
+        One 64-bit hash per grid
+    """
+    import numpy as np
+
+    pixels = np.asarray(pixels)
+    brighter = pixels[:, :, 1:] > pixels[:, :, :-1]
+    packed = np.packbits(brighter.reshape(len(pixels), -1), axis=1)
+    return [int(value) for value in packed.view(">u8").ravel()]
+
+
+def dhash(image: QImage) -> Optional[int]:
+    """
+    Compute the dHash of a decoded image.
+
+    Args:
+        image: Decoded image, e.g. a list thumbnail
+
+    Returns:
+        64-bit hash, or None for a null image
+    """
+    if image.isNull():
+        return None
+    return dhash_batch([grey_pixels(image)])[0]
+
+
+class BKTree:
+    """
+    Metric tree over 64-bit hashes for Hamming-distance range queries.
+
+    Each child edge is labelled with its distance to the parent, so a query
+    only descends into children whose label is within ``max_distance`` of
+    the query's distance to the parent (triangle inequality).
+    """
+
+    def __init__(self):
+        self._root: Optional[list] = None  # [hash, values, {distance: child}]
+        self._size = 0
+
+    def add(self, value: int, item: str):
+        """
+        Insert a hash.
+
+        Args:
+            value: 64-bit hash
+            item: Payload returned by searches, e.g. a file path
+        """
+        self._size += 1
+        if self._root is None:
+            self._root = [value, [item], {}]
+            return
+
+        node = self._root
+        while True:
+            distance = hamming_distance(value, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [item], {}]
+                return
+            node = child
+
+    def search(self, value: int, max_distance: int) -> List[Tuple[int, str]]:
+        """
+        Find all items within a Hamming distance of a hash.
+
+        Args:
+            value: 64-bit hash to look up
+            max_distance: Largest distance to report
+
+        Returns:
+            (distance, item) pairs, closest first
+        """
+        results = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(value, node[0])
+            if distance <= max_distance:
+                results.extend((distance, item) for item in node[1])
+            for edge, child in node[2].items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        return sorted(results)
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class DuplicateIndex:
+    """Thread-safe lookup of near-duplicate wallpapers by perceptual hash."""
+
+    def __init__(self, hashes: Optional[Dict[str, int]] = None,
+                 max_distance: int = DUPLICATE_MAX_DISTANCE):
+        """
+        Initialize the index.
+
+        Args:
+            hashes: Initial hash per file path
+            max_distance: Largest Hamming distance counted as a duplicate
+        """
+        self.max_distance = max_distance
+        self._tree = BKTree()
+        self._lock = threading.Lock()
+        for path, value in (hashes or {}).items():
+            self._tree.add(value, path)
+
+    def add(self, value: int, path: str):
+        """Index the hash of a file."""
+        with self._lock:
+            self._tree.add(value, path)
+
+    def find(self, value: int) -> List[Tuple[int, str]]:
+        """
+        Find indexed files that look like a hash.
+
+        Returns:
+            (distance, path) pairs, closest first
+        """
+        with self._lock:
+            return self._tree.search(value, self.max_distance)
+
+    def __len__(self) -> int:
+        return len(self._tree)
+
+
+_index: Optional[DuplicateIndex] = None
+_index_library = None  # Library the shared index was built from
+_index_lock = threading.Lock()
+
+
+def get_duplicate_index() -> DuplicateIndex:
+    """
+    Get the shared duplicate index, building it from the library on first use.
+
+    It is rebuilt when the shared library changes, e.g. with the download
+    directory.
+
+    Returns:
+        The process-wide DuplicateIndex
+    """
+    global _index, _index_library
+    from wallpaper_changer.utils.library import get_library
+
+    with _index_lock:
+        library = get_library()
+        if _index is None or library is not _index_library:
+            _index, _index_library = DuplicateIndex(library.phashes()), library
+            logger.debug(f"Duplicate index built over {len(_index)} wallpapers")
+        return _index
+
+
+def _decode_for_hash(path: str):
+    """Decode a file straight to its hash grid, or None if unreadable."""
+    image = decode_image_file(path, _SCAN_DECODE_SIZE)
+    return None if image.isNull() else grey_pixels(image)
+
+
+def hash_files(paths: Sequence[str], workers: Optional[int] = None) -> Dict[str, int]:
+    """
+    Hash image files, decoding in parallel and hashing per batch.
+
+    Args:
+        paths: Image files to hash
+        workers: Decoder threads; defaults to the CPU count
+
+    Returns:
+        Hash per readable file
+    """
+    import numpy as np
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 4) as pool:
+        grids = list(pool.map(_decode_for_hash, paths))
+
+    readable = [(path, grid) for path, grid in zip(paths, grids) if grid is not None]
+    if not readable:
+        return {}
+    hashes = dhash_batch(np.stack([grid for _, grid in readable]))
+    return {path: value for (path, _), value in zip(readable, hashes)}
+
+
+def scan_library(library=None, batch_size: int = 256) -> int:
+    """
+    Hash every library wallpaper that has no hash yet.
+
+    Args:
+        library: WallpaperLibrary to scan; the shared one by default
+        batch_size: Files decoded and stored per batch
+
+    Returns:
+        Number of files hashed
+    """
+    from wallpaper_changer.utils.library import get_library
+
+    library = library or get_library()
+    pending = library.unhashed_paths()
+    hashed = 0
+    for start in range(0, len(pending), batch_size):
+        hashes = hash_files(pending[start:start + batch_size])
+        library.set_phashes(hashes)
+        hashed += len(hashes)
+        logger.info(f"Hashed {start + len(hashes)}/{len(pending)} wallpapers")
+    return hashed
+
+
+def find_duplicate_groups(hashes: Dict[str, int],
+                          max_distance: int = DUPLICATE_MAX_DISTANCE) -> List[List[str]]:
+    """
+    Group files whose hashes are within a distance of each other.
+
+    Args:
+        hashes: Hash per file path
+        max_distance: Largest Hamming distance counted as a duplicate
+
+    Returns:
+        Groups of two or more paths, largest first
+    """
+    tree = BKTree()
+    for path, value in hashes.items():
+        tree.add(value, path)
+
+    # Union-find over the near-duplicate pairs
+    parent = {path: path for path in hashes}
+
+    def root(path: str) -> str:
+        while parent[path] != path:
+            parent[path] = parent[parent[path]]
+            path = parent[path]
+        return path
+
+    for path, value in hashes.items():
+        for _, other in tree.search(value, max_distance):
+            parent[root(other)] = root(path)
+
+    groups: Dict[str, List[str]] = {}
+    for path in hashes:
+        groups.setdefault(root(path), []).append(path)
+    return sorted((group for group in groups.values() if len(group) > 1), key=len, reverse=True)
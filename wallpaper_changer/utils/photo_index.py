@@ -0,0 +1,323 @@
+"""
+Local full-text search over every photo record fetched from Unsplash.
+
+Search results are stored in SQLite as they arrive, and an in-memory
+inverted index over their descriptions, alt texts, tags, author names and
+the queries that found them answers searches instantly, also offline.
+Ranking is BM25 with per-field weights; the last word of a query also
+matches as a prefix, so "ferr" finds "ferrari".
+
+Writes go straight to the database, so short-lived processes (headless
+mode) can record results without building the in-memory index.
+"""
+
+import os
+import re
+import json
+import heapq
+import math
+import time
+import bisect
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from wallpaper_changer.config import PHOTO_INDEX_NAME, PHOTO_INDEX_MAX_PHOTOS, data_path
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS photos (
+    id TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    queries TEXT NOT NULL DEFAULT '',
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS photos_fetched_at ON photos (fetched_at);
+"""
+
+# Term frequencies are multiplied by these, so a tag match outranks a
+# passing mention in a long description
+FIELD_WEIGHTS = {
+    "description": 1.0,
+    "alt_description": 1.0,
+    "tags": 2.0,
+    "author": 1.5,
+    "queries": 1.0,
+}
+
+# BM25 parameters: term frequency saturation and length normalisation
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Most terms a query prefix expands to, shortest first
+MAX_PREFIX_TERMS = 64
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_STOPWORDS = frozenset(
+    "a an and at by for from in into is of on or the to with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase search terms, dropping stopwords."""
+    return [token for token in _TOKEN.findall((text or "").lower()) if token not in _STOPWORDS]
+
+
+def photo_fields(photo: Dict[str, Any], queries: str = "") -> Dict[str, str]:
+    """
+    Extract the searchable text of a photo.
+
+    Args:
+        photo: Photo dictionary from Unsplash API
+        queries: Queries the photo was found with, space separated
+
+    Returns:
+        Text per field of FIELD_WEIGHTS
+    """
+    user = photo.get("user") or {}
+    tags = " ".join(tag.get("title", "") for tag in photo.get("tags") or [] if isinstance(tag, dict))
+    return {
+        "description": photo.get("description") or "",
+        "alt_description": photo.get("alt_description") or "",
+        "tags": tags,
+        "author": f"{user.get('name') or ''} {user.get('username') or ''}",
+        "queries": queries,
+    }
+
+
+class PhotoIndex:
+    """Stored Unsplash photo records with a BM25 inverted index over them."""
+
+    def __init__(self, db_path: Optional[str] = None, max_photos: int = PHOTO_INDEX_MAX_PHOTOS):
+        """
+        Open (and create if needed) the photo database.
+
+        Args:
+            db_path: Database file path, or ":memory:"; the database in the
+                current download directory by default
+            max_photos: Records kept; the least recently fetched are dropped
+        """
+        db_path = db_path or data_path(PHOTO_INDEX_NAME)
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+        self.db_path = db_path
+        self.max_photos = max_photos
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, timeout=5.0, check_same_thread=False)
+        with self._lock, self._connection:
+            if db_path != ":memory:":
+                self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(_SCHEMA)
+
+        # In-memory index, built by load()
+        self._loaded = False
+        self._photos: Dict[str, Dict[str, Any]] = {}
+        self._postings: Dict[str, Dict[str, float]] = {}  # term -> {photo id: weighted tf}
+        self._doc_terms: Dict[str, List[str]] = {}
+        self._lengths: Dict[str, float] = {}
+        self._total_length = 0.0
+        self._vocabulary: List[str] = []  # Sorted, for prefix lookups
+
+    def load(self):
+        """Build the in-memory index from the database, once."""
+        with self._lock:
+            if self._loaded:
+                return
+            started = time.perf_counter()
+            rows = self._connection.execute("SELECT id, data, queries FROM photos").fetchall()
+            for photo_id, data, queries in rows:
+                try:
+                    self._index_photo(photo_id, json.loads(data), queries)
+                except ValueError:
+                    continue
+            self._vocabulary = sorted(self._postings)
+            self._loaded = True
+            logger.debug(
+                f"Photo index loaded: {len(self._photos)} photos, {len(self._vocabulary)} terms "
+                f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+            )
+
+    def add(self, photos: Iterable[Dict[str, Any]], query: Optional[str] = None):
+        """
+        Store search results, remembering the query that found them.
+
+        Args:
+            photos: Photo dictionaries from Unsplash API
+            query: Search query or genre the photos were found with
+        """
+        photos = [photo for photo in photos if photo.get("id")]
+        if not photos:
+            return
+
+        query = " ".join(tokenize(query or ""))
+        now = time.time()
+        with self._lock:
+            try:
+                with self._connection:
+                    ids = [photo["id"] for photo in photos]
+                    placeholders = ", ".join("?" * len(ids))
+                    known = dict(self._connection.execute(
+                        f"SELECT id, queries FROM photos WHERE id IN ({placeholders})", ids
+                    ).fetchall())
+
+                    records = []
+                    for photo in photos:
+                        queries = known.get(photo["id"], "")
+                        if query and query not in queries.split("|"):
+                            queries = f"{queries}|{query}" if queries else query
+                        records.append((photo["id"], json.dumps(photo), queries, now))
+                    self._connection.executemany(
+                        "INSERT OR REPLACE INTO photos (id, data, queries, fetched_at) VALUES (?, ?, ?, ?)",
+                        records
+                    )
+                    dropped = self._prune()
+            except sqlite3.Error as e:
+                logger.error(f"Photo index update failed: {str(e)}")
+                return
+
+            if self._loaded:
+                for photo_id in dropped:
+                    self._unindex_photo(photo_id)
+                for (photo_id, _, queries, _), photo in zip(records, photos):
+                    self._unindex_photo(photo_id)
+                    self._index_photo(photo_id, photo, queries, keep_sorted=True)
+
+    def _prune(self) -> List[str]:
+        """Drop the least recently fetched records past the cap; returns their ids."""
+        (count,) = self._connection.execute("SELECT COUNT(*) FROM photos").fetchone()
+        if count <= self.max_photos:
+            return []
+        dropped = [row[0] for row in self._connection.execute(
+            "SELECT id FROM photos ORDER BY fetched_at LIMIT ?", (count - self.max_photos,)
+        )]
+        self._connection.executemany("DELETE FROM photos WHERE id = ?", [(photo_id,) for photo_id in dropped])
+        return dropped
+
+    def _index_photo(self, photo_id: str, photo: Dict[str, Any], queries: str, keep_sorted: bool = False):
+        """Add a photo to the in-memory index; the caller holds the lock."""
+        frequencies: Dict[str, float] = {}
+        for field, text in photo_fields(photo, queries.replace("|", " ")).items():
+            weight = FIELD_WEIGHTS[field]
+            for term in tokenize(text):
+                frequencies[term] = frequencies.get(term, 0.0) + weight
+
+        for term, frequency in frequencies.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                if keep_sorted:
+                    bisect.insort(self._vocabulary, term)
+            postings[photo_id] = frequency
+
+        length = sum(frequencies.values())
+        self._photos[photo_id] = photo
+        self._doc_terms[photo_id] = list(frequencies)
+        self._lengths[photo_id] = length
+        self._total_length += length
+
+    def _unindex_photo(self, photo_id: str):
+        """Remove a photo from the in-memory index; the caller holds the lock."""
+        if photo_id not in self._photos:
+            return
+        for term in self._doc_terms.pop(photo_id):
+            postings = self._postings[term]
+            del postings[photo_id]
+            if not postings:
+                del self._postings[term]
+                position = bisect.bisect_left(self._vocabulary, term)
+                if position < len(self._vocabulary) and self._vocabulary[position] == term:
+                    del self._vocabulary[position]
+        self._total_length -= self._lengths.pop(photo_id)
+        del self._photos[photo_id]
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        """Find indexed terms starting with a prefix, shortest first."""
+        vocabulary = self._vocabulary
+        terms = []
+        for i in range(bisect.bisect_left(vocabulary, prefix), len(vocabulary)):
+            if not vocabulary[i].startswith(prefix):
+                break
+            terms.append(vocabulary[i])
+        return sorted(terms, key=len)[:MAX_PREFIX_TERMS]
+
+    def search(self, text: str, limit: int = 30, prefix: bool = True) -> List[Dict[str, Any]]:
+        """
+        Find stored photos matching a query, best first.
+
+        Args:
+            text: Search query
+            limit: Most photos to return
+            prefix: Whether the last word also matches longer terms, for
+                search-as-you-type
+
+        Returns:
+            Photo dictionaries from Unsplash API
+        """
+        self.load()
+        terms = tokenize(text)
+        if not terms:
+            return []
+
+        with self._lock:
+            count = len(self._photos)
+            if not count:
+                return []
+            average_length = self._total_length / count
+
+            scores: Dict[str, float] = {}
+            for position, term in enumerate(terms):
+                is_prefix = prefix and position == len(terms) - 1
+                expansions = self._expand_prefix(term) if is_prefix else [term]
+
+                # A prefix counts once per photo, with its best-scoring expansion
+                term_scores: Dict[str, float] = {}
+                for expansion in expansions:
+                    postings = self._postings.get(expansion)
+                    if not postings:
+                        continue
+                    idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for photo_id, frequency in postings.items():
+                        norm = 1 - BM25_B + BM25_B * self._lengths[photo_id] / average_length
+                        score = idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * norm)
+                        if score > term_scores.get(photo_id, 0.0):
+                            term_scores[photo_id] = score
+
+                for photo_id, score in term_scores.items():
+                    scores[photo_id] = scores.get(photo_id, 0.0) + score
+
+            ranked = heapq.nlargest(limit, scores, key=scores.get)
+            return [self._photos[photo_id] for photo_id in ranked]
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connection.execute("SELECT COUNT(*) FROM photos").fetchone()
+        return count
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+
+_index: Optional[PhotoIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_photo_index() -> PhotoIndex:
+    """
+    Get the shared photo index, opening it on first use.
+
+    The index of a new download directory is opened once the settings
+    change it.
+
+    Returns:
+        The process-wide PhotoIndex instance
+    """
+    global _index
+    with _index_lock:
+        if _index is None or _index.db_path != data_path(PHOTO_INDEX_NAME):
+            _index = PhotoIndex()
+        return _index
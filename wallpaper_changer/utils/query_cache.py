@@ -0,0 +1,139 @@
+"""
+Cache of recent search results, looked up by query prefix.
+
+While typing, a query usually extends or shortens one that was searched a
+moment ago ("Ferr" -> "Ferrari", or back). Instead of a new request per
+keystroke, such queries are answered from the related cached results,
+narrowed to the photos whose text matches what was typed.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from wallpaper_changer.utils.photo_index import photo_fields, tokenize
+
+Photos = List[Dict[str, Any]]
+
+
+def _normalize(query: str) -> str:
+    """Cache key of a query: its search terms, space separated."""
+    return " ".join(tokenize(query))
+
+
+def photo_matches(photo: Dict[str, Any], terms: List[str], found_with: str = "") -> bool:
+    """
+    Check whether a photo's text contains every search term.
+
+    Args:
+        photo: Photo dictionary from Unsplash API
+        terms: Search terms; the last one also matches as a prefix
+        found_with: Query the photo was found with, searched as well
+
+    Returns:
+        True if every term occurs in the photo's text
+    """
+    words = set()
+    for text in photo_fields(photo, found_with).values():
+        words.update(tokenize(text))
+    *whole, last = terms
+    return all(term in words for term in whole) and any(word.startswith(last) for word in words)
+
+
+class QueryCache:
+    """Least-recently-used cache of search results with an expiry time."""
+
+    def __init__(self, max_entries: int = 64, ttl_seconds: float = 600):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Queries kept before the least recently used is dropped
+            ttl_seconds: Age after which results are no longer served
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Photos]]" = OrderedDict()
+
+    def put(self, query: str, photos: Photos):
+        """
+        Store the results of a query.
+
+        Args:
+            query: Search query as typed
+            photos: Photo dictionaries from Unsplash API
+        """
+        key = _normalize(query)
+        if not key:
+            return
+        self._entries[key] = (time.monotonic(), photos)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, query: str) -> Optional[Photos]:
+        """
+        Get the results of exactly this query.
+
+        Args:
+            query: Search query as typed
+
+        Returns:
+            Cached photos, or None if not cached or expired
+        """
+        key = _normalize(query)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def lookup(self, query: str) -> Optional[Photos]:
+        """
+        Answer a query from its own or a related query's results.
+
+        A related query is a cached one the query extends or shortens. Of the
+        longest such query, the photos matching the typed terms are returned.
+
+        Args:
+            query: Search query as typed
+
+        Returns:
+            Matching cached photos, or None if none can answer the query
+        """
+        exact = self.get(query)
+        if exact is not None:
+            return exact
+
+        key = _normalize(query)
+        if not key:
+            return None
+        now = time.monotonic()
+        related = [
+            cached for cached, (stored_at, _) in self._entries.items()
+            if now - stored_at <= self.ttl_seconds and (cached.startswith(key) or key.startswith(cached))
+        ]
+        terms = key.split()
+        for cached in sorted(related, key=len, reverse=True):
+            photos = [
+                photo for photo in self._entries[cached][1]
+                if photo_matches(photo, terms, cached)
+            ]
+            if photos:
+                self._entries.move_to_end(cached)
+                return photos
+        return None
+
+    def photo_lists(self) -> List[Photos]:
+        """Get the cached results of every query, expired or not."""
+        return [photos for _, photos in self._entries.values()]
+
+    def clear(self):
+        """Drop all cached results."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,256 @@
+"""
+Pre-rendering of wallpapers to the exact geometry of the connected screens.
+
+Desktop environments rescale the wallpaper image on every login, monitor
+change and lock. Rendering it once to the screens' native resolution and
+caching the result lets the compositor use the file as-is.
+"""
+
+import os
+import json
+import hashlib
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+
+from wallpaper_changer.config import (
+    RENDER_MODE, RENDER_QUALITY, RENDER_CACHE_NAME, RENDER_CACHE_MAX_FILES, data_path
+)
+
+logger = logging.getLogger(__name__)
+
+# (x, y, width, height) of a screen in device pixels
+ScreenGeometry = Tuple[int, int, int, int]
+
+RENDER_MODES = ("fill", "fit", "span")
+
+# File in the cache directory naming the rendered files currently applied
+APPLIED_RECORD = "applied.json"
+
+
+def detect_screen_geometries() -> List[ScreenGeometry]:
+    """
+    Get the geometry of every connected screen.
+
+    Must be called from the GUI thread. Returns an empty list when no Qt GUI
+    application is running, e.g. in headless mode.
+
+    Returns:
+        List of (x, y, width, height) tuples in device pixels
+    """
+    from PyQt5.QtGui import QGuiApplication
+
+    if QGuiApplication.instance() is None:
+        return []
+
+    screens = []
+    for screen in QGuiApplication.screens():
+        geometry = screen.geometry()
+        ratio = screen.devicePixelRatio()
+        screens.append((
+            round(geometry.x() * ratio), round(geometry.y() * ratio),
+            round(geometry.width() * ratio), round(geometry.height() * ratio)
+        ))
+    return screens
+
+
+class WallpaperRenderer:
+    """Crops and scales images to the screen layout and caches the result."""
+
+    def __init__(
+        self,
+        mode: str = RENDER_MODE,
+        cache_dir: Optional[str] = None,
+        quality: int = RENDER_QUALITY,
+        max_files: int = RENDER_CACHE_MAX_FILES
+    ):
+        """
+        Initialize the renderer.
+
+        Args:
+            mode: "fill" crops each screen's region to cover it, "fit"
+                letterboxes each screen's region, "span" covers the whole
+                layout with a single crop
+            cache_dir: Directory the rendered files are written to; the
+                one in the current download directory by default
+            quality: JPEG quality of the rendered files
+            max_files: Number of rendered files kept in the cache
+        """
+        if mode not in RENDER_MODES:
+            raise ValueError(f"Unknown render mode '{mode}', expected one of {RENDER_MODES}")
+        self.mode = mode
+        self.cache_dir = cache_dir or data_path(RENDER_CACHE_NAME)
+        self.quality = quality
+        self.max_files = max_files
+
+    def cache_path(self, image_path: str, screens: List[ScreenGeometry]) -> str:
+        """
+        Get the cache file for an image rendered to a screen layout.
+
+        The key covers the source file's identity and modification time, the
+        layout and the render settings, so any change produces a new file.
+
+        Args:
+            image_path: Path to the source image
+            screens: Screen geometries the image is rendered for
+
+        Returns:
+            Path of the rendered file inside the cache directory
+        """
+        abs_path = os.path.abspath(image_path)
+        stat = os.stat(abs_path)
+        key = f"{abs_path}|{stat.st_mtime_ns}|{stat.st_size}|{self.mode}|{self.quality}|{sorted(screens)}"
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{digest}.jpg")
+
+    def render(self, image_path: str, screens: List[ScreenGeometry]) -> str:
+        """
+        Render an image for the given screens, reusing a cached result.
+
+        Args:
+            image_path: Path to the source image
+            screens: Screen geometries from :func:`detect_screen_geometries`
+
+        Returns:
+            Path to the rendered image, or the source path if rendering was
+            not possible
+        """
+        if not screens:
+            return image_path
+
+        try:
+            output_path = self.cache_path(image_path, screens)
+            if os.path.exists(output_path):
+                os.utime(output_path)  # Keep recently used renders from being pruned
+                logger.info(f"Using cached rendered wallpaper: {output_path}")
+                return output_path
+
+            os.makedirs(self.cache_dir, exist_ok=True)
+            image = self._compose(image_path, screens)
+            if image.isNull():
+                return image_path
+
+            self._write(image, output_path)
+            self._prune()
+            logger.info(
+                f"Rendered wallpaper to {image.width()}x{image.height()} ({self.mode}): {output_path}"
+            )
+            return output_path
+
+        except Exception as e:
+            logger.error(f"Failed to render wallpaper '{image_path}': {str(e)}")
+            return image_path
+
+    def _compose(self, image_path: str, screens: List[ScreenGeometry]):
+        """Paint the source image into a canvas covering all screens."""
+        from PyQt5.QtCore import QRect, QSize, Qt
+        from PyQt5.QtGui import QImage, QImageReader, QPainter
+
+        left = min(x for x, _, _, _ in screens)
+        top = min(y for _, y, _, _ in screens)
+        right = max(x + w for x, _, w, _ in screens)
+        bottom = max(y + h for _, y, _, h in screens)
+        canvas_size = QSize(right - left, bottom - top)
+
+        if self.mode == "span":
+            targets = [QRect(0, 0, canvas_size.width(), canvas_size.height())]
+        else:
+            targets = [QRect(x - left, y - top, w, h) for x, y, w, h in screens]
+
+        # Decode no larger than the biggest target needs
+        reader = QImageReader(image_path)
+        reader.setAutoTransform(True)
+        original = reader.size()
+        if original.isValid():
+            aspect_mode = Qt.KeepAspectRatio if self.mode == "fit" else Qt.KeepAspectRatioByExpanding
+            needed = max(
+                (original.scaled(rect.size(), aspect_mode) for rect in targets),
+                key=lambda size: size.width() * size.height()
+            )
+            if needed.width() < original.width():
+                reader.setScaledSize(needed)
+
+        source = reader.read()
+        if source.isNull():
+            logger.error(f"Failed to decode '{image_path}': {reader.errorString()}")
+            return source
+
+        canvas = QImage(canvas_size, QImage.Format_RGB32)
+        canvas.fill(Qt.black)
+        painter = QPainter(canvas)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        for rect in targets:
+            if self.mode == "fit":
+                scaled = source.scaled(rect.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
+                painter.drawImage(
+                    rect.x() + (rect.width() - scaled.width()) // 2,
+                    rect.y() + (rect.height() - scaled.height()) // 2,
+                    scaled
+                )
+            else:
+                scaled = source.scaled(rect.size(), Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
+                crop_x = (scaled.width() - rect.width()) // 2
+                crop_y = (scaled.height() - rect.height()) // 2
+                painter.drawImage(rect.topLeft(), scaled, QRect(crop_x, crop_y, rect.width(), rect.height()))
+        painter.end()
+        return canvas
+
+    def _write(self, image, output_path: str):
+        """Encode the rendered image atomically into the cache."""
+        from PyQt5.QtGui import QImageWriter
+
+        temp_path = output_path + ".tmp"
+        writer = QImageWriter(temp_path, b"jpg")
+        writer.setQuality(self.quality)
+        writer.setOptimizedWrite(True)
+        writer.setProgressiveScanWrite(True)
+        if not writer.write(image):
+            raise IOError(writer.errorString())
+        os.replace(temp_path, output_path)
+
+    def mark_applied(self, images: Dict[str, str]):
+        """
+        Record which rendered files are on screen, so pruning keeps them.
+
+        Args:
+            images: Applied image path per kind ("desktop", "lockscreen");
+                paths outside the cache directory are ignored
+        """
+        record_path = os.path.join(self.cache_dir, APPLIED_RECORD)
+        applied = self._read_applied()
+        for kind, path in images.items():
+            if os.path.dirname(os.path.abspath(path)) == os.path.abspath(self.cache_dir):
+                applied[kind] = os.path.abspath(path)
+            else:
+                applied.pop(kind, None)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = record_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(applied, f)
+            os.replace(temp_path, record_path)
+        except OSError as e:
+            logger.warning(f"Failed to record applied wallpapers: {str(e)}")
+
+    def _read_applied(self) -> Dict[str, str]:
+        """Read the applied file per kind written by mark_applied()."""
+        try:
+            with open(os.path.join(self.cache_dir, APPLIED_RECORD), encoding="utf-8") as f:
+                applied = json.load(f)
+            return applied if isinstance(applied, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _prune(self):
+        """Remove the oldest rendered files beyond the cache limit, never the applied ones."""
+        applied: Set[str] = set(self._read_applied().values())
+        files = [
+            os.path.join(self.cache_dir, name)
+            for name in os.listdir(self.cache_dir) if name.endswith(".jpg")
+        ]
+        files = [path for path in files if os.path.abspath(path) not in applied]
+        files.sort(key=os.path.getmtime, reverse=True)
+        for path in files[self.max_files:]:
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"Failed to remove rendered wallpaper '{path}': {str(e)}")
@@ -0,0 +1,191 @@
+"""
+Schedules for the rotation daemon.
+
+Each schedule answers one question: given a moment, when is the next run?
+Interval schedules count from the previous run; cron schedules use the usual
+five fields (minute, hour, day of month, month, day of week) with ``*``,
+lists, ranges and steps.
+"""
+
+from datetime import datetime, timedelta
+from typing import FrozenSet, Iterable, Optional
+
+# (low, high) bounds of the cron fields; 7 is accepted as Sunday like in cron
+_CRON_FIELDS = (
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day of month", 1, 31),
+    ("month", 1, 12),
+    ("day of week", 0, 7),
+)
+
+# Search horizon for cron expressions that can never fire (e.g. "0 0 31 2 *")
+_CRON_HORIZON = timedelta(days=366 * 5)
+
+
+class Schedule:
+    """Base class for daemon schedules."""
+
+    def next_after(self, moment: datetime) -> datetime:
+        """
+        Get the next run time strictly after a moment.
+
+        Args:
+            moment: Reference time, usually now or the previous run
+
+        Returns:
+            Time of the next run
+        """
+        raise NotImplementedError
+
+
+class IntervalSchedule(Schedule):
+    """Runs at a fixed interval."""
+
+    def __init__(self, minutes: float):
+        """
+        Initialize the schedule.
+
+        Args:
+            minutes: Minutes between runs
+
+        Raises:
+            ValueError: If the interval is not positive
+        """
+        if minutes <= 0:
+            raise ValueError(f"Interval must be positive, got {minutes} minutes")
+        self.interval = timedelta(minutes=minutes)
+
+    def next_after(self, moment: datetime) -> datetime:
+        """Get the next run time strictly after a moment."""
+        return moment + self.interval
+
+    def __repr__(self) -> str:
+        return f"IntervalSchedule(every {self.interval})"
+
+
+class CronSchedule(Schedule):
+    """Runs at the times matched by a cron expression."""
+
+    def __init__(self, expression: str):
+        """
+        Initialize the schedule.
+
+        Args:
+            expression: Five-field cron expression, e.g. ``"0 8,18 * * 1-5"``
+
+        Raises:
+            ValueError: If the expression is malformed
+        """
+        fields = expression.split()
+        if len(fields) != len(_CRON_FIELDS):
+            raise ValueError(f"Cron expression needs 5 fields, got {len(fields)}: '{expression}'")
+
+        self.expression = expression
+        parsed = [
+            _parse_cron_field(text, name, low, high)
+            for text, (name, low, high) in zip(fields, _CRON_FIELDS)
+        ]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = frozenset(day % 7 for day in weekdays)
+
+        # Like cron: if both day fields are restricted, either one may match.
+        # A field is unrestricted if it covers its whole range, e.g. "*/1".
+        self._any_day = len(self.days) == 31
+        self._any_weekday = len(self.weekdays) == 7
+
+    def _day_matches(self, moment: datetime) -> bool:
+        """Check the day-of-month and day-of-week fields."""
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.isoweekday() % 7) in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        """
+        Get the next matching minute strictly after a moment.
+
+        Raises:
+            ValueError: If the expression never matches
+        """
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + _CRON_HORIZON
+
+        # Skip whole months, days and hours that can't match
+        while candidate < limit:
+            if candidate.month not in self.months:
+                candidate = (candidate.replace(day=1) + timedelta(days=32)).replace(
+                    day=1, hour=0, minute=0
+                )
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+
+        raise ValueError(f"Cron expression never matches: '{self.expression}'")
+
+    def __repr__(self) -> str:
+        return f"CronSchedule('{self.expression}')"
+
+
+def _parse_cron_field(text: str, name: str, low: int, high: int) -> FrozenSet[int]:
+    """
+    Parse one cron field into the set of values it matches.
+
+    Args:
+        text: Field text, e.g. ``"*/15"``, ``"1-5"`` or ``"0,30"``
+        name: Field name used in error messages
+        low: Smallest allowed value
+        high: Largest allowed value
+
+    Returns:
+        Matched values
+
+    Raises:
+        ValueError: If the field is malformed or out of range
+    """
+    values = set()
+    for part in text.split(","):
+        try:
+            step = 1
+            stepped = "/" in part
+            if stepped:
+                part, step_text = part.split("/", 1)
+                step = int(step_text)
+
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start_text, end_text = part.split("-", 1)
+                start, end = int(start_text), int(end_text)
+            else:
+                start = int(part)
+                end = high if stepped else start
+        except ValueError:
+            raise ValueError(f"Invalid cron {name} field: '{text}'") from None
+
+        if step < 1 or start < low or end > high or start > end:
+            raise ValueError(f"Cron {name} field out of range {low}-{high}: '{text}'")
+        values.update(range(start, end + 1, step))
+
+    return frozenset(values)
+
+
+def next_run(schedules: Iterable[Schedule], moment: datetime) -> Optional[datetime]:
+    """
+    Get the earliest next run across several schedules.
+
+    Args:
+        schedules: Schedules to combine
+        moment: Reference time
+
+    Returns:
+        Earliest next run time, or None if there are no schedules
+    """
+    times = [schedule.next_after(moment) for schedule in schedules]
+    return min(times) if times else None
@@ -0,0 +1,171 @@
+"""
+Scoring of search results by how well they fit the connected screens.
+
+Uses only the metadata Unsplash returns with every result, so portrait
+crops, low-resolution images and extreme panoramas are ranked down and
+skipped before anything is downloaded. For a photo and a screen, the fit is
+the share of the photo kept when it is cropped to fill the screen, times a
+penalty for having to upscale it; screens count by area. The scores of a
+whole batch are computed at once as a photos x screens matrix.
+
+NumPy is imported on first use.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from wallpaper_changer.config import (
+    FIT_MIN_SCORE, FIT_LIKES_WEIGHT, FIT_FALLBACK_SCREEN, RENDER_MODE
+)
+from wallpaper_changer.utils.selection import order_photos
+
+logger = logging.getLogger(__name__)
+
+# Score of photos without usable dimensions, which are neither preferred nor skipped
+UNKNOWN_FIT = 0.5
+
+
+def target_sizes(screens: Optional[Sequence[Tuple[int, int, int, int]]] = None) -> List[Tuple[int, int]]:
+    """
+    Get the (width, height) areas a wallpaper has to cover.
+
+    Args:
+        screens: (x, y, width, height) geometries as returned by
+            render.detect_screen_geometries(); detected when omitted
+
+    Returns:
+        One size per screen, or the whole layout when wallpapers are
+        rendered to span it; FIT_FALLBACK_SCREEN if nothing is detected
+    """
+    if screens is None:
+        from wallpaper_changer.utils.render import detect_screen_geometries
+        screens = detect_screen_geometries()
+    if not screens:
+        return [tuple(FIT_FALLBACK_SCREEN)]
+
+    if RENDER_MODE == "span":
+        left = min(x for x, _, _, _ in screens)
+        top = min(y for _, y, _, _ in screens)
+        right = max(x + width for x, _, width, _ in screens)
+        bottom = max(y + height for _, y, _, height in screens)
+        return [(right - left, bottom - top)]
+    return [(width, height) for _, _, width, height in screens]
+
+
+def fit_scores(photos: List[Dict[str, Any]], sizes: Sequence[Tuple[int, int]]):
+    """
+    Score a batch of photos against the screens.
+
+    Args:
+        photos: Photo dictionaries from Unsplash API
+        sizes: (width, height) of each area to cover, from target_sizes()
+
+    Returns:
+        float array with one score per photo; 1 is a perfect fit
+    """
+    import numpy as np
+
+    dimensions = np.array(
+        [(photo.get("width") or 0, photo.get("height") or 0) for photo in photos], dtype=np.float64
+    ).reshape(-1, 2)
+    screens = np.array(sizes, dtype=np.float64).reshape(-1, 2)
+    known = (dimensions > 0).all(axis=1)
+    dimensions[~known] = 1  # Placeholder, scored as unknown below
+
+    # photos x screens
+    photo_aspect = (dimensions[:, 0] / dimensions[:, 1])[:, None]
+    screen_aspect = (screens[:, 0] / screens[:, 1])[None, :]
+    kept = np.minimum(photo_aspect, screen_aspect) / np.maximum(photo_aspect, screen_aspect)
+    upscale = np.maximum(screens[None, :, 0] / dimensions[:, None, 0], screens[None, :, 1] / dimensions[:, None, 1])
+    per_screen = kept * np.minimum(1.0, 1.0 / upscale)
+
+    areas = screens[:, 0] * screens[:, 1]
+    scores = per_screen @ (areas / areas.sum())
+    scores[~known] = UNKNOWN_FIT
+    return scores
+
+
+def likes_bonus(photos: List[Dict[str, Any]], weight: float = FIT_LIKES_WEIGHT):
+    """
+    Ranking factor favouring the more-liked photos of a batch.
+
+    Args:
+        photos: Photo dictionaries from Unsplash API
+        weight: Bonus of the most-liked photo; others get a share of it on
+            a log scale
+
+    Returns:
+        float array of factors from 1 to 1 + weight, one per photo
+    """
+    import numpy as np
+
+    likes = np.log1p(np.array([max(photo.get("likes") or 0, 0) for photo in photos], dtype=np.float64))
+    if not weight or likes.max(initial=0) <= 0:
+        return np.ones(len(photos))
+    return 1 + weight * likes / likes.max()
+
+
+def rank_photos(photos: List[Dict[str, Any]], sizes: Optional[Sequence[Tuple[int, int]]] = None,
+                min_score: float = FIT_MIN_SCORE) -> List[Dict[str, Any]]:
+    """
+    Drop photos that fit the screens poorly and sort the rest, best first.
+
+    Likes only affect the order, never whether a photo is dropped.
+
+    Args:
+        photos: Photo dictionaries from Unsplash API
+        sizes: Areas to cover; the detected screens by default
+        min_score: Photos scoring below this are dropped
+
+    Returns:
+        The fitting photos by descending score
+    """
+    if not photos:
+        return []
+    import numpy as np
+
+    fit = fit_scores(photos, sizes or target_sizes())
+    order = np.argsort(-(fit * likes_bonus(photos)), kind="stable")
+    ranked = [photos[i] for i in order if fit[i] >= min_score]
+    if len(ranked) < len(photos):
+        logger.debug(f"Skipped {len(photos) - len(ranked)} of {len(photos)} photos that fit the screens poorly")
+    return ranked
+
+
+def filter_photos(photos: List[Dict[str, Any]], sizes: Optional[Sequence[Tuple[int, int]]] = None,
+                  min_score: float = FIT_MIN_SCORE) -> List[Dict[str, Any]]:
+    """
+    Drop photos that fit the screens poorly, keeping the order of the rest.
+
+    Args:
+        photos: Photo dictionaries from Unsplash API
+        sizes: Areas to cover; the detected screens by default
+        min_score: Photos scoring below this are dropped
+
+    Returns:
+        The fitting photos, in their original order
+    """
+    if not photos or min_score <= 0:
+        return list(photos)
+    scores = fit_scores(photos, sizes or target_sizes())
+    return [photo for photo, score in zip(photos, scores) if score >= min_score]
+
+
+def wallpaper_candidates(photos: List[Dict[str, Any]],
+                         sizes: Optional[Sequence[Tuple[int, int]]] = None) -> List[Dict[str, Any]]:
+    """
+    Order photos for picking a wallpaper at random.
+
+    Photos that fit the screens come in random order, those matching the
+    selection rules first; if nothing fits, the poor fits by descending
+    score stand in.
+
+    Args:
+        photos: Photo dictionaries from Unsplash API
+        sizes: Areas to cover; the detected screens by default
+
+    Returns:
+        The photos to try, the pick first
+    """
+    sizes = sizes or target_sizes()
+    return order_photos(filter_photos(photos, sizes)) or rank_photos(photos, sizes, min_score=0)
@@ -0,0 +1,111 @@
+"""
+Rules for choosing which wallpaper to apply.
+
+Rules are preferences, not filters: callers put matching wallpapers first
+and fall back to the rest when nothing matches. Remote photos are judged by
+the average colour Unsplash reports; downloaded ones by the statistics in
+utils/image_stats.py.
+"""
+
+import random
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from wallpaper_changer.config import (
+    DARK_HOURS, DARK_MAX_BRIGHTNESS, ACCENT_COLOR, ACCENT_MAX_DISTANCE
+)
+
+RGB = Tuple[int, int, int]
+
+
+def hex_to_rgb(value: str) -> Optional[RGB]:
+    """Parse a "#rrggbb" colour, returning None if it is malformed."""
+    value = (value or "").lstrip("#")
+    if len(value) != 6:
+        return None
+    try:
+        return int(value[0:2], 16), int(value[2:4], 16), int(value[4:6], 16)
+    except ValueError:
+        return None
+
+
+def luminance(rgb: RGB) -> float:
+    """Relative luminance (Rec. 709 weights) of an sRGB colour, from 0 to 1."""
+    red, green, blue = rgb
+    return (0.2126 * red + 0.7152 * green + 0.0722 * blue) / 255
+
+
+class SelectionCriteria(NamedTuple):
+    """What the next wallpaper should preferably look like."""
+
+    max_brightness: Optional[float] = None  # Mean luminance from 0 to 1
+    accent_color: Optional[RGB] = None  # A dominant colour close to this
+    accent_distance: float = ACCENT_MAX_DISTANCE  # RGB distance counted as close
+
+    @property
+    def active(self) -> bool:
+        """Whether any rule applies."""
+        return self.max_brightness is not None or self.accent_color is not None
+
+    def accepts_color(self, hex_color: str) -> bool:
+        """
+        Judge a photo by its average colour.
+
+        Args:
+            hex_color: "#rrggbb" average colour, as in Unsplash's ``color`` field
+
+        Returns:
+            True if the colour satisfies every rule, or can't be judged
+        """
+        rgb = hex_to_rgb(hex_color)
+        if rgb is None:
+            return True
+        if self.max_brightness is not None and luminance(rgb) > self.max_brightness:
+            return False
+        if self.accent_color is not None:
+            distance = sum((a - b) ** 2 for a, b in zip(rgb, self.accent_color)) ** 0.5
+            if distance > self.accent_distance:
+                return False
+        return True
+
+
+def current_criteria(now: Optional[datetime] = None) -> SelectionCriteria:
+    """
+    Build the criteria configured for a moment.
+
+    Args:
+        now: Moment to evaluate time-based rules at; defaults to now
+
+    Returns:
+        Criteria from DARK_HOURS / DARK_MAX_BRIGHTNESS and ACCENT_COLOR
+    """
+    max_brightness = None
+    if DARK_HOURS:
+        hour = (now or datetime.now()).hour
+        start, end = DARK_HOURS
+        # The range may wrap around midnight, e.g. (20, 7)
+        in_range = start <= hour < end if start <= end else (hour >= start or hour < end)
+        if in_range:
+            max_brightness = DARK_MAX_BRIGHTNESS
+
+    return SelectionCriteria(max_brightness, hex_to_rgb(ACCENT_COLOR))
+
+
+def order_photos(photos: List[Dict[str, Any]],
+                 criteria: Optional[SelectionCriteria] = None) -> List[Dict[str, Any]]:
+    """
+    Shuffle photos, putting those that satisfy the criteria first.
+
+    Args:
+        photos: Photo dictionaries from Unsplash API
+        criteria: Rules to apply; the current ones by default
+
+    Returns:
+        All photos, matching ones first, in random order within each group
+    """
+    criteria = criteria or current_criteria()
+    shuffled = random.sample(photos, len(photos))
+    if not criteria.active:
+        return shuffled
+    # sorted() is stable, so the shuffle is kept within both groups
+    return sorted(shuffled, key=lambda photo: not criteria.accepts_color(photo.get("color", "")))
@@ -0,0 +1,152 @@
+"""
+On-disk cache of tiny JPEG thumbnails of local wallpapers.
+
+Decoding a multi-megapixel download just to show a 64 px icon is wasteful,
+even with scaled decoding, so each thumbnail is decoded once and stored next
+to the downloads. Entries are keyed by the source file's path, size and
+modification time, so a replaced file gets a fresh thumbnail. Like the
+render cache, the directory is capped by file count, dropping the least
+recently used thumbnails, which also clears out those of wallpapers that
+left the history. Safe to use from worker threads.
+"""
+
+import os
+import hashlib
+import logging
+import threading
+from typing import Optional, Tuple
+
+from PyQt5.QtGui import QImage, QImageWriter
+
+from wallpaper_changer.config import HISTORY_THUMBNAIL_NAME, HISTORY_THUMBNAIL_MAX_FILES, data_path
+from wallpaper_changer.utils.image_decode import decode_image_file
+
+logger = logging.getLogger(__name__)
+
+# Thumbnails written between two prunes; listing the directory on every
+# write would cost more than the thumbnails save while the history scrolls
+_PRUNE_INTERVAL = 100
+
+
+class ThumbnailDiskCache:
+    """Creates and reuses small JPEG thumbnails of local image files."""
+
+    def __init__(self, cache_dir: Optional[str] = None, quality: int = 80,
+                 max_files: int = HISTORY_THUMBNAIL_MAX_FILES):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory the thumbnails are stored in; the one in the
+                current download directory by default
+            quality: JPEG quality of stored thumbnails
+            max_files: Number of thumbnails kept on disk
+        """
+        self.cache_dir = cache_dir or data_path(HISTORY_THUMBNAIL_NAME)
+        self.quality = quality
+        self.max_files = max_files
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def cache_path(self, source_path: str, size: Tuple[int, int]) -> Optional[str]:
+        """
+        Get the cache file for a source image at a thumbnail size.
+
+        Args:
+            source_path: Path of the full-size image
+            size: (width, height) bounds of the thumbnail
+
+        Returns:
+            Path of the cached thumbnail, or None if the source doesn't exist
+        """
+        try:
+            stat = os.stat(source_path)
+        except OSError:
+            return None
+        key = f"{source_path}|{stat.st_mtime_ns}|{stat.st_size}|{size[0]}x{size[1]}"
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".jpg")
+
+    def load(self, source_path: str, size: Tuple[int, int]) -> QImage:
+        """
+        Get a thumbnail, decoding and storing it on first use.
+
+        Args:
+            source_path: Path of the full-size image
+            size: (width, height) bounds of the thumbnail
+
+        Returns:
+            Decoded thumbnail, which is null if the source can't be read
+        """
+        cached_path = self.cache_path(source_path, size)
+        if cached_path is None:
+            return QImage()
+
+        if os.path.exists(cached_path):
+            image = decode_image_file(cached_path)
+            if not image.isNull():
+                self._touch(cached_path)
+                return image
+
+        image = decode_image_file(source_path, size)
+        if not image.isNull():
+            self._write(image, cached_path)
+        return image
+
+    def _write(self, image: QImage, cached_path: str):
+        """Store a thumbnail atomically; failures only cost a later re-decode."""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = f"{cached_path}.{os.getpid()}.tmp"
+            writer = QImageWriter(temp_path, b"jpg")
+            writer.setQuality(self.quality)
+            if not writer.write(image):
+                raise IOError(writer.errorString())
+            os.replace(temp_path, cached_path)
+        except (IOError, OSError) as e:
+            logger.warning(f"Failed to cache thumbnail {cached_path}: {str(e)}")
+            return
+
+        with self._lock:
+            prune = self._writes % _PRUNE_INTERVAL == 0
+            self._writes += 1
+        if prune:
+            self.prune()
+
+    @staticmethod
+    def _touch(cached_path: str):
+        """Mark a thumbnail as recently used, so pruning keeps it."""
+        try:
+            os.utime(cached_path)
+        except OSError:
+            pass
+
+    def prune(self) -> int:
+        """
+        Remove the least recently used thumbnails beyond the cache limit.
+
+        Returns:
+            Number of thumbnails removed
+        """
+        try:
+            files = [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith(".jpg")]
+        except OSError:
+            return 0
+        if len(files) <= self.max_files:
+            return 0
+
+        def last_used(entry) -> float:
+            try:
+                return entry.stat().st_mtime
+            except OSError:
+                return 0.0
+
+        files.sort(key=last_used, reverse=True)
+        removed = 0
+        for entry in files[self.max_files:]:
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except OSError as e:
+                logger.warning(f"Failed to remove thumbnail '{entry.path}': {str(e)}")
+        logger.debug(f"Removed {removed} cached thumbnails")
+        return removed
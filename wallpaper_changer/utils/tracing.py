@@ -0,0 +1,277 @@
+"""
+Span tracing of single wallpaper changes, written as Chrome trace events.
+
+Where the metrics (see metrics.py) aggregate, a trace shows one run: each
+step of a wallpaper change is a span with its thread, start and duration,
+nested under the step that started it, also across threads. Worker threads
+pick up the span that was current on the thread that created them, so
+``auto_change_wallpaper`` on the GUI thread is the parent of the search and
+download workers, which are in turn the parents of the API calls they make.
+
+Traces are written in the Trace Event Format as JSON, which
+``chrome://tracing`` and https://ui.perfetto.dev open directly. Spans on the
+same thread nest by time; arrows (flow events) connect parents to children
+started on other threads. Long spans on the GUI thread ("MainThread") are
+where the window was blocked.
+
+Tracing is off unless TRACE_ENABLED is set (``PIXELDRIVE_TRACE=1``).
+Disabled, spans are a shared no-op object and nothing is recorded.
+"""
+
+import os
+import json
+import time
+import logging
+import itertools
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from wallpaper_changer.config import TRACE_ENABLED, TRACE_NAME, TRACE_MAX_EVENTS, data_path
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    """One timed step; end() records it."""
+
+    def __init__(self, tracer: "Tracer", name: str, parent: Optional["Span"], args: Dict[str, Any]):
+        self._tracer = tracer
+        self.name = name
+        self.span_id = next(tracer._ids)
+        self.parent = parent
+        self.args = args
+        self.thread_id = threading.get_ident()
+        self.start_us = tracer._now_us()
+        self._ended = False
+
+    def set(self, key: str, value: Any):
+        """Attach a value shown with the span, e.g. a byte count."""
+        self.args[key] = value
+
+    def end(self, **args: Any):
+        """
+        Finish the span; later calls are ignored.
+
+        Args:
+            **args: Values to attach before recording
+        """
+        if self._ended:
+            return
+        self._ended = True
+        self.args.update(args)
+        self._tracer._record(self, self._tracer._now_us())
+
+    def __enter__(self):
+        self._tracer._push(self)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self._tracer._pop(self)
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.end()
+        return False
+
+
+class _NullSpan:
+    """Stand-in for Span while tracing is off."""
+
+    def set(self, key: str, value: Any):
+        pass
+
+    def end(self, **args: Any):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def __bool__(self):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Activation:
+    """Context manager making a span current on this thread without ending it."""
+
+    def __init__(self, tracer: "Tracer", span: Optional[Span]):
+        self._tracer = tracer
+        self._span = span
+
+    def __enter__(self):
+        if self._span:
+            self._tracer._push(self._span)
+        return self._span
+
+    def __exit__(self, *exc_info):
+        if self._span:
+            self._tracer._pop(self._span)
+        return False
+
+
+class Tracer:
+    """Collects finished spans as trace events."""
+
+    def __init__(self, enabled: bool = TRACE_ENABLED, max_events: int = TRACE_MAX_EVENTS):
+        """
+        Initialize the tracer.
+
+        Args:
+            enabled: Whether spans are recorded
+            max_events: Events kept; the oldest are dropped past this
+        """
+        self.enabled = enabled
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=max_events)
+        self._thread_names: Dict[int, str] = {}
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def _now_us(self) -> float:
+        return (time.perf_counter() - self._origin) * 1e6
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _push(self, span: Span):
+        self._stack().append(span)
+
+    def _pop(self, span: Span):
+        stack = self._stack()
+        if stack and stack[-1] is span:
+            stack.pop()
+        elif span in stack:
+            stack.remove(span)
+
+    def current(self) -> Optional[Span]:
+        """Get the innermost active span of this thread, if any."""
+        if not self.enabled:
+            return None
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def span(self, name: str, parent: Optional[Span] = None, **args: Any):
+        """
+        Start a span.
+
+        Used as ``with tracer.span("download") as span:``, the span times the
+        block and is current inside it, so spans started there (also by
+        workers created there) become its children. A span covering several
+        signal/slot round trips is kept instead and finished with end();
+        use() makes it current where its children are started.
+
+        Args:
+            name: Step name
+            parent: Parent span; the current span of this thread by default
+            **args: Values shown with the span
+
+        Returns:
+            Context manager yielding the span
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, parent or self.current(), args)
+
+    def use(self, span: Optional[Span]):
+        """
+        Make a span started elsewhere current for a block of code.
+
+        Args:
+            span: Span kept from span(), or None
+
+        Returns:
+            Context manager; does nothing for None or while tracing is off
+        """
+        return _Activation(self, span if self.enabled and span else None)
+
+    def _record(self, span: Span, end_us: float):
+        """Store a finished span, plus a flow arrow if its parent is on another thread."""
+        thread_name = threading.current_thread().name
+        if thread_name.startswith("Dummy-"):
+            # Started by Qt rather than threading, which numbers such threads
+            thread_name = "QThread"
+        args = dict(span.args, span_id=span.span_id)
+        if span.parent:
+            args["parent_id"] = span.parent.span_id
+        event = {
+            "name": span.name, "cat": "wallpaper", "ph": "X", "pid": os.getpid(),
+            "tid": span.thread_id, "ts": round(span.start_us, 1), "dur": round(end_us - span.start_us, 1),
+            "args": args,
+        }
+        with self._lock:
+            self._thread_names.setdefault(span.thread_id, thread_name)
+            self._events.append(event)
+            if span.parent and span.parent.thread_id != span.thread_id:
+                flow = {"name": "spawn", "cat": "wallpaper", "id": span.span_id, "pid": os.getpid()}
+                self._events.append(dict(
+                    flow, ph="s", tid=span.parent.thread_id, ts=round(span.parent.start_us, 1)
+                ))
+                self._events.append(dict(flow, ph="f", bp="e", tid=span.thread_id, ts=round(span.start_us, 1)))
+
+    def to_json(self) -> Dict[str, Any]:
+        """
+        Build the trace document.
+
+        Returns:
+            Trace Event Format object with the recorded events and thread names
+        """
+        pid = os.getpid()
+        with self._lock:
+            events = list(self._events)
+            names = dict(self._thread_names)
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in names.items()
+        ]
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+    def write(self, path: Optional[str] = None, role: str = "pixeldrive") -> Optional[str]:
+        """
+        Write the trace recorded so far.
+
+        Args:
+            path: Output file; ``<role>-<pid>.json`` in the traces directory
+                of the current download directory by default
+            role: Process name used in the default file name
+
+        Returns:
+            Path written, or None if tracing is off, nothing was recorded or
+            writing failed
+        """
+        if not self.enabled or not self._events:
+            return None
+        path = path or os.path.join(data_path(TRACE_NAME), f"{role}-{os.getpid()}.json")
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            temp_path = f"{path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(self.to_json(), file)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write trace: {str(e)}")
+            return None
+        logger.debug(f"Trace written to {path}")
+        return path
+
+
+# Created at import so starting a span never waits on a lock to find the tracer
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """
+    Get the process-wide tracer.
+
+    Returns:
+        The shared Tracer instance
+    """
+    return _tracer
@@ -1,8 +1,21 @@
 """
 Worker threads for background operations.
+
+Attributes are imported lazily on first access, so importing this package
+doesn't load PyQt5.
 """
 
-from .fetch_worker import FetchWorker
-from .download_worker import DownloadWorker
+from wallpaper_changer._lazy import lazy_exports
+
+_EXPORTS = {
+    'FetchWorker': '.fetch_worker',
+    'DownloadWorker': '.download_worker',
+    'ImageFetchWorker': '.image_worker',
+    'LocalThumbnailWorker': '.image_worker',
+    'ImagePrefetcher': '.prefetcher',
+    'ApplyWorker': '.apply_worker',
+    'WallpaperApplier': '.apply_worker',
+    'TaskWorker': '.task_worker',
+}
 
-__all__ = ['FetchWorker', 'DownloadWorker']
+__getattr__, __dir__, __all__ = lazy_exports(__name__, _EXPORTS)
@@ -0,0 +1,159 @@
+"""
+Worker thread and executor for applying wallpapers off the GUI thread.
+"""
+
+import time
+import logging
+from typing import Dict, List, Optional
+
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+
+from wallpaper_changer.config import RENDER_MODE
+from wallpaper_changer.utils import WallpaperManager
+from wallpaper_changer.utils.library import get_library
+from wallpaper_changer.utils.metrics import get_metrics
+from wallpaper_changer.utils.tracing import get_tracer
+from wallpaper_changer.utils.render import (
+    ScreenGeometry, WallpaperRenderer, detect_screen_geometries
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ApplyWorker(QThread):
+    """Worker thread that applies wallpapers through WallpaperManager in one batch."""
+
+    # Signals
+    applied = pyqtSignal(str, str, bool, float)  # Emitted per kind with (path, kind, success, elapsed ms)
+
+    def __init__(self, jobs: Dict[str, str], screens: Optional[List[ScreenGeometry]] = None, parent=None):
+        """
+        Initialize the apply worker.
+
+        Args:
+            jobs: Image path per kind ("desktop" and/or "lockscreen")
+            screens: Screen geometries to pre-render the images for; images
+                are applied as-is when empty
+            parent: Parent QObject
+        """
+        super().__init__(parent)
+        self.jobs = jobs
+        self.screens = screens or []
+        self._trace_parent = get_tracer().current()
+
+    def run(self):
+        """
+        Run the worker thread to apply the wallpapers.
+
+        Platform calls such as ``gsettings`` or ``SystemParametersInfoW`` can
+        block for a long time, which is why they run here.
+        """
+        started = time.perf_counter()
+        tracer = get_tracer()
+        with tracer.span("ApplyWorker.run", parent=self._trace_parent, kinds=",".join(self.jobs)) as span:
+            try:
+                images = dict(self.jobs)
+                renderer = WallpaperRenderer(RENDER_MODE) if RENDER_MODE and self.screens else None
+                if renderer:
+                    timer = get_metrics().timed("render_seconds", mode=RENDER_MODE)
+                    with timer, tracer.span("render", mode=RENDER_MODE):
+                        images = {kind: renderer.render(path, self.screens) for kind, path in images.items()}
+
+                # A render covers the whole layout, which only shows right if the desktop spans it
+                spanned = len(self.screens) > 1 and all(images[kind] != self.jobs[kind] for kind in images)
+                success = WallpaperManager.apply(
+                    desktop=images.get("desktop"),
+                    lockscreen=images.get("lockscreen"),
+                    spanned=spanned
+                )
+                if success and renderer:
+                    renderer.mark_applied(images)
+            except Exception as e:
+                logger.error(f"Error setting {' and '.join(self.jobs)} wallpaper: {str(e)}")
+                success = False
+            span.set("success", success)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"Applied {' and '.join(self.jobs)} wallpaper in {elapsed_ms:.0f} ms (success={success})")
+        if success and "desktop" in self.jobs:
+            get_library().record_applied(self.jobs["desktop"])
+        for kind, path in self.jobs.items():
+            self.applied.emit(path, kind, success, elapsed_ms)
+
+
+class WallpaperApplier(QObject):
+    """
+    Runs wallpaper apply jobs one at a time in the background.
+
+    Requests that arrive while a job is running are coalesced per kind: only
+    the most recently requested image is applied once the current job ends.
+    Pending desktop and lockscreen requests are applied together in one batch.
+    """
+
+    # Signals
+    applied = pyqtSignal(str, str, bool, float)  # Emitted with (path, kind, success, elapsed ms)
+
+    def __init__(self, parent=None):
+        """
+        Initialize the executor.
+
+        Args:
+            parent: Parent QObject
+        """
+        super().__init__(parent)
+        self._pending: Dict[str, str] = {}
+        self._screens: List[ScreenGeometry] = []
+        self._worker: Optional[ApplyWorker] = None
+        self._unreported: List[str] = []  # Kinds of the running batch not yet reported
+        self._trace_parent = None  # Span current when the pending jobs were requested
+
+    def request(self, path: str, kind: str = "desktop"):
+        """
+        Queue a wallpaper to be applied, replacing any pending one of the same kind.
+
+        Args:
+            path: Path to the image file
+            kind: Either "desktop" or "lockscreen"
+        """
+        if kind in self._pending:
+            logger.debug(f"Superseding pending {kind} wallpaper {self._pending[kind]}")
+
+        # Screens can only be queried here on the GUI thread
+        self._screens = detect_screen_geometries() if RENDER_MODE else []
+        self._pending[kind] = path
+        self._trace_parent = get_tracer().current()
+        self._start_next()
+
+    def is_busy(self, kind: Optional[str] = None) -> bool:
+        """Return True if a job (optionally of the given kind) is running or pending."""
+        if kind is None:
+            return self._worker is not None or bool(self._pending)
+        return kind in self._unreported or kind in self._pending
+
+    def wait(self):
+        """Drop pending jobs and block until the running one has finished."""
+        self._pending.clear()
+        for worker in self.findChildren(ApplyWorker):
+            worker.wait()
+
+    def _start_next(self):
+        """Start the pending jobs as one batch if nothing is running."""
+        if self._worker is not None or not self._pending:
+            return
+
+        jobs, self._pending = self._pending, {}
+        self._unreported = list(jobs)
+        with get_tracer().use(self._trace_parent):
+            self._worker = ApplyWorker(jobs, self._screens, self)
+        self._worker.applied.connect(self._on_applied)
+        self._worker.finished.connect(self._worker.deleteLater)
+        self._worker.start()
+
+    def _on_applied(self, path: str, kind: str, success: bool, elapsed_ms: float):
+        """Report a finished job and start the next batch once all are reported."""
+        if self.sender() is self._worker and kind in self._unreported:
+            self._unreported.remove(kind)
+            if not self._unreported:
+                self._worker = None
+                self._start_next()
+        self.applied.emit(path, kind, success, elapsed_ms)
@@ -2,16 +2,19 @@
 Worker thread for downloading photos from Unsplash.
 """
 
-import os
+import time
 import logging
-from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 
 from PyQt5.QtCore import QThread, pyqtSignal
-from PyQt5.QtGui import QPixmap, QImage
+from PyQt5.QtGui import QImage
 
 from wallpaper_changer.api import UnsplashAPI
-from wallpaper_changer.config import DOWNLOAD_DIR
+from wallpaper_changer.utils.downloads import fetch_thumbnail, index_download, photo_file_path, pick_distinct_photo
+from wallpaper_changer.utils.library import get_library
+from wallpaper_changer.utils.metrics import get_metrics
+from wallpaper_changer.utils.screen_fit import wallpaper_candidates
+from wallpaper_changer.utils.tracing import get_tracer
 
 logger = logging.getLogger(__name__)
 
@@ -21,20 +24,34 @@ class DownloadWorker(QThread):
     
     # Signals
     progress = pyqtSignal(int)              # Emitted with download progress (0-100)
-    finished = pyqtSignal(str, QPixmap)     # Emitted when download completes (path, thumbnail)
+    finished = pyqtSignal(str, QImage)      # Emitted when download completes (path, thumbnail)
     error = pyqtSignal(str)                 # Emitted when an error occurs
     
-    def __init__(self, photo: Dict[str, Any], parent=None):
+    def __init__(self, photo: Dict[str, Any], query: Optional[str] = None,
+                 alternatives: Optional[List[Dict[str, Any]]] = None,
+                 sizes: Optional[Sequence[Tuple[int, int]]] = None, parent=None):
         """
         Initialize the download worker.
         
         Args:
             photo: Photo dictionary from Unsplash API
+            query: Search query the photo was found with, stored in the library
+            alternatives: Photos to download instead if ``photo`` looks like a
+                wallpaper already in the library; duplicates aren't avoided
+                when omitted
+            sizes: Screen areas to pick a wallpaper for; when given, the
+                photo is picked at random from the alternatives instead,
+                as by screen_fit.wallpaper_candidates()
             parent: Parent QObject
         """
         super().__init__(parent)
         self.photo = photo
+        self.query = query
+        self.alternatives = alternatives or []
+        self.sizes = sizes
         self.api = UnsplashAPI()
+        self._thumbnail: Optional[QImage] = None
+        self._trace_parent = get_tracer().current()
     
     def run(self):
         """
@@ -43,63 +60,90 @@ class DownloadWorker(QThread):
         This method runs in a separate thread and emits signals
         to communicate with the main thread.
         """
-        try:
-            # Get image URL
-            image_url = self.photo.get("urls", {}).get("full", "")
-            if not image_url:
-                self.error.emit("No image URL found in photo data")
-                self.finished.emit("", QPixmap())
-                return
+        tracer = get_tracer()
+        with tracer.span("DownloadWorker.run", parent=self._trace_parent, query=self.query) as span:
+            metrics = get_metrics()
+            started, outcome = time.perf_counter(), "error"
+            try:
+                if self.sizes is not None and self.alternatives:
+                    with metrics.timed("download_step_seconds", step="rank"), tracer.span("rank_candidates"):
+                        self.alternatives = wallpaper_candidates(self.alternatives, self.sizes)
+                        self.photo = self.alternatives[0]
+                if self.alternatives:
+                    with metrics.timed("download_step_seconds", step="pick"), tracer.span("pick_distinct_photo"):
+                        self.photo = self._pick_distinct_photo()
+
+                # Get image URL
+                image_url = self.photo.get("urls", {}).get("full", "")
+                if not image_url:
+                    self.error.emit("No image URL found in photo data")
+                    self.finished.emit("", QImage())
+                    return
+            
+                # Generate unique filename
+                image_path = photo_file_path(self.photo)
             
-            # Generate unique filename
-            timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-            photo_id = self.photo.get('id', 'unsplash')
-            filename = f"{photo_id}_{timestamp}.jpg"
-            image_path = os.path.join(DOWNLOAD_DIR, filename)
+                logger.info(f"Starting download to: {image_path}")
             
-            logger.info(f"Starting download to: {image_path}")
+                # Download the image with progress callback
+                success = self.api.download_photo(
+                    image_url, 
+                    image_path, 
+                    progress_callback=self.progress.emit
+                )
             
-            # Download the image with progress callback
-            success = self.api.download_photo(
-                image_url, 
-                image_path, 
-                progress_callback=self.progress.emit
-            )
+                if not success:
+                    self.error.emit("Failed to download image")
+                    self.finished.emit("", QImage())
+                    return
             
-            if not success:
-                self.error.emit("Failed to download image")
-                self.finished.emit("", QPixmap())
-                return
+                get_library().record_download(self.photo, image_path, self.query)
             
-            # Get thumbnail for preview
-            thumbnail_pixmap = self._get_thumbnail_pixmap()
+                # Get thumbnail for preview; its hash lets later downloads spot this picture
+                with metrics.timed("download_step_seconds", step="thumbnail"), tracer.span("thumbnail"):
+                    thumbnail_image = self._get_thumbnail_image()
+                with metrics.timed("download_step_seconds", step="index"), tracer.span("index"):
+                    index_download(image_path, thumbnail_image)
             
-            logger.info(f"Download completed successfully: {image_path}")
-            self.finished.emit(image_path, thumbnail_pixmap)
+                logger.info(f"Download completed successfully: {image_path}")
+                outcome = "ok"
+                span.set("path", image_path)
+                self.finished.emit(image_path, thumbnail_image)
             
-        except Exception as e:
-            error_msg = f"Download failed: {str(e)}"
-            logger.error(error_msg)
-            self.error.emit(error_msg)
-            self.finished.emit("", QPixmap())
+            except Exception as e:
+                error_msg = f"Download failed: {str(e)}"
+                logger.error(error_msg)
+                self.error.emit(error_msg)
+                self.finished.emit("", QImage())
+            finally:
+                metrics.observe("download_step_seconds", time.perf_counter() - started, step="total")
+                metrics.count("downloads_total", outcome=outcome)
     
-    def _get_thumbnail_pixmap(self) -> QPixmap:
+    def _pick_distinct_photo(self) -> Dict[str, Any]:
         """
-        Get thumbnail pixmap for the downloaded photo.
-        
+        Pick the first candidate that doesn't look like a library wallpaper.
+
+        See downloads.pick_distinct_photo(); the photo itself is tried first.
+
         Returns:
-            QPixmap object for thumbnail or empty pixmap if failed
+            Photo dictionary to download
         """
-        try:
-            thumbnail_url = self.photo.get("urls", {}).get("thumb", "")
-            if not thumbnail_url:
-                return QPixmap()
-            
-            thumbnail_data = self.api.get_photo_thumbnail(thumbnail_url)
-            if thumbnail_data:
-                return QPixmap.fromImage(QImage.fromData(thumbnail_data))
-            
-        except Exception as e:
-            logger.warning(f"Failed to get thumbnail: {str(e)}")
+        candidates = [self.photo] + [
+            photo for photo in self.alternatives if photo.get("id") != self.photo.get("id")
+        ]
+        self.photo, self._thumbnail = pick_distinct_photo(self.api, candidates)
+        return self.photo
+
+    def _get_thumbnail_image(self) -> QImage:
+        """
+        Get decoded thumbnail image for the downloaded photo.
         
-        return QPixmap()
+        QPixmap cannot be used outside the GUI thread, so the thumbnail is
+        handed over as a QImage for the receiver to convert.
+        
+        Returns:
+            QImage object for thumbnail or null image if failed
+        """
+        if self._thumbnail is None:
+            self._thumbnail = fetch_thumbnail(self.api, self.photo)
+        return self._thumbnail
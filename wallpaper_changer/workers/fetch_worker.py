@@ -3,11 +3,15 @@ Worker thread for fetching photos from Unsplash API.
 """
 
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 
 from PyQt5.QtCore import QThread, pyqtSignal
 
 from wallpaper_changer.api import UnsplashAPI
+from wallpaper_changer.config import DEFAULT_PER_PAGE
+from wallpaper_changer.utils.photo_index import get_photo_index
+from wallpaper_changer.utils.screen_fit import rank_photos
+from wallpaper_changer.utils.tracing import get_tracer
 
 logger = logging.getLogger(__name__)
 
@@ -17,19 +21,35 @@ class FetchWorker(QThread):
     
     # Signals
     photos = pyqtSignal(list)  # Emitted when photos are successfully fetched
+    local_photos = pyqtSignal(list)  # Emitted with matching photos of earlier searches first
     error = pyqtSignal(str)    # Emitted when an error occurs
     
-    def __init__(self, query: str, parent=None):
+    def __init__(self, query: str, sizes: Optional[Sequence[Tuple[int, int]]] = None, parent=None):
         """
         Initialize the fetch worker.
         
         Args:
             query: Search query for photos
+            sizes: Screen areas to rank the photos for before emitting them,
+                as from screen_fit.target_sizes(); poor fits are dropped.
+                Photos are emitted as found when omitted.
             parent: Parent QObject
         """
         super().__init__(parent)
         self.query = query
+        self.sizes = sizes
+        self.found = 0  # Photos Unsplash returned, before ranking
         self.api = UnsplashAPI()
+        self._trace_parent = get_tracer().current()
+    
+    def cancel(self):
+        """
+        Drop the results of this fetch, e.g. when a newer search supersedes it.
+
+        The request itself can't be interrupted; its results are still added
+        to the photo index but no signal is emitted.
+        """
+        self.requestInterruption()
     
     def run(self):
         """
@@ -38,19 +58,42 @@ class FetchWorker(QThread):
         This method runs in a separate thread and emits signals
         to communicate with the main thread.
         """
-        try:
-            logger.info(f"Starting photo fetch for query: '{self.query}'")
-            photos = self.api.search_photos(self.query)
+        with get_tracer().span("FetchWorker.run", parent=self._trace_parent, query=self.query):
+            try:
+                logger.info(f"Starting photo fetch for query: '{self.query}'")
+                index = get_photo_index()
+                # Loading and searching the index may block; keep both off the GUI thread
+                index.load()
+                local_photos = self._rank(index.search(self.query, limit=DEFAULT_PER_PAGE))
+                if local_photos and not self.isInterruptionRequested():
+                    self.local_photos.emit(local_photos)
+
+                photos = self.api.search_photos(self.query)
             
-            if photos:
-                logger.info(f"Successfully fetched {len(photos)} photos")
-                self.photos.emit(photos)
-            else:
-                logger.warning(f"No photos found for query: '{self.query}'")
-                self.photos.emit([])
+                if photos:
+                    logger.info(f"Successfully fetched {len(photos)} photos")
+                    index.add(photos, self.query)
+                    self.found = len(photos)
+                    photos = self._rank(photos)
+
+                if self.isInterruptionRequested():
+                    logger.debug(f"Dropping superseded results for '{self.query}'")
+                    return
+
+                if not self.found:
+                    logger.warning(f"No photos found for query: '{self.query}'")
+                self.photos.emit(photos or [])
                 
-        except Exception as e:
-            error_msg = f"Failed to fetch photos: {str(e)}"
-            logger.error(error_msg)
-            self.error.emit(error_msg)
-            self.photos.emit([])  # Emit empty list as fallback
+            except Exception as e:
+                if self.isInterruptionRequested():
+                    return
+                error_msg = f"Failed to fetch photos: {str(e)}"
+                logger.error(error_msg)
+                self.error.emit(error_msg)
+                self.photos.emit([])  # Emit empty list as fallback
+
+    def _rank(self, photos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Rank photos by screen fit if sizes were given; NumPy loads on this thread."""
+        if self.sizes is None:
+            return photos
+        return rank_photos(photos, self.sizes)
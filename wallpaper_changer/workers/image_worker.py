@@ -0,0 +1,211 @@
+"""
+Worker threads for fetching and decoding images that may be superseded.
+"""
+
+import time
+import logging
+from typing import Optional, Tuple
+
+from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtGui import QImage
+
+from wallpaper_changer.api import UnsplashAPI
+from wallpaper_changer.utils.image_decode import decode_image
+from wallpaper_changer.utils.metrics import get_metrics
+from wallpaper_changer.utils.phash import dhash, get_duplicate_index
+from wallpaper_changer.utils.tracing import get_tracer
+from wallpaper_changer.utils.thumbnail_cache import ThumbnailDiskCache
+
+logger = logging.getLogger(__name__)
+
+
+class ImageFetchWorker(QThread):
+    """
+    Worker thread for fetching and decoding a single image.
+
+    Decoding happens here, at the requested size, so the GUI thread only has
+    to convert the resulting QImage to a QPixmap. Each request carries a
+    generation token: the owner bumps its own counter whenever the wanted
+    image changes and compares it with the token echoed back in the signals,
+    so results for superseded requests are dropped.
+
+    With ``match_duplicates``, the decoded image is also compared with the
+    downloaded wallpapers; ``duplicate_of`` holds the closest match by the
+    time ``loaded`` is emitted.
+    """
+
+    # Signals
+    loaded = pyqtSignal(int, QImage)  # Emitted with (generation, decoded image)
+    failed = pyqtSignal(int, str)    # Emitted with (generation, error message)
+
+    def __init__(
+        self,
+        url: str,
+        generation: int,
+        target_size: Optional[Tuple[int, int]] = None,
+        timeout: int = 5,
+        parent=None,
+        stage: str = "preview",
+        match_duplicates: bool = False
+    ):
+        """
+        Initialize the image fetch worker.
+
+        Args:
+            url: URL of the image to fetch
+            generation: Token identifying the request that started this worker
+            target_size: Optional (width, height) bounds to decode the image at
+            timeout: Request timeout in seconds
+            parent: Parent QObject
+            stage: Label the load is recorded under in the metrics
+            match_duplicates: Look the image up among the downloaded
+                wallpapers, e.g. for list thumbnails
+        """
+        super().__init__(parent)
+        self.url = url
+        self.generation = generation
+        self.target_size = target_size
+        self.timeout = timeout
+        self.stage = stage
+        self.match_duplicates = match_duplicates
+        self.duplicate_of: Optional[str] = None  # Downloaded wallpaper the image looks like
+        self._trace_parent = get_tracer().current()
+        self.api = UnsplashAPI()
+
+    def cancel(self):
+        """Abort the fetch; no signal is emitted once cancelled."""
+        self.requestInterruption()
+
+    def run(self):
+        """
+        Run the worker thread to fetch and decode the image.
+
+        The transfer is abandoned between chunks as soon as the worker is
+        cancelled.
+        """
+        with get_tracer().span("ImageFetchWorker.run", parent=self._trace_parent, stage=self.stage):
+            metrics = get_metrics()
+            started, outcome = time.perf_counter(), "error"
+            try:
+                data = self.api.fetch_image(
+                    self.url,
+                    timeout=self.timeout,
+                    should_abort=self.isInterruptionRequested
+                )
+
+                if self.isInterruptionRequested():
+                    outcome = "cancelled"
+                    return
+
+                if not data:
+                    self.failed.emit(self.generation, "Failed to load preview")
+                    return
+
+                with metrics.timed("image_decode_seconds", stage=self.stage), get_tracer().span("decode_image"):
+                    image = decode_image(data, self.target_size, source=self.url)
+                if self.isInterruptionRequested():
+                    outcome = "cancelled"
+                    return
+
+                if image.isNull():
+                    self.failed.emit(self.generation, "Failed to decode preview")
+                    return
+
+                if self.match_duplicates:
+                    with get_tracer().span("match_duplicates"):
+                        self.duplicate_of = self._find_duplicate(image)
+                outcome = "ok"
+                self.loaded.emit(self.generation, image)
+
+            except Exception as e:
+                error_msg = f"Image fetch failed: {str(e)}"
+                logger.error(error_msg)
+                if not self.isInterruptionRequested():
+                    self.failed.emit(self.generation, error_msg)
+            finally:
+                metrics.observe("image_load_seconds", time.perf_counter() - started, stage=self.stage)
+                metrics.count("image_loads_total", stage=self.stage, outcome=outcome)
+
+    @staticmethod
+    def _find_duplicate(image: QImage) -> Optional[str]:
+        """Path of the downloaded wallpaper closest to an image, if any is close enough."""
+        value = dhash(image)
+        matches = get_duplicate_index().find(value) if value is not None else []
+        return matches[0][1] if matches else None
+
+
+class LocalThumbnailWorker(QThread):
+    """
+    Worker thread for loading the thumbnail of a local image file.
+
+    Thumbnails come from the on-disk thumbnail cache, which decodes the full
+    image at reduced size on first use. Has the same interface as
+    ImageFetchWorker, so ImagePrefetcher can drive it; ``url`` holds the
+    local path.
+    """
+
+    # Signals
+    loaded = pyqtSignal(int, QImage)  # Emitted with (generation, decoded image)
+    failed = pyqtSignal(int, str)    # Emitted with (generation, error message)
+
+    def __init__(
+        self,
+        path: str,
+        generation: int,
+        target_size: Optional[Tuple[int, int]] = None,
+        timeout: int = 5,
+        parent=None,
+        stage: str = "history_thumbnail",
+        match_duplicates: bool = False
+    ):
+        """
+        Initialize the thumbnail worker.
+
+        Args:
+            path: Path of the local image file
+            generation: Token identifying the request that started this worker
+            target_size: (width, height) bounds of the thumbnail
+            timeout: Unused; accepted for compatibility with ImageFetchWorker
+            parent: Parent QObject
+            stage: Label the load is recorded under in the metrics
+            match_duplicates: Unused; local files are the downloaded
+                wallpapers themselves
+        """
+        super().__init__(parent)
+        self.url = path
+        self.duplicate_of: Optional[str] = None
+        self.generation = generation
+        self.target_size = target_size or (64, 64)
+        self.stage = stage
+        self._trace_parent = get_tracer().current()
+        self.disk_cache = ThumbnailDiskCache()
+
+    def cancel(self):
+        """Skip the load if it hasn't finished yet; no signal is emitted once cancelled."""
+        self.requestInterruption()
+
+    def run(self):
+        """Run the worker thread to load the thumbnail."""
+        with get_tracer().span("LocalThumbnailWorker.run", parent=self._trace_parent, stage=self.stage):
+            metrics = get_metrics()
+            started, outcome = time.perf_counter(), "error"
+            try:
+                image = self.disk_cache.load(self.url, self.target_size)
+                if self.isInterruptionRequested():
+                    outcome = "cancelled"
+                    return
+
+                if image.isNull():
+                    self.failed.emit(self.generation, "Failed to load thumbnail")
+                else:
+                    outcome = "ok"
+                    self.loaded.emit(self.generation, image)
+
+            except Exception as e:
+                error_msg = f"Thumbnail load failed: {str(e)}"
+                logger.error(error_msg)
+                if not self.isInterruptionRequested():
+                    self.failed.emit(self.generation, error_msg)
+            finally:
+                metrics.observe("image_load_seconds", time.perf_counter() - started, stage=self.stage)
+                metrics.count("image_loads_total", stage=self.stage, outcome=outcome)
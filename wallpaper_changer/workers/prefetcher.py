@@ -0,0 +1,121 @@
+"""
+Background prefetching of images into an in-memory cache.
+"""
+
+import logging
+from typing import List, Optional, Set, Tuple, Type
+
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+from PyQt5.QtGui import QImage
+
+from wallpaper_changer.utils.image_cache import ImageCache
+from wallpaper_changer.workers.image_worker import ImageFetchWorker
+
+logger = logging.getLogger(__name__)
+
+
+class ImagePrefetcher(QObject):
+    """
+    Quietly fetches and decodes images into an ImageCache.
+
+    At most ``max_concurrent`` fetches run at once, counting cancelled ones
+    until their threads end. Interactive loads take priority: callers invoke
+    :meth:`cancel` before starting one, which drops the queue and aborts
+    running fetches.
+    """
+
+    # Signals
+    prefetched = pyqtSignal(str, QImage)  # Emitted with (url, decoded image)
+    duplicate = pyqtSignal(str, str)      # Emitted with (url, downloaded wallpaper it looks like)
+
+    def __init__(
+        self,
+        cache: ImageCache,
+        max_concurrent: int = 2,
+        target_size: Optional[Tuple[int, int]] = None,
+        parent=None,
+        worker_class: Type[QThread] = ImageFetchWorker,
+        stage: str = "prefetch",
+        match_duplicates: bool = False
+    ):
+        """
+        Initialize the prefetcher.
+
+        Args:
+            cache: Cache that receives the decoded images
+            max_concurrent: Maximum number of fetches running at once
+            target_size: Optional (width, height) bounds to decode images at
+            parent: Parent QObject
+            worker_class: Worker used per image; LocalThumbnailWorker loads
+                local files instead of URLs
+            stage: Label the loads are recorded under in the metrics
+            match_duplicates: Compare the images with the downloaded
+                wallpapers on the workers and emit ``duplicate`` for matches
+        """
+        super().__init__(parent)
+        self.cache = cache
+        self.max_concurrent = max_concurrent
+        self.target_size = target_size
+        self.worker_class = worker_class
+        self.stage = stage
+        self.match_duplicates = match_duplicates
+        self._queue: List[str] = []
+        self._running: Set[QThread] = set()
+        self._cancelled: Set[QThread] = set()  # Aborted, but their threads haven't ended yet
+
+    def schedule(self, urls: List[str]):
+        """
+        Replace the pending queue with the given URLs, in priority order.
+
+        Args:
+            urls: Image URLs to prefetch; cached or in-flight URLs are skipped
+        """
+        in_flight = {worker.url for worker in self._running}
+        self._queue = []
+        for url in urls:
+            if url and url not in self.cache and url not in in_flight and url not in self._queue:
+                self._queue.append(url)
+        self._start_next()
+
+    def is_busy(self) -> bool:
+        """Return True while images are queued or loading."""
+        return bool(self._queue or self._running)
+
+    def cancel(self):
+        """Drop queued prefetches and abort the running ones."""
+        self._queue.clear()
+        for worker in self._running:
+            worker.cancel()
+        self._cancelled |= self._running
+        self._running = set()
+
+    def _start_next(self):
+        """Start queued fetches until the concurrency cap is reached."""
+        while self._queue and len(self._running) + len(self._cancelled) < self.max_concurrent:
+            url = self._queue.pop(0)
+            worker = self.worker_class(
+                url, 0, self.target_size, timeout=5, parent=self, stage=self.stage,
+                match_duplicates=self.match_duplicates
+            )
+            worker.loaded.connect(self._on_loaded)
+            worker.finished.connect(self._on_finished)
+            worker.finished.connect(worker.deleteLater)
+            self._running.add(worker)
+            worker.start()
+
+    def _on_loaded(self, generation: int, image: QImage):
+        """Store a prefetched image."""
+        worker = self.sender()
+        if worker in self._running:
+            self.cache.put(worker.url, image)
+            logger.debug(f"Prefetched image: {worker.url}")
+            self.prefetched.emit(worker.url, image)
+            if worker.duplicate_of:
+                self.duplicate.emit(worker.url, worker.duplicate_of)
+
+    def _on_finished(self):
+        """Release an ended worker's slot, loaded, failed or cancelled, and start the next."""
+        worker = self.sender()
+        self._running.discard(worker)
+        self._cancelled.discard(worker)
+        self._start_next()
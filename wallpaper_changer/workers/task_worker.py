@@ -0,0 +1,51 @@
+"""
+Worker thread for running a blocking function off the GUI thread.
+"""
+
+import logging
+from typing import Any, Callable
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from wallpaper_changer.utils.tracing import get_tracer
+
+logger = logging.getLogger(__name__)
+
+
+class TaskWorker(QThread):
+    """
+    Runs one function in the background and emits its result.
+
+    For work that may block on disk or a lock, such as reading the library,
+    and that has no worker of its own.
+    """
+
+    # Signals
+    done = pyqtSignal(object)  # Emitted with the function's return value
+    failed = pyqtSignal(str)   # Emitted with the error message if it raised
+
+    def __init__(self, function: Callable[[], Any], name: str = "task", parent=None):
+        """
+        Initialize the task worker.
+
+        Args:
+            function: Called without arguments on the worker thread
+            name: Label of the task in logs and traces
+            parent: Parent QObject
+        """
+        super().__init__(parent)
+        self.function = function
+        self.name = name
+        self._trace_parent = get_tracer().current()
+
+    def run(self):
+        """Run the function and emit its result."""
+        with get_tracer().span("TaskWorker.run", parent=self._trace_parent, task=self.name):
+            try:
+                result = self.function()
+            except Exception as e:
+                error_msg = f"{self.name} failed: {str(e)}"
+                logger.error(error_msg)
+                self.failed.emit(error_msg)
+                return
+            self.done.emit(result)
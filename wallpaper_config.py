@@ -2,8 +2,9 @@
 """
 User configuration file for Wallpaper Changer.
 
-Modify the settings below to customize the application behavior.
-After making changes, rebuild the application or restart it.
+Modify the settings below to customize the application behavior, then run
+``python wallpaper_config.py`` to save them. A running application applies
+them without a restart.
 """
 
 # =============================================================================
@@ -51,12 +52,14 @@ CUSTOM_DOWNLOAD_DIR = ""  # Example: "C:/MyWallpapers"
 
 def apply_config():
     """
-    Apply the custom configuration to the main config.
-    
+    Save the settings above to the user settings file.
+
     To use this configuration:
     1. Modify the settings above
     2. Run: python wallpaper_config.py
-    3. Restart the application
+
+    A running application (window or daemon) picks the changes up within a
+    few seconds; there is no need to restart it.
     """
     import os
     import sys
@@ -65,31 +68,25 @@ def apply_config():
     sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
     
     try:
-        # Import and modify the main config
-        import wallpaper_changer.config as config
-        
-        # Apply auto-close settings
-        config.AUTO_CLOSE_AFTER_WALLPAPER = AUTO_CLOSE_AFTER_WALLPAPER
-        config.AUTO_CLOSE_DELAY_MS = AUTO_CLOSE_DELAY_MS
-        
-        # Apply custom genres if provided
-        if CUSTOM_GENRES:
-            config.GENRES = CUSTOM_GENRES
-        
-        # Apply custom API key if provided
-        if CUSTOM_API_KEY:
-            config.API_KEY = CUSTOM_API_KEY
-            config.HEADERS["Authorization"] = f"Client-ID {CUSTOM_API_KEY}"
-        
-        # Apply custom download directory if provided
-        if CUSTOM_DOWNLOAD_DIR:
-            config.DOWNLOAD_DIR = os.path.expanduser(CUSTOM_DOWNLOAD_DIR)
-            os.makedirs(config.DOWNLOAD_DIR, exist_ok=True)
+        from wallpaper_changer.settings import get_settings_store
+
+        # Empty values fall back to the built-in defaults
+        store = get_settings_store()
+        store.save({
+            "auto_close_after_wallpaper": AUTO_CLOSE_AFTER_WALLPAPER,
+            "auto_close_delay_ms": AUTO_CLOSE_DELAY_MS,
+            "genres": CUSTOM_GENRES,
+            "api_key": CUSTOM_API_KEY,
+            "download_dir": CUSTOM_DOWNLOAD_DIR,
+        })
+        settings = store.current
         
         print("✅ Configuration applied successfully!")
-        print(f"📁 Auto-close: {AUTO_CLOSE_AFTER_WALLPAPER}")
-        print(f"⏱️  Delay: {AUTO_CLOSE_DELAY_MS}ms")
-        print(f"🎯 Categories: {len(CUSTOM_GENRES)} genres")
+        print(f"📄 Settings file: {store.path}")
+        print(f"📁 Auto-close: {settings.auto_close_after_wallpaper}")
+        print(f"⏱️  Delay: {settings.auto_close_delay_ms}ms")
+        print(f"🎯 Categories: {len(settings.genres)} genres")
+        print(f"💾 Downloads: {settings.download_dir}")
         
         return True
         
@@ -107,7 +104,7 @@ if __name__ == "__main__":
     
     if apply_config():
         print("\n🎉 Configuration ready!")
-        print("💡 You can now run the application with your custom settings.")
+        print("💡 Running instances use your custom settings within a few seconds.")
     else:
         print("\n❌ Configuration failed!")
         print("💡 Please check the error messages above.")